@@ -1,6 +1,34 @@
+import os
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
+
+# Processes started by these programs serve requests
+SERVERS = {"gunicorn", "uvicorn", "daphne", "hypercorn", "uwsgi", "waitress-serve"}
+
+
+def _serving():
+    """True in a process that will serve requests, False for migrate, shell, etc."""
+    program = os.path.basename(sys.argv[0]) if sys.argv else ""
+    if program in ("manage.py", "django-admin"):
+        if len(sys.argv) < 2 or sys.argv[1] != "runserver":
+            return False
+        # With the autoreloader only the child process (RUN_MAIN) serves
+        return os.environ.get("RUN_MAIN") == "true" or "--noreload" in sys.argv
+    return program in SERVERS
 
 
 class MonitorConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "monitor"
+
+    def ready(self):
+        # Build the MediaPipe graphs off the request path, so the first video
+        # frame does not wait for them
+        if getattr(settings, "MONITOR_WARM_UP", True) and _serving():
+            from . import views
+            print("🔥 Warming up analyzers in the background")
+            views.analyzers.warm()
+            # Loads the speech driver and synthesizes the alert phrases
+            views.voice.start()
@@ -0,0 +1,128 @@
+"""End-to-end benchmark: get_frame() throughput, latency and memory per mode.
+
+Drives WeekdayCamera and WeekendCamera from an in-memory frame source - no
+webcam needed - and reports frames per second, p50/p95/p99 per-frame
+latency and peak RSS for every mode and resolution. Each run happens in a
+fresh process, so peak RSS belongs to that run alone. Frames are a looping
+clip (--clip) or a reference pose photo letterboxed into the frame.
+
+With --baseline the run fails (exit status 1) when any configuration's fps
+drops more than --tolerance below the saved results, so it can gate changes:
+
+    python -m monitor.benchmarks.camera --json baseline.json
+    python -m monitor.benchmarks.camera --baseline baseline.json
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from monitor.camera.pose_index import IMAGES_DIR
+
+DEFAULT_IMAGE = IMAGES_DIR / "T-Pose.png"
+
+
+def run(mode, width, height, frames, warmup, clip=None):
+    """One benchmark configuration; runs in its own process"""
+    import resource
+
+    from monitor.camera.sources import ClipSource, SyntheticSource
+
+    if clip:
+        source = ClipSource.from_file(clip, size=(width, height))
+    else:
+        source = SyntheticSource(width, height, image=DEFAULT_IMAGE)
+
+    if mode == "weekday":
+        from monitor.camera.weekday import WeekdayCamera
+        camera = WeekdayCamera(source=source, voice=False)
+    else:
+        from monitor.camera.weekend import WeekendCamera
+        camera = WeekendCamera(source=source)
+    # Read synchronously so the numbers measure processing, not capture waits
+    camera.THREADED_CAPTURE = False
+
+    try:
+        for _ in range(warmup):
+            camera.get_frame()
+        latencies = np.empty(frames)
+        for i in range(frames):
+            start = time.perf_counter()
+            camera.get_frame()
+            latencies[i] = time.perf_counter() - start
+    finally:
+        camera.release()
+
+    p50, p95, p99 = np.percentile(latencies, (50, 95, 99)) * 1000
+    return {
+        "mode": mode,
+        "resolution": f"{width}x{height}",
+        "fps": frames / latencies.sum(),
+        "p50_ms": p50,
+        "p95_ms": p95,
+        "p99_ms": p99,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def regressions(results, baseline, tolerance):
+    saved = {(r["mode"], r["resolution"]): r for r in baseline}
+    failed = []
+    for result in results:
+        before = saved.get((result["mode"], result["resolution"]))
+        if before and result["fps"] < before["fps"] * (1 - tolerance):
+            failed.append((result, before))
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--modes", nargs="+", choices=["weekday", "weekend"], default=["weekday", "weekend"])
+    parser.add_argument("--resolutions", nargs="+", default=["640x480", "1280x720", "1920x1080"])
+    parser.add_argument("--clip", help="Video file to loop instead of the synthetic frames")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Fail if fps regressed against this results file")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    configs = [
+        (mode, *map(int, resolution.split("x")))
+        for mode in args.modes for resolution in args.resolutions
+    ]
+
+    print(f"{'mode':<9}{'resolution':>11}{'fps':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'RSS MB':>9}")
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for mode, width, height in configs:
+        # A fresh process per configuration keeps peak RSS separate
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(run, mode, width, height, args.frames, args.warmup, args.clip).result()
+        results.append(result)
+        print(f"{result['mode']:<9}{result['resolution']:>11}{result['fps']:>8.1f}"
+              f"{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}"
+              f"{result['peak_rss_mb']:>9.0f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            failed = regressions(results, json.load(f), args.tolerance)
+        for result, before in failed:
+            print(f"❌ {result['mode']} {result['resolution']}: "
+                  f"{result['fps']:.1f} fps vs {before['fps']:.1f} baseline")
+        if failed:
+            sys.exit(1)
+        print("✅ No fps regressions")
+
+
+if __name__ == "__main__":
+    main()
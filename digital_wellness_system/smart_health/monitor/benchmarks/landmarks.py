@@ -0,0 +1,162 @@
+"""Microbenchmark: per-frame landmark analytics.
+
+Times three ways of turning a MediaPipe result into the numbers the
+weekday/weekend analytics need, per mode:
+
+  objects  - attribute lookups on every landmark object, scalar math
+  arrays   - full per-landmark copy into an array, then scalar indexing
+  adapter  - LandmarkAdapter + the helpers the cameras use now: plain
+             rows of the dozen weekday points, one array of the 33 pose
+             points for the weekend classifier
+
+No camera or MediaPipe graph is needed.
+
+    python -m monitor.benchmarks.landmarks [--frames 20000]
+"""
+import argparse
+import math
+import random
+import timeit
+
+import numpy as np
+
+from monitor.camera.landmarks import LandmarkAdapter
+from monitor.camera.weekday import (
+    FACE_POINTS, LEFT_EYE, NOSE_ROW, RIGHT_EYE, SHOULDERS, face_metrics,
+    head_tilt_angle,
+)
+
+W, H = 1280, 720
+
+
+class _Landmark:
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y, z):
+        self.x, self.y, self.z = x, y, z
+
+
+def fake_landmarks(count, seed):
+    """A landmark list shaped like MediaPipe's (real protobufs if available)"""
+    rng = random.Random(seed)
+    points = [(rng.random(), rng.random(), rng.random() - 0.5) for _ in range(count)]
+    try:
+        from mediapipe.framework.formats import landmark_pb2
+    except ImportError:
+        return [_Landmark(*p) for p in points]
+    landmarks = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z in points:
+        landmarks.landmark.add(x=x, y=y, z=z)
+    return landmarks.landmark
+
+
+# ---------- legacy per-landmark code ----------
+def _dist(p1, p2):
+    return math.hypot(p1[0] - p2[0], p1[1] - p2[1])
+
+
+def _ear(eye):
+    A = _dist(eye[1], eye[5])
+    B = _dist(eye[2], eye[4])
+    C = _dist(eye[0], eye[3])
+    return (A + B) / (2.0 * C) if C != 0 else 0
+
+
+def _tilt(left_eye, right_eye):
+    return abs(math.degrees(math.atan2(right_eye[1] - left_eye[1], right_eye[0] - left_eye[0])))
+
+
+def weekday_objects(face, pose, w=W, h=H):
+    lm = face
+    left_eye = [(int(lm[i].x*w), int(lm[i].y*h)) for i in LEFT_EYE]
+    right_eye = [(int(lm[i].x*w), int(lm[i].y*h)) for i in RIGHT_EYE]
+    ear = (_ear(left_eye) + _ear(right_eye)) / 2
+
+    nose = int(lm[1].y*h)
+    l_eye = (int(lm[33].x*w), int(lm[33].y*h))
+    r_eye = (int(lm[263].x*w), int(lm[263].y*h))
+    l_sh = int(pose[11].y*h)
+    r_sh = int(pose[12].y*h)
+    return ear, nose - (l_sh + r_sh) // 2, _dist(l_eye, r_eye), _tilt(l_eye, r_eye)
+
+
+def weekend_objects(pose, w=W, h=H):
+    return [(int(p.x*w), int(p.y*h), p.z*w) for p in pose]
+
+
+# ---------- full copy, then scalar indexing ----------
+def _to_array(landmarks):
+    return np.array([(p.x, p.y, p.z) for p in landmarks], dtype=np.float32)
+
+
+def weekday_arrays(face, pose, w=W, h=H):
+    lm = _to_array(face)
+    plm = _to_array(pose)
+    left_eye = [(int(lm[i, 0]*w), int(lm[i, 1]*h)) for i in LEFT_EYE]
+    right_eye = [(int(lm[i, 0]*w), int(lm[i, 1]*h)) for i in RIGHT_EYE]
+    ear = (_ear(left_eye) + _ear(right_eye)) / 2
+
+    nose = int(lm[1, 1]*h)
+    l_eye = (int(lm[33, 0]*w), int(lm[33, 1]*h))
+    r_eye = (int(lm[263, 0]*w), int(lm[263, 1]*h))
+    l_sh = int(plm[11, 1]*h)
+    r_sh = int(plm[12, 1]*h)
+    return ear, nose - (l_sh + r_sh) // 2, _dist(l_eye, r_eye), _tilt(l_eye, r_eye)
+
+
+def weekend_arrays(pose, w=W, h=H):
+    return [(int(x*w), int(y*h), z*w) for x, y, z in _to_array(pose)]
+
+
+# ---------- what the cameras do now ----------
+face_adapter = LandmarkAdapter(478, FACE_POINTS)
+shoulder_adapter = LandmarkAdapter(33, SHOULDERS)
+pose_adapter = LandmarkAdapter(33)
+
+
+def weekday_adapter(face, pose, w=W, h=H):
+    # Rows of just the points read, each read once
+    flm = face_adapter(face)
+    plm = shoulder_adapter(pose)
+    ear, l_eye, r_eye, eye_dist = face_metrics(flm, w, h)
+    nose = int(flm[NOSE_ROW][1]*h)
+    l_sh, r_sh = (int(y*h) for _, y, _ in plm)
+    return ear, nose - (l_sh + r_sh) // 2, eye_dist, head_tilt_angle(l_eye, r_eye)
+
+
+def weekend_adapter(pose, w=W, h=H):
+    # One array of all 33 points for the vectorized pose classifier
+    pts = pose_adapter(pose) * (w, h, w)
+    np.trunc(pts[:, :2], out=pts[:, :2])
+    return pts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=20000)
+    args = parser.parse_args()
+
+    face = fake_landmarks(478, seed=1)
+    pose = fake_landmarks(33, seed=2)
+
+    reference = weekday_objects(face, pose)
+    for fn in (weekday_arrays, weekday_adapter):
+        assert np.allclose(fn(face, pose), reference, atol=1e-6), fn.__name__
+    assert np.allclose(weekend_adapter(pose), weekend_objects(pose), atol=1e-3)
+
+    cases = [
+        ("weekday", "objects", lambda: weekday_objects(face, pose)),
+        ("weekday", "arrays", lambda: weekday_arrays(face, pose)),
+        ("weekday", "adapter", lambda: weekday_adapter(face, pose)),
+        ("weekend", "objects", lambda: weekend_objects(pose)),
+        ("weekend", "arrays", lambda: weekend_arrays(pose)),
+        ("weekend", "adapter", lambda: weekend_adapter(pose)),
+    ]
+    print(f"{'mode':<10}{'path':<10}{'us/frame':>10}")
+    for mode, path, fn in cases:
+        seconds = min(timeit.repeat(fn, number=args.frames, repeat=3))
+        print(f"{mode:<10}{path:<10}{seconds / args.frames * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
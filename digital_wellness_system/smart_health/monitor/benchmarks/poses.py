@@ -0,0 +1,67 @@
+"""Microbenchmark: yoga pose classification cost vs. number of poses.
+
+Times PoseClassifier (all poses checked with a few vectorized NumPy calls)
+against a scalar reference that computes each angle with ``math`` and walks
+the same table pose by pose, the way the old if-ladder did. The table is
+replicated to show how each scales as poses are added.
+
+    python -m monitor.benchmarks.poses [--frames 5000]
+"""
+import argparse
+import math
+import timeit
+
+import numpy as np
+
+from monitor.camera.poses import (
+    JOINT_ANGLES, LANDMARKS, POSE_TABLE, Y_OFFSETS, PoseClassifier,
+)
+
+
+def _angle(a, b, c):
+    angle = abs(math.degrees(math.atan2(c[1] - b[1], c[0] - b[0]) -
+                             math.atan2(a[1] - b[1], a[0] - b[0])))
+    return 360 - angle if angle > 180 else angle
+
+
+def classify_scalar(points, table):
+    features = {
+        name: _angle(*(points[LANDMARKS[n]] for n in joints))
+        for name, joints in JOINT_ANGLES.items()
+    }
+    for name, (a, b) in Y_OFFSETS.items():
+        features[name] = points[LANDMARKS[a]][1] - points[LANDMARKS[b]][1]
+
+    label = "Unknown Pose"
+    for pose in table:
+        ok = all(lo < features[f] < hi for f, (lo, hi) in pose.get("all", {}).items())
+        ok = ok and all(
+            any(lo < features[f] < hi for f, (lo, hi) in group.items())
+            for group in pose.get("any", [])
+        )
+        if ok:
+            label = pose["label"]
+    return label
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 640, (33, 3))
+    tuples = [tuple(p) for p in points]
+
+    print(f"{'poses':>6}{'scalar us':>12}{'numpy us':>12}")
+    for copies in (1, 10, 100):
+        table = POSE_TABLE * copies
+        classifier = PoseClassifier(table)
+        assert classifier.classify(points) == classify_scalar(tuples, table)
+        scalar = min(timeit.repeat(lambda: classify_scalar(tuples, table), number=args.frames, repeat=3))
+        vector = min(timeit.repeat(lambda: classifier.classify(points), number=args.frames, repeat=3))
+        print(f"{len(table):>6}{scalar / args.frames * 1e6:>12.2f}{vector / args.frames * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Startup benchmark: cold start, first history page and first video frame.
+
+Every scenario runs in a fresh Python process, so imports are really cold
+(the OS file cache aside), and reports the wall time from spawning it:
+
+  manage.py check     - what every management command, migrate included, pays
+  django + urls       - settings, apps and the URL conf (all views imported)
+  first history page  - until /history/ has been rendered
+  first video frame   - until the first JPEG of /video_feed/ arrives
+  ... after warm-up   - same, once the analyzers were built in the background
+
+It also shows whether MediaPipe had been imported by the end of each run.
+
+    python -m monitor.benchmarks.startup [--repeat 3] [--source synthetic:640x480]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[2]
+RESULT_PREFIX = "STARTUP-RESULT "
+
+SCENARIOS = {
+    "urls": "django + urls",
+    "history": "first history page",
+    "frame": "first video frame",
+    "warm_frame": "... after warm-up",
+}
+
+
+def child(scenario, source):
+    """One scenario, run inside the fresh process"""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "smart_health.settings")
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from django.test import Client
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns  # import the URL conf and every view
+    result = {}
+
+    if scenario == "history":
+        Client(HTTP_HOST="localhost").get("/history/")
+
+    elif scenario in ("frame", "warm_frame"):
+        from monitor import views
+        settings.MONITOR_CAMERA_SOURCE = source
+        if scenario == "warm_frame":
+            # Stands in for the background warm-up having finished
+            start = time.perf_counter()
+            views.analyzers.warm(background=False)
+            result["warm_up"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        response = Client(HTTP_HOST="localhost").get("/video_feed/", {"mode": "weekday"})
+        next(iter(response.streaming_content))
+        result["request"] = time.perf_counter() - start
+        response.close()
+        views.cleanup_all_cameras()
+
+    result["mediapipe"] = "mediapipe" in sys.modules
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+
+def _spawn(args):
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, *args], cwd=PROJECT_DIR,
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} exited with {proc.returncode}")
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return elapsed, json.loads(line[len(RESULT_PREFIX):])
+    return elapsed, {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--source", default="synthetic:640x480",
+                        help="Frame source for the video scenarios (see sources.open_source)")
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.source)
+        return
+
+    runs = {"check": (["manage.py", "check"], "manage.py check")}
+    for scenario, label in SCENARIOS.items():
+        runs[scenario] = (["-m", "monitor.benchmarks.startup", "--child", scenario, "--source", args.source], label)
+
+    print(f"{'scenario':<22}{'wall s':>8}{'request s':>11}{'mediapipe':>11}")
+    for scenario, (command, label) in runs.items():
+        walls, requests, details = [], [], {}
+        for _ in range(args.repeat):
+            wall, details = _spawn(command)
+            walls.append(wall)
+            if "request" in details:
+                requests.append(details["request"])
+        request = f"{statistics.median(requests):>11.2f}" if requests else f"{'-':>11}"
+        loaded = {True: "loaded", False: "no"}.get(details.get("mediapipe"), "-")
+        print(f"{label:<22}{statistics.median(walls):>8.2f}{request}{loaded:>11}")
+
+
+if __name__ == "__main__":
+    main()
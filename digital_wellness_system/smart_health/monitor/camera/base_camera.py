@@ -1,72 +1,373 @@
 import cv2
+import numpy as np
 import threading
 import time
+from collections import deque
 
-class VideoCamera:
-    _instance = None
-    _lock = threading.Lock()
-    _current_mode = None
-
-    def __new__(cls):
-        with cls._lock:
-            if cls._instance is None:
-                cls._instance = super().__new__(cls)
-                cls._instance.cap = None
-            return cls._instance
-
-    def _init_camera(self):
-        """Initialize camera if not already initialized"""
-        if self.cap is None or not self.cap.isOpened():
-            print("📷 Opening camera...")
-            self.cap = cv2.VideoCapture(0)
-            if not self.cap.isOpened():
-                print("❌ Camera failed to open")
-            else:
-                print("✅ Camera opened successfully")
+from .metrics import MetricsChannel
+from .recording import LandmarkRecorder
+from .sources import open_source
+from .telemetry import telemetry
 
-    def get_raw_frame(self):
-        if not self.cap or not self.cap.isOpened():
-            self._init_camera()
-            if not self.cap or not self.cap.isOpened():
-                return None
 
-        success, frame = self.cap.read()
+class FrameCursor:
+    """One reader's position in a FrameBuffer, with its own frame counts"""
+
+    def __init__(self):
+        self.seq = 0
+        self.frames_consumed = 0
+        self.frames_dropped = 0
+
+
+class FrameBuffer:
+    """Small overwrite-on-full buffer of captured frames.
+
+    The capture thread pushes every frame it reads; every reader takes only
+    the newest one, tracked by its own FrameCursor, so several analyzers
+    can share one capture. Frames a reader never got to see are counted as
+    dropped for it instead of queuing up latency.
+    """
+
+    def __init__(self, size=2):
+        self._frames = deque(maxlen=size)
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._closed = False
+
+        self.frames_captured = 0
+
+    def put(self, frame, timestamp):
+        """Store a new frame stamped with a monotonic timestamp"""
+        with self._cond:
+            self._seq += 1
+            self._frames.append((self._seq, timestamp, frame))
+            self.frames_captured += 1
+            self._cond.notify_all()
+
+    def latest(self, cursor, timeout=None, dropped=None):
+        """Return (timestamp, frame) of the newest frame ``cursor`` has not read.
+
+        Waits up to ``timeout`` seconds when nothing new has been captured
+        since the reader's last call and returns (None, None) if nothing
+        arrives. Skipped frames are also added to the ``dropped`` telemetry
+        Counter.
+        """
+        with self._cond:
+            if self._seq == cursor.seq and not self._closed:
+                self._cond.wait_for(
+                    lambda: self._seq > cursor.seq or self._closed,
+                    timeout
+                )
+            if not self._frames or self._frames[-1][0] <= cursor.seq:
+                return None, None
+
+            seq, timestamp, frame = self._frames[-1]
+            skipped = seq - cursor.seq - 1 if cursor.seq else 0
+            if skipped:
+                cursor.frames_dropped += skipped
+                if dropped is not None:
+                    dropped.inc(skipped)
+            cursor.frames_consumed += 1
+            cursor.seq = seq
+            return timestamp, frame
+
+    def close(self):
+        """Wake up any waiting reader and forget buffered frames"""
+        with self._cond:
+            self._closed = True
+            self._frames.clear()
+            self._cond.notify_all()
+
+    def reopen(self):
+        with self._cond:
+            self._closed = False
+
+
+class SharedCapture:
+    """A frame source opened once and read on one background thread.
+
+    There is one per source, shared by every camera reading it, so the
+    device stays open while cameras come and go: switching modes only
+    changes which analyzer consumes the frames. It is closed when the last
+    reader detaches. ``owner`` is the camera that read last, whose
+    telemetry the capture timings go to.
+    """
+
+    FRAME_BUFFER_SIZE = 2
+
+    _captures = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, source):
+        self.source = source
+        self.cap = None
+        self.owner = None
+        self.frame_buffer = FrameBuffer(self.FRAME_BUFFER_SIZE)
+        self._readers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._running = False
+
+    @classmethod
+    def get(cls, source):
+        """The capture of ``source``, created (but not opened) on first use"""
+        with cls._registry_lock:
+            capture = cls._captures.get(source)
+            if capture is None:
+                capture = cls._captures[source] = cls(source)
+            return capture
+
+    @classmethod
+    def release_all(cls):
+        with cls._registry_lock:
+            captures = list(cls._captures.values())
+        for capture in captures:
+            capture.release()
+
+    def open(self):
+        """Open the source unless it is already open; returns whether it is"""
+        with self._lock:
+            if self.cap is None or not self.cap.isOpened():
+                print(f"📷 Opening camera ({self.source})...")
+                self.cap = open_source(self.source)
+                if not self.cap.isOpened():
+                    print("❌ Camera failed to open")
+                else:
+                    print("✅ Camera opened successfully")
+            return self.cap.isOpened()
+
+    @property
+    def is_open(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    # ---------- BACKGROUND CAPTURE ----------
+    def start(self):
+        """Start the background capture thread if it is not running"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._running = True
+            self.frame_buffer.reopen()
+            self._thread = threading.Thread(
+                target=self._capture_loop,
+                name="capture",
+                daemon=True
+            )
+            self._thread.start()
+        print("🎞️ Background capture started")
+
+    def stop(self):
+        """Stop the background capture thread and wait for it to exit"""
+        self._running = False
+        self.frame_buffer.close()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=1.0)
+        self._thread = None
+
+    def _capture_loop(self):
+        while self._running:
+            if not self.is_open:
+                if not self.open():
+                    time.sleep(0.5)
+                continue
+
+            owner = self.owner
+            start = time.perf_counter()
+            success, frame = self.cap.read()
+            if owner is not None:
+                owner.timers.observe("capture", time.perf_counter() - start)
+            if not success:
+                time.sleep(0.01)
+                continue
+            self.frame_buffer.put(frame, time.monotonic())
+
+    # ---------- READERS ----------
+    def attach(self, camera):
+        with self._lock:
+            self._readers.add(camera)
+
+    def detach(self, camera):
+        """Forget ``camera``; the device is closed once nobody reads it"""
+        with self._lock:
+            self._readers.discard(camera)
+            unused = not self._readers
+        if unused:
+            self.release()
+
+    @property
+    def reader_count(self):
+        with self._lock:
+            return len(self._readers)
+
+    def latest(self, camera, timeout):
+        """Newest captured frame for ``camera``, starting the thread if needed"""
+        if camera not in self._readers:
+            self.attach(camera)
+        self.owner = camera
+        self.start()
+        return self.frame_buffer.latest(camera.frame_cursor, timeout, dropped=camera.frames_dropped)
+
+    def read(self, camera):
+        """Read one frame on the calling thread (no background capture)"""
+        if camera not in self._readers:
+            self.attach(camera)
+        self.owner = camera
+        if not self.is_open and not self.open():
+            return None, None
+        with camera.timers.time("capture"):
+            success, frame = self.cap.read()
         if not success:
-            return None
-        return frame
+            return None, None
+        return time.monotonic(), frame
 
     def release(self):
-        """Release the camera properly"""
+        """Stop capturing and close the device; the next read reopens it"""
+        self.stop()
         with self._lock:
-            if self.cap is not None and self.cap.isOpened():
-                print("🔒 Releasing camera...")
+            if self.cap is not None:
+                if self.cap.isOpened():
+                    print("🔒 Releasing camera...")
                 self.cap.release()
                 self.cap = None
-                # Small delay to ensure camera is fully released
-                time.sleep(0.3)
                 print("✅ Camera released successfully")
-    
-    @classmethod
-    def reset_camera(cls):
-        """Force reset the camera"""
-        with cls._lock:
-            if cls._instance and cls._instance.cap:
-                print("🔄 Resetting camera...")
-                cls._instance.cap.release()
-                cls._instance.cap = None
-                time.sleep(0.3)
-                print("✅ Camera reset complete")
-    
-    @classmethod
-    def force_cleanup(cls):
-        """Force cleanup of camera instance"""
-        with cls._lock:
-            if cls._instance:
-                if cls._instance.cap is not None:
-                    try:
-                        cls._instance.cap.release()
-                    except:
-                        pass
-                    cls._instance.cap = None
-                cls._instance = None
-                print("🧹 Camera instance cleaned up")
\ No newline at end of file
+
+
+class VideoCamera:
+    """Base of the analysis cameras.
+
+    Each instance is one analyzer with its own models and session state;
+    any number can exist side by side, reading from the SharedCapture of
+    their ``source``.
+    """
+
+    # Read frames on a dedicated thread and hand out only the newest one
+    THREADED_CAPTURE = True
+    FRAME_WAIT_TIMEOUT = 0.1  # seconds get_raw_frame waits for a fresh frame
+
+    # Webcam index, stream URL, "file:", "loop:" or "synthetic:" spec, or a
+    # source object - see sources.open_source
+    SOURCE = 0
+
+    # ``mode`` label of this camera's telemetry series
+    MODE = "camera"
+
+    def __init__(self, source=None):
+        self.source = self.SOURCE if source is None else source
+        self.last_frame_time = None
+        self.frame_cursor = FrameCursor()
+        self.metrics = MetricsChannel()
+        self.recorder = None
+        self.timers = telemetry.timers(self.MODE)
+        self.inference_errors = telemetry.counter("monitor_inference_errors_total", mode=self.MODE)
+        self.frames_dropped = telemetry.counter("monitor_frames_dropped_total", mode=self.MODE, stage="capture")
+
+    @property
+    def capture(self):
+        """The SharedCapture of this camera's source"""
+        return SharedCapture.get(self.source)
+
+    # ---------- BACKGROUND CAPTURE ----------
+    def start_capture(self):
+        self.capture.start()
+
+    def stop_capture(self):
+        self.capture.stop()
+
+    def capture_stats(self):
+        """Counters for frames captured, consumed and dropped"""
+        return {
+            "frames_captured": self.capture.frame_buffer.frames_captured,
+            "frames_consumed": self.frame_cursor.frames_consumed,
+            "frames_dropped": self.frame_cursor.frames_dropped,
+        }
+
+    def use_source(self, source):
+        """Read from ``source`` from now on, letting go of the old capture"""
+        if source != self.source:
+            self.capture.detach(self)
+            self.source = source
+            self.frame_cursor = FrameCursor()
+
+    def get_raw_frame(self):
+        if self.THREADED_CAPTURE:
+            timestamp, frame = self.capture.latest(self, self.FRAME_WAIT_TIMEOUT)
+        else:
+            timestamp, frame = self.capture.read(self)
+        if frame is not None:
+            self.last_frame_time = timestamp
+        return frame
+
+    def analyze_next(self):
+        """Advance the analysis on the next frame without drawing or encoding.
+
+        Keeps session statistics running while nobody watches the stream.
+        Returns False when no frame was available.
+        """
+        frame = self.get_raw_frame()
+        if frame is None:
+            return False
+        self.analyze(frame)
+        return True
+
+    def warm_up(self, width=640, height=480):
+        """Run the models once on a blank frame.
+
+        MediaPipe loads its model files on the first inference; doing that
+        here keeps it off the first frame a viewer waits for.
+        """
+        backend = getattr(self, "backend", None)
+        if backend is not None:
+            backend.process(np.zeros((height, width, 3), dtype=np.uint8))
+
+    def reset(self):
+        """Start the analysis over without rebuilding the models.
+
+        Called when a pooled camera becomes the active one again; the base
+        class keeps no analysis state.
+        """
+
+    # ---------- LANDMARK RECORDING ----------
+    # stream name -> (full landmark count, rows worth keeping) for every
+    # stream analyze() hands to the recorder
+    RECORDED_STREAMS = {}
+
+    def start_recording(self, path, meta=None):
+        """Record every analysed frame's landmarks to ``path``.
+
+        ``meta`` is stored in the file as given, plus the analyzer class
+        under "analyzer" (which tells a replay what to run).
+        """
+        self.stop_recording()
+        streams = {name: indices for name, (count, indices) in self.RECORDED_STREAMS.items()}
+        counts = {name: count for name, (count, indices) in self.RECORDED_STREAMS.items()}
+        meta = dict(meta or {}, analyzer=type(self).__name__)
+        self.recorder = LandmarkRecorder(path, streams, counts, meta)
+        print(f"📼 Recording landmarks to {path}")
+
+    def stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            recorder.close()
+
+    def publish_metrics(self, overlay):
+        """Push the values behind an overlay to metrics subscribers"""
+        if overlay is not None:
+            self.metrics.publish(self.metrics_values(overlay))
+
+    def metrics_values(self, overlay):
+        """JSON-ready form of an overlay; override when it holds arrays"""
+        return overlay
+
+    def encode(self, frame):
+        """JPEG-encode a frame for streaming"""
+        with self.timers.time("encode"):
+            ret, jpeg = cv2.imencode(".jpg", frame)
+        if not ret:
+            return None
+        return jpeg.tobytes()
+
+    def release(self):
+        """Stop recording and stop reading; the capture closes if unused"""
+        self.stop_recording()
+        self.capture.detach(self)
@@ -0,0 +1,127 @@
+import math
+
+# What a posture baseline is made of, all in pixels of the analysed frame
+MEASURES = ("shoulder_nose", "shoulder_diff", "eye_dist", "shoulder_mid")
+
+
+class RunningStats:
+    """Welford's running mean and variance.
+
+    With ``max_n`` the oldest samples fade out once that many were seen:
+    the count stops growing, so each new sample keeps a weight of about
+    1/max_n and the statistics follow slow changes.
+    """
+
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self, n=0, mean=0.0, m2=0.0):
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, x, max_n=None):
+        if max_n and self.n >= max_n:
+            self.m2 *= (max_n - 1) / self.n
+            self.n = max_n - 1
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class PostureBaseline:
+    """How one person sits in front of one camera, refined while they sit well.
+
+    Calibration and later refinement feed the same running statistics, so
+    a baseline loaded from the database picks up where it was left. It is
+    only valid for the frame size it was measured at.
+    """
+
+    # Good-posture samples kept in the running statistics (about 5 minutes
+    # at 30 fps); older ones fade out
+    MAX_SAMPLES = 9000
+
+    # Floor of the spread used for deviations, in pixels: a very steady
+    # calibration would otherwise make any movement look like a new setup
+    MIN_STD = 4.0
+
+    def __init__(self, width=None, height=None, stats=None):
+        self.width = width
+        self.height = height
+        self.stats = {name: RunningStats() for name in MEASURES}
+        for name, (n, mean, m2) in (stats or {}).items():
+            if name in self.stats:
+                self.stats[name] = RunningStats(n, mean, m2)
+
+    @property
+    def samples(self):
+        return min(stats.n for stats in self.stats.values())
+
+    def fits(self, width, height):
+        return self.samples > 0 and (self.width, self.height) == (width, height)
+
+    def add(self, measures, width, height):
+        self.width, self.height = width, height
+        for name, stats in self.stats.items():
+            stats.add(measures[name], self.MAX_SAMPLES)
+
+    def mean(self, name):
+        return self.stats[name].mean
+
+    def deviation(self, measures):
+        """Largest number of spreads any measure is away from its mean"""
+        worst = 0.0
+        for name, stats in self.stats.items():
+            spread = max(stats.std, self.MIN_STD)
+            worst = max(worst, abs(measures[name] - stats.mean) / spread)
+        return worst
+
+    def state(self):
+        """JSON-ready form, as stored with monitor.models.PostureBaseline"""
+        return {
+            "width": self.width,
+            "height": self.height,
+            "stats": {name: [s.n, s.mean, s.m2] for name, s in self.stats.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(state.get("width"), state.get("height"), state.get("stats"))
+
+
+class DriftDetector:
+    """Tells when posture has stayed away from the baseline for ``hold`` seconds.
+
+    Keeps an exponential average of "this frame deviates by more than
+    ``sigma``", with a time constant such that about ``hold`` seconds of
+    steady deviation reach ``share``. A few good frames in between only
+    slow it down, and it needs O(1) memory at any frame rate.
+    """
+
+    def __init__(self, hold, sigma=3.0, share=0.9):
+        self.sigma = sigma
+        self.share = share
+        self.reset(hold)
+
+    def reset(self, hold=None):
+        if hold is not None:
+            self.hold = hold
+            self._tau = hold / -math.log(1 - self.share)
+        self.level = 0.0
+        self._last = None
+
+    def update(self, now, deviation):
+        """Feed one frame's deviation; True once the baseline looks stale"""
+        if self._last is not None and now > self._last:
+            alpha = 1 - math.exp(-(now - self._last) / self._tau)
+            self.level += alpha * ((deviation > self.sigma) - self.level)
+        self._last = now
+        return self.level >= self.share
@@ -0,0 +1,277 @@
+import asyncio
+import threading
+import time
+
+from .telemetry import telemetry
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class FrameHub:
+    """Single-producer, multi-subscriber broadcast of encoded frames.
+
+    One analysis loop calls ``source.get_frame()`` - a camera or a
+    FramePipeline - and publishes each JPEG once. Every viewer holds a
+    Subscription with its own cursor; a viewer that falls behind simply
+    jumps to the newest frame, so a slow client never stalls the producer
+    or the other viewers. Async viewers await the same frames on their own
+    event loop and are woken with ``call_soon_threadsafe``, so an idle
+    stream holds no thread at all.
+
+    With ``headless`` the loop keeps going while nobody is subscribed, but
+    only calls ``source.analyze_next()``: the analysis state advances and
+    nothing is drawn or encoded until a viewer attaches again. Clients that
+    only want the analysis values (see ``metrics``) call ``listen()``, which
+    keeps that headless loop going for them without any frames.
+    """
+
+    def __init__(self, source, name="", headless=False):
+        self.source = source
+        self.name = name or type(source).__name__
+        self.headless = headless
+        self._can_analyze = hasattr(source, "analyze_next")
+
+        self._cond = threading.Condition()
+        self._frame = None
+        self._seq = 0
+        self._subscribers = 0
+        self._listeners = 0
+        self._running = False
+        self._thread = None
+        self._waiters = set()  # (loop, future) of async subscribers
+
+        self.frames_published = 0
+        self.frames_headless = 0
+        # Monotonic time the last client left, None while any is connected
+        self.idle_since = time.monotonic()
+
+        self._viewers = telemetry.gauge("monitor_stream_clients", mode=self.name, kind="video")
+        self._listening = telemetry.gauge("monitor_stream_clients", mode=self.name, kind="metrics")
+        self._skipped = telemetry.counter("monitor_frames_dropped_total", mode=self.name, stage="viewer")
+
+    @property
+    def running(self):
+        return self._running
+
+    @property
+    def analyzes_unwatched(self):
+        """True when the analysis goes on with no client at all"""
+        return self.headless and self._can_analyze
+
+    @property
+    def subscriber_count(self):
+        with self._cond:
+            return self._subscribers
+
+    @property
+    def client_count(self):
+        """Viewers plus metrics listeners"""
+        with self._cond:
+            return self._subscribers + self._listeners
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(
+            target=self._produce,
+            name=f"{self.name}-hub",
+            daemon=True
+        )
+        self._thread.start()
+        print(f"📡 Frame hub started: {self.name}")
+
+    def stop(self):
+        """Stop the producer and end every subscriber's stream"""
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cond.notify_all()
+            self._wake_async()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+        if hasattr(self.source, "stop"):
+            self.source.stop()
+        print(f"🛑 Frame hub stopped: {self.name}")
+
+    def subscribe(self):
+        with self._cond:
+            self._subscribers += 1
+            self.idle_since = None
+            self._viewers.inc()
+            self._cond.notify_all()
+            print(f"👀 {self.name}: {self._subscribers} viewer(s)")
+        return Subscription(self)
+
+    def listen(self):
+        """Keep the analysis running without receiving frames"""
+        with self._cond:
+            self._listeners += 1
+            self.idle_since = None
+            self._listening.inc()
+            self._cond.notify_all()
+
+    def unlisten(self):
+        with self._cond:
+            if self._listeners:
+                self._listeners -= 1
+                self._listening.dec()
+                self._check_idle()
+
+    def _unsubscribe(self):
+        with self._cond:
+            if self._subscribers:
+                self._subscribers -= 1
+                self._viewers.dec()
+                self._check_idle()
+            print(f"👋 {self.name}: {self._subscribers} viewer(s)")
+
+    def _check_idle(self):
+        # Called with self._cond held
+        if not self._subscribers and not self._listeners:
+            self.idle_since = time.monotonic()
+
+    def _produce(self):
+        while True:
+            with self._cond:
+                # Nobody is watching or listening - park until somebody shows up
+                self._cond.wait_for(lambda: (
+                    self._subscribers > 0 or not self._running
+                    or (self._can_analyze and (self.headless or self._listeners > 0))
+                ))
+                if not self._running:
+                    break
+                watched = self._subscribers > 0
+
+            if not watched:
+                if not self._can_analyze:
+                    continue
+                try:
+                    if self.source.analyze_next():
+                        self.frames_headless += 1
+                except Exception as e:
+                    print(f"❌ {self.name} analysis error: {e}")
+                continue
+
+            try:
+                frame = self.source.get_frame()
+            except Exception as e:
+                print(f"❌ {self.name} analysis error: {e}")
+                frame = None
+
+            if frame is None:
+                continue
+
+            with self._cond:
+                self._frame = frame
+                self._seq += 1
+                self.frames_published += 1
+                self._cond.notify_all()
+                self._wake_async()
+
+    def _wake_async(self):
+        # Called with self._cond held
+        for loop, future in self._waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+        self._waiters.clear()
+
+    def _newer(self, cursor):
+        if self._seq > cursor:
+            return self._seq, self._frame
+        return cursor, None
+
+    def _wait_newer(self, cursor, timeout):
+        """Return (seq, frame) newer than ``cursor``, or (cursor, None)"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > cursor or not self._running, timeout)
+            return self._newer(cursor)
+
+    async def _wait_newer_async(self, cursor, timeout):
+        """Awaitable version of _wait_newer that blocks no thread"""
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            if self._seq > cursor or not self._running:
+                return self._newer(cursor)
+            waiter = (loop, loop.create_future())
+            self._waiters.add(waiter)
+
+        try:
+            await asyncio.wait_for(waiter[1], timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._cond:
+                self._waiters.discard(waiter)
+
+        with self._cond:
+            return self._newer(cursor)
+
+
+class Subscription:
+    """A viewer's cursor into a FrameHub"""
+
+    def __init__(self, hub):
+        self.hub = hub
+        self.cursor = 0
+        self.frames_received = 0
+        self.frames_skipped = 0
+        self.closed = False
+
+    def next_frame(self, timeout=1.0):
+        """Block until a frame newer than the last one seen is available.
+
+        Returns None on timeout or once the hub has stopped.
+        """
+        if self.closed:
+            return None
+        return self._accept(*self.hub._wait_newer(self.cursor, timeout))
+
+    async def anext_frame(self, timeout=1.0):
+        """Like next_frame, but awaits on the running event loop"""
+        if self.closed:
+            return None
+        return self._accept(*await self.hub._wait_newer_async(self.cursor, timeout))
+
+    def _accept(self, seq, frame):
+        if frame is None:
+            return None
+        skipped = seq - self.cursor - 1 if self.cursor else 0
+        if skipped:
+            self.frames_skipped += skipped
+            self.hub._skipped.inc(skipped)
+        self.cursor = seq
+        self.frames_received += 1
+        return frame
+
+    @property
+    def active(self):
+        return not self.closed and self.hub.running
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.hub._unsubscribe()
+
+    def __iter__(self):
+        try:
+            while self.active:
+                frame = self.next_frame()
+                if frame is not None:
+                    yield frame
+        finally:
+            self.close()
+
+    async def __aiter__(self):
+        try:
+            while self.active:
+                frame = await self.anext_frame()
+                if frame is not None:
+                    yield frame
+        finally:
+            self.close()
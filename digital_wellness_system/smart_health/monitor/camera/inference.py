@@ -0,0 +1,266 @@
+import itertools
+import multiprocessing as mp_proc
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .landmarks import LandmarkAdapter
+
+
+# =================== MODELS ===================
+def _build_face_mesh(**options):
+    import mediapipe as mp
+    return mp.solutions.face_mesh.FaceMesh(**options)
+
+
+def _build_pose(**options):
+    import mediapipe as mp
+    return mp.solutions.pose.Pose(**options)
+
+
+def _face_landmarks(result):
+    if result.multi_face_landmarks:
+        return result.multi_face_landmarks[0].landmark
+    return None
+
+
+def _pose_landmarks(result):
+    return result.pose_landmarks.landmark if result.pose_landmarks else None
+
+
+# kind -> (graph builder, result -> landmark list, landmark count)
+MODELS = {
+    "face_mesh": (_build_face_mesh, _face_landmarks, 478),
+    "pose": (_build_pose, _pose_landmarks, 33),
+}
+
+
+class _Model:
+    """A MediaPipe graph plus the adapter that turns its results into numbers"""
+
+    def __init__(self, kind, options, indices=None):
+        build, self._landmarks, count = MODELS[kind]
+        self.graph = build(**options)
+        self.adapter = LandmarkAdapter(count, indices)
+
+    def process(self, rgb):
+        landmarks = self._landmarks(self.graph.process(rgb))
+        if landmarks is None:
+            return None
+        return self.adapter(landmarks)
+
+    def close(self):
+        self.graph.close()
+
+
+def create_backend(specs, kind="inprocess"):
+    """Build an inference backend.
+
+    ``specs`` maps a result name to ``(model kind, options)`` or
+    ``(model kind, options, landmark indices)``, e.g.
+    ``{"face": ("face_mesh", {...}, FACE_POINTS), "pose": ("pose", {...})}``.
+    ``process(rgb)`` takes one frame for every model, or a dict giving each
+    model its own input (a face crop, a downscaled body frame). Every
+    backend's ``process`` returns a dict with the same names mapped to
+    landmarks in normalised image coordinates, or None when nothing was
+    detected: an (N,3) float32 array of every landmark, or with landmark
+    indices a list of (x, y, z) rows for just those, in the order given.
+    ``latency`` holds each model's last inference time in seconds.
+    """
+    if kind == "process":
+        return ProcessBackend(specs)
+    return InProcessBackend(specs)
+
+
+# =================== IN-PROCESS ===================
+class InProcessBackend:
+    """Runs every model one after the other on the calling thread"""
+
+    def __init__(self, specs):
+        self.models = {name: _Model(*spec) for name, spec in specs.items()}
+        self.latency = {}
+
+    def process(self, rgb, names=None):
+        results = {}
+        for name, model in self.models.items():
+            if names is not None and name not in names:
+                continue
+            start = time.perf_counter()
+            results[name] = model.process(rgb[name] if isinstance(rgb, dict) else rgb)
+            self.latency[name] = time.perf_counter() - start
+        return results
+
+    def close(self):
+        for model in self.models.values():
+            model.close()
+        self.models = {}
+
+
+# =================== PROCESS POOL ===================
+def _inference_worker(conn, spec):
+    """Worker process loop: owns one MediaPipe graph and reads frames from shared memory"""
+    model = _Model(*spec)
+    segments = {}  # shared memory name -> (SharedMemory, ring of frames)
+
+    try:
+        while True:
+            message = conn.recv()
+            command = message[0]
+
+            if command == "stop":
+                break
+
+            if command == "detach":
+                shm, _ = segments.pop(message[1], (None, None))
+                if shm is not None:
+                    shm.close()
+                continue
+
+            if command == "process":
+                _, request_id, shm_name, ring_shape, slot = message
+                try:
+                    if shm_name not in segments:
+                        shm = shared_memory.SharedMemory(name=shm_name)
+                        ring = np.ndarray(ring_shape, dtype=np.uint8, buffer=shm.buf)
+                        segments[shm_name] = (shm, ring)
+                    landmarks = model.process(segments[shm_name][1][slot])
+                    conn.send((request_id, landmarks, None))
+                except Exception as e:
+                    conn.send((request_id, None, str(e)))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        for shm, _ in segments.values():
+            shm.close()
+        model.close()
+
+
+class ProcessBackend:
+    """Runs each model in its own worker process.
+
+    Frames are written once into a ring of ``multiprocessing.shared_memory``
+    slots and workers read them in place, so no pixels are pickled. Only the
+    landmarks a spec asks for travel back over the pipes: with indices that is
+    a dozen (x, y, z) tuples, not FaceMesh's 478x3 array. All workers get their
+    frames at once, so FaceMesh and Pose run in parallel on separate cores
+    and outside this process's GIL. There is one ring per input shape, and a
+    frame shared by several models is copied only once.
+    """
+
+    RING_SLOTS = 3
+    MAX_RINGS = 4
+    RESULT_TIMEOUT = 2.0
+
+    def __init__(self, specs):
+        self._ctx = mp_proc.get_context("spawn")
+        self._specs = specs
+        self._workers = {}
+        self.latency = {}
+        self._lock = threading.Lock()
+        self._request_ids = itertools.count(1)
+
+        # input shape -> [SharedMemory, ring, next slot], oldest first
+        self._rings = {}
+
+        for name in specs:
+            self._start_worker(name)
+
+    def _start_worker(self, name):
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=_inference_worker,
+            args=(child_conn, self._specs[name]),
+            name=f"inference-{name}",
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        self._workers[name] = (process, parent_conn)
+        print(f"🧠 Inference worker started: {name} (pid {process.pid})")
+
+    def _share(self, image):
+        """Copy a frame into the next slot of the ring for its shape"""
+        entry = self._rings.get(image.shape)
+        if entry is None:
+            if len(self._rings) >= self.MAX_RINGS:
+                self._release_ring(next(iter(self._rings)))
+            size = int(np.prod(image.shape)) * self.RING_SLOTS
+            shm = shared_memory.SharedMemory(create=True, size=size)
+            ring = np.ndarray((self.RING_SLOTS,) + image.shape, dtype=np.uint8, buffer=shm.buf)
+            entry = self._rings[image.shape] = [shm, ring, 0]
+
+        # Rotate slots so a worker still reading a timed-out frame is never overwritten
+        shm, ring, slot = entry
+        entry[2] = (slot + 1) % self.RING_SLOTS
+        np.copyto(ring[slot], image)
+        return shm.name, ring.shape, slot
+
+    def _release_ring(self, shape):
+        shm, _, _ = self._rings.pop(shape)
+        for _, conn in self._workers.values():
+            try:
+                conn.send(("detach", shm.name))
+            except (BrokenPipeError, OSError):
+                pass
+        shm.close()
+        shm.unlink()
+
+    def process(self, rgb, names=None):
+        with self._lock:
+            request_id = next(self._request_ids)
+            sent = time.perf_counter()
+            shared = {}  # id(image) -> shared slot, so one frame is copied once
+            pending = []
+            for name, (process, conn) in self._workers.items():
+                if names is not None and name not in names:
+                    continue
+                image = rgb[name] if isinstance(rgb, dict) else rgb
+                if id(image) not in shared:
+                    shared[id(image)] = self._share(image)
+                try:
+                    conn.send(("process", request_id) + shared[id(image)])
+                    pending.append(name)
+                except (BrokenPipeError, OSError):
+                    print(f"⚠️ Inference worker {name} died - restarting")
+                    self._start_worker(name)
+
+            results = {}
+            for name in pending:
+                results[name] = self._collect(name, request_id)
+                # Workers run concurrently, so this is an upper bound for the later ones
+                self.latency[name] = time.perf_counter() - sent
+            return results
+
+    def _collect(self, name, request_id):
+        process, conn = self._workers[name]
+        try:
+            while conn.poll(self.RESULT_TIMEOUT):
+                reply_id, landmarks, error = conn.recv()
+                if reply_id != request_id:
+                    continue  # late answer to a frame we already gave up on
+                if error:
+                    print(f"⚠️ {name} inference error: {error}")
+                return landmarks
+            print(f"⚠️ {name} inference timed out")
+        except (EOFError, OSError):
+            print(f"⚠️ Inference worker {name} died - restarting")
+            self._start_worker(name)
+        return None
+
+    def close(self):
+        with self._lock:
+            for process, conn in self._workers.values():
+                try:
+                    conn.send(("stop",))
+                except (BrokenPipeError, OSError):
+                    pass
+            for process, conn in self._workers.values():
+                process.join(timeout=2.0)
+                if process.is_alive():
+                    process.terminate()
+                conn.close()
+            self._workers = {}
+            for shape in list(self._rings):
+                self._release_ring(shape)
@@ -0,0 +1,32 @@
+from itertools import chain
+from operator import attrgetter
+
+import numpy as np
+
+_xyz = attrgetter("x", "y", "z")
+
+
+class LandmarkAdapter:
+    """Turns a MediaPipe landmark list into plain numbers, once per result.
+
+    Without ``indices`` every landmark is read into a new (N,3) float32
+    array. With ``indices`` only those landmarks are read, and they come back
+    as a list of (x, y, z) tuples in the order given: FaceMesh has 478
+    landmarks but the weekday analytics look at a dozen, too few for an
+    array to pay for itself. Either result belongs to the caller.
+    """
+
+    def __init__(self, count, indices=None):
+        self.count = count
+        self.indices = None if indices is None else [int(i) for i in indices]
+
+    def __call__(self, landmarks):
+        if self.indices is not None:
+            return [_xyz(landmarks[i]) for i in self.indices]
+        n = len(landmarks)
+        return np.fromiter(chain.from_iterable(map(_xyz, landmarks)), np.float32, 3 * n).reshape(n, 3)
+
+
+def rows(landmarks):
+    """(x, y, z) rows of landmarks given as rows or as an array"""
+    return landmarks.tolist() if isinstance(landmarks, np.ndarray) else landmarks
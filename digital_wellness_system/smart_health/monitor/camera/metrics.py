@@ -0,0 +1,130 @@
+import asyncio
+import json
+import threading
+import time
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class MetricsChannel:
+    """Latest analysis values of a camera, versioned for change-only pushes.
+
+    The analysis loop calls ``publish()`` once per frame; the version only
+    moves when a value actually changed, so a waiting client wakes up only
+    when there is something new to send. Async clients await the same
+    changes on their own event loop, as FrameHub subscribers do.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._values = {}
+        self._seq = 0
+        self._waiters = set()  # (loop, future) of async clients
+
+    def publish(self, values):
+        with self._cond:
+            changed = False
+            for key, value in values.items():
+                if self._values.get(key, self) != value:
+                    self._values[key] = value
+                    changed = True
+            if changed:
+                self._seq += 1
+                self._cond.notify_all()
+                for loop, future in self._waiters:
+                    loop.call_soon_threadsafe(_resolve, future)
+                self._waiters.clear()
+
+    def snapshot(self):
+        with self._cond:
+            return self._seq, dict(self._values)
+
+    def wait(self, seq, timeout=None):
+        """Return (seq, values) once newer than ``seq``, or as they are on timeout"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > seq, timeout)
+            return self._seq, dict(self._values)
+
+    async def wait_async(self, seq, timeout=None):
+        """Awaitable version of wait that blocks no thread"""
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            if self._seq > seq:
+                return self._seq, dict(self._values)
+            waiter = (loop, loop.create_future())
+            self._waiters.add(waiter)
+
+        try:
+            await asyncio.wait_for(waiter[1], timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._cond:
+                self._waiters.discard(waiter)
+        return self.snapshot()
+
+
+class _Deltas:
+    """What delta_events and async_delta_events share: pacing and diffing"""
+
+    def __init__(self, rate, keepalive):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.keepalive = keepalive
+        self.sent = {}
+        self.seq = -1
+        self.next_send = 0.0
+        self.last_event = time.monotonic()
+
+    def delay(self):
+        return self.next_send - time.monotonic()
+
+    def event(self, new_seq, values):
+        """The event to send for the channel state, or None"""
+        if new_seq == self.seq:
+            if time.monotonic() - self.last_event >= self.keepalive:
+                self.last_event = time.monotonic()
+                return ": keepalive\n\n"
+            return None
+        self.seq = new_seq
+
+        delta = {key: value for key, value in values.items() if self.sent.get(key, self.sent) != value}
+        if not delta:
+            return None
+        self.sent.update(delta)
+        self.last_event = time.monotonic()
+        self.next_send = self.last_event + self.interval
+        return f"data: {json.dumps(delta, separators=(',', ':'))}\n\n"
+
+
+def delta_events(channel, active, rate=5.0, keepalive=15.0):
+    """Server-sent events carrying only the values that changed.
+
+    The first event holds the full state, later ones just the changed keys.
+    At most ``rate`` events are sent per second; changes in between are
+    merged into the next event. A comment line is sent after ``keepalive``
+    quiet seconds so proxies keep the connection open. Ends once
+    ``active()`` is false.
+    """
+    deltas = _Deltas(rate, keepalive)
+    while active():
+        wait = deltas.delay()
+        if wait > 0:
+            time.sleep(wait)
+        event = deltas.event(*channel.wait(deltas.seq, timeout=1.0))
+        if event is not None:
+            yield event
+
+
+async def async_delta_events(channel, active, rate=5.0, keepalive=15.0):
+    """Async twin of delta_events for ASGI servers: awaits, never sleeps a thread"""
+    deltas = _Deltas(rate, keepalive)
+    while active():
+        wait = deltas.delay()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        event = deltas.event(*await channel.wait_async(deltas.seq, timeout=1.0))
+        if event is not None:
+            yield event
@@ -0,0 +1,196 @@
+import threading
+from collections import deque
+
+from .telemetry import telemetry
+
+
+class DropOldestQueue:
+    """Bounded FIFO that discards its oldest item instead of blocking.
+
+    Stages never wait on a slower downstream stage; when the queue is full
+    the stalest item is thrown away so end-to-end latency stays bounded.
+    """
+
+    def __init__(self, maxsize=1, dropped=None):
+        self.maxsize = max(1, int(maxsize))
+        self._dropped = dropped  # optional telemetry Counter
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        """Append ``item``; ignored once closed, so a stopping stage leaves nothing behind"""
+        with self._cond:
+            if self._closed:
+                return
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+                if self._dropped is not None:
+                    self._dropped.inc()
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Pop the oldest item, or return None on timeout/close"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self._closed, timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._items.clear()
+            self._cond.notify_all()
+
+    def reopen(self):
+        with self._cond:
+            self._closed = False
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+
+class FramePipeline:
+    """Staged capture -> infer -> annotate -> encode engine.
+
+    Each stage runs on its own thread and hands work to the next through a
+    DropOldestQueue, so overlay drawing and JPEG encoding of frame N overlap
+    with inference on frame N+1 (OpenCV and MediaPipe release the GIL while
+    they work). Capture is the camera's own background thread and
+    FrameBuffer. The pipeline exposes ``get_frame()`` and ``analyze_next()``
+    so it can stand in for the camera wherever a frame source is expected,
+    e.g. a FrameHub. After ``analyze_next()`` analysed frames are no longer
+    handed to the annotate and encode stages until ``get_frame()`` is called
+    again.
+    """
+
+    DEFAULT_QUEUE_DEPTHS = {
+        "annotate": 2,  # analysed frames waiting for overlays
+        "encode": 2,    # annotated frames waiting for JPEG encoding
+        "output": 1,    # encoded JPEGs waiting for the consumer
+    }
+    STAGE_TIMEOUT = 0.2
+
+    def __init__(self, camera, queue_depths=None):
+        self.camera = camera
+        depths = dict(self.DEFAULT_QUEUE_DEPTHS)
+        depths.update(queue_depths or {})
+        self.queues = {
+            name: DropOldestQueue(depth, dropped=telemetry.counter(
+                "monitor_frames_dropped_total", mode=camera.MODE, stage=name))
+            for name, depth in depths.items()
+        }
+
+        self._lock = threading.Lock()
+        self._running = False
+        self._threads = []
+
+        self.rendering = True
+        self._analysed = threading.Condition()
+        self.frames_analysed = 0
+
+    @property
+    def running(self):
+        return self._running
+
+    def start(self):
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            for queue in self.queues.values():
+                queue.reopen()
+            self._threads = [
+                threading.Thread(target=stage, name=f"pipeline-{name}", daemon=True)
+                for name, stage in (
+                    ("infer", self._infer_stage),
+                    ("annotate", self._annotate_stage),
+                    ("encode", self._encode_stage),
+                )
+            ]
+            for thread in self._threads:
+                thread.start()
+        print(f"🧵 Frame pipeline started for {type(self.camera).__name__}")
+
+    def stop(self):
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+            for queue in self.queues.values():
+                queue.close()
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=2.0)
+        print("🧵 Frame pipeline stopped")
+
+    def get_frame(self, timeout=0.5):
+        """Return the next encoded JPEG from the end of the pipeline"""
+        self.rendering = True
+        if not self._running:
+            self.start()
+        return self.queues["output"].get(timeout)
+
+    def analyze_next(self, timeout=0.5):
+        """Wait for the next frame to be analysed, with rendering switched off"""
+        self.rendering = False
+        if not self._running:
+            self.start()
+        with self._analysed:
+            seen = self.frames_analysed
+            return self._analysed.wait_for(lambda: self.frames_analysed > seen, timeout)
+
+    def stats(self):
+        stats = {f"{name}_dropped": queue.dropped for name, queue in self.queues.items()}
+        stats["frames_analysed"] = self.frames_analysed
+        if hasattr(self.camera, "capture_stats"):
+            stats.update(self.camera.capture_stats())
+        return stats
+
+    # ---------- STAGES ----------
+    def _infer_stage(self):
+        while self._running:
+            try:
+                frame = self.camera.get_raw_frame()
+                if frame is None:
+                    continue
+                result = self.camera.analyze(frame)
+                if self.rendering:
+                    self.queues["annotate"].put(result)
+                with self._analysed:
+                    self.frames_analysed += 1
+                    self._analysed.notify_all()
+            except Exception as e:
+                print(f"❌ Pipeline inference error: {e}")
+
+    def _annotate_stage(self):
+        while self._running:
+            item = self.queues["annotate"].get(self.STAGE_TIMEOUT)
+            if item is None:
+                continue
+            frame, overlay = item
+            try:
+                with self.camera.timers.time("overlay"):
+                    frame = self.camera.draw_overlay(frame, overlay)
+                self.queues["encode"].put(frame)
+            except Exception as e:
+                print(f"❌ Pipeline overlay error: {e}")
+
+    def _encode_stage(self):
+        while self._running:
+            frame = self.queues["encode"].get(self.STAGE_TIMEOUT)
+            if frame is None:
+                continue
+            try:
+                jpeg = self.camera.encode(frame)
+            except Exception as e:
+                print(f"❌ Pipeline encode error: {e}")
+                continue
+            if jpeg is not None:
+                self.queues["output"].put(jpeg)
@@ -0,0 +1,101 @@
+import threading
+import time
+
+
+class AnalyzerPool:
+    """Spare ready-built cameras per mode, handed out and taken back.
+
+    Building the FaceMesh and Pose graphs takes most of a second, so cameras
+    are built ahead of time - ``warm()`` keeps ``spares`` of each mode ready
+    - and reused: a station ``acquire()``s one when it starts a mode and
+    ``give_back()``s it when the session ends, after which it is reset and
+    waits for the next station. Acquiring never waits for a build unless
+    the pool has run dry.
+    """
+
+    def __init__(self, factories, spares=1):
+        """``factories`` maps a mode to a callable that builds its camera"""
+        self.factories = dict(factories)
+        self.spares = spares
+        self._idle = {mode: [] for mode in self.factories}
+        self._lock = threading.Lock()
+        self._building = set()
+
+    def _build(self, mode):
+        start = time.perf_counter()
+        camera = self.factories[mode]()
+        camera.warm_up()
+        print(f"🔥 {mode} analyzer ready in {time.perf_counter() - start:.2f}s")
+        return camera
+
+    def acquire(self, mode, source=None):
+        """A ready camera of ``mode`` reading ``source``, its analysis started over"""
+        with self._lock:
+            idle = self._idle[mode]
+            camera = idle.pop() if idle else None
+        if camera is None:
+            camera = self._build(mode)
+        if source is not None:
+            camera.use_source(source)
+        camera.reset()
+        # Top the spares up again - this station may switch mode next
+        self.warm()
+        return camera
+
+    def give_back(self, camera):
+        """Return a camera for reuse; beyond ``spares`` it is closed instead"""
+        camera.stop_recording()
+        camera.capture.detach(camera)
+        with self._lock:
+            idle = self._idle[camera.MODE]
+            if len(idle) < self.spares:
+                idle.append(camera)
+                return
+        camera.release()
+
+    def idle_count(self, mode):
+        with self._lock:
+            return len(self._idle[mode])
+
+    def warm(self, modes=None, background=True):
+        """Build spares of ``modes`` (default: all) until each has ``spares``"""
+        with self._lock:
+            modes = [
+                mode for mode in (modes or self.factories)
+                if len(self._idle[mode]) < self.spares and mode not in self._building
+            ]
+            self._building.update(modes)
+        if not modes:
+            return None
+
+        def build():
+            for mode in modes:
+                try:
+                    while self.idle_count(mode) < self.spares:
+                        camera = self._build(mode)
+                        with self._lock:
+                            self._idle[mode].append(camera)
+                except Exception as e:
+                    print(f"⚠️ Could not pre-build the {mode} analyzer: {e}")
+                finally:
+                    with self._lock:
+                        self._building.discard(mode)
+
+        if not background:
+            build()
+            return None
+        thread = threading.Thread(target=build, name="analyzer-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        """Close every spare camera and its models"""
+        with self._lock:
+            cameras = [camera for idle in self._idle.values() for camera in idle]
+            for idle in self._idle.values():
+                idle.clear()
+        for camera in cameras:
+            try:
+                camera.release()
+            except Exception as e:
+                print(f"Warning during {camera.MODE} cleanup: {e}")
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from .poses import LANDMARKS
+
+IMAGES_DIR = Path(__file__).resolve().parent.parent / "images"
+# Where indexes are cached unless told otherwise; never the package tree,
+# which may be read-only or shared between checkouts
+CACHE_DIR = Path(tempfile.gettempdir()) / "smart_health_pose_index"
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg"}
+
+# Body joints the embedding is built from, and each joint's left/right twin
+JOINT_NAMES = sorted(LANDMARKS, key=LANDMARKS.get)
+JOINTS = np.array([LANDMARKS[n] for n in JOINT_NAMES], dtype=np.intp)
+TWINS = np.array([
+    LANDMARKS[n.replace("left_", "right_") if n.startswith("left_") else n.replace("right_", "left_")]
+    for n in JOINT_NAMES
+], dtype=np.intp)
+_HIPS = [JOINT_NAMES.index("left_hip"), JOINT_NAMES.index("right_hip")]
+_SHOULDERS = [JOINT_NAMES.index("left_shoulder"), JOINT_NAMES.index("right_shoulder")]
+
+
+def embed_pose(points, mirror=False):
+    """Unit-length embedding of a pose that ignores position and scale.
+
+    Joints are centred on the hip midpoint and divided by the torso length
+    (hip midpoint to shoulder midpoint). ``mirror`` swaps left and right and
+    flips x, so a reference photo also matches the flipped webcam view.
+    """
+    xy = np.asarray(points, dtype=np.float64)[:, :2]
+    joints = xy[TWINS] * (-1, 1) if mirror else xy[JOINTS]
+    hips = joints[_HIPS].mean(axis=0)
+    shoulders = joints[_SHOULDERS].mean(axis=0)
+    torso = np.linalg.norm(shoulders - hips) or 1.0
+    embedding = ((joints - hips) / torso).ravel()
+    return (embedding / (np.linalg.norm(embedding) or 1.0)).astype(np.float32)
+
+
+def reference_images(images_dir=IMAGES_DIR):
+    return sorted(p for p in Path(images_dir).iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+
+
+def index_key(paths):
+    """Hash of the reference images' names, sizes and modification times.
+
+    A stat per image instead of reading megabytes of PNG on every start;
+    editing or replacing an image still changes the key.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        stat = path.stat()
+        digest.update(f"{path.name}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def label_for(path):
+    """'T-Pose.png' -> 'T Pose', matching the labels the classifier reports"""
+    return path.stem.replace("-", " ")
+
+
+def build_index(paths, backend=None):
+    """Run Pose once over every reference image.
+
+    Returns (embeddings, labels); each image contributes its own pose and
+    the mirrored one. Images where no pose is found are skipped.
+    """
+    from .inference import create_backend
+
+    own_backend = backend is None
+    if own_backend:
+        backend = create_backend({
+            "pose": ("pose", dict(static_image_mode=True, model_complexity=1)),
+        })
+
+    embeddings, labels = [], []
+    try:
+        for path in paths:
+            image = cv2.imread(str(path))
+            if image is None:
+                print(f"⚠️ Could not read reference image {path.name}")
+                continue
+            h, w, _ = image.shape
+            landmarks = backend.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB)).get("pose")
+            if landmarks is None:
+                print(f"⚠️ No pose found in reference image {path.name}")
+                continue
+            points = landmarks * (w, h, w)
+            for mirror in (False, True):
+                embeddings.append(embed_pose(points, mirror))
+                labels.append(label_for(path))
+    finally:
+        if own_backend:
+            backend.close()
+
+    dims = len(JOINTS) * 2
+    return np.array(embeddings, dtype=np.float32).reshape(-1, dims), labels
+
+
+def _write_atomically(path, write):
+    """Call ``write(file)`` on a temporary file, then move it to ``path``.
+
+    Readers - other workers building the same index - see either no file
+    or a complete one, never a half-written one.
+    """
+    fd, temp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+def load_index(images_dir=IMAGES_DIR, cache_dir=None):
+    """Load the reference index, building and caching it on first use.
+
+    The cache in ``cache_dir`` (CACHE_DIR by default) is keyed by index_key,
+    so editing or adding an image triggers exactly one rebuild. Embeddings
+    are opened with mmap, so loading an existing index costs next to nothing.
+    """
+    paths = reference_images(images_dir)
+    key = index_key(paths)
+    cache_dir = Path(cache_dir or CACHE_DIR)
+    embeddings_path = cache_dir / f"{key}.npy"
+    labels_path = cache_dir / f"{key}.json"
+
+    if not (embeddings_path.exists() and labels_path.exists()):
+        print(f"🧭 Building pose index from {len(paths)} reference images...")
+        embeddings, labels = build_index(paths)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        _write_atomically(labels_path, lambda f: f.write(json.dumps(labels).encode("utf-8")))
+        _write_atomically(embeddings_path, lambda f: np.save(f, embeddings))
+        print(f"✅ Pose index cached as {embeddings_path.name}")
+
+    embeddings = np.load(embeddings_path, mmap_mode="r")
+    labels = json.loads(labels_path.read_text())
+    return embeddings, labels
+
+
+class ReferencePoseClassifier:
+    """k-nearest-neighbour pose classifier over the reference image index.
+
+    Drop-in alternative to PoseClassifier: ``classify(points)`` takes the
+    same (33, 3) pixel landmark array and returns a label, or
+    "Unknown Pose" when no reference is within MAX_DISTANCE.
+    """
+
+    UNKNOWN = "Unknown Pose"
+    MAX_DISTANCE = 0.25  # squared distance between unit embeddings (0-4)
+
+    def __init__(self, k=1, images_dir=IMAGES_DIR, cache_dir=None):
+        self.k = k
+        self.embeddings, self.labels = load_index(images_dir, cache_dir)
+
+    def classify(self, points):
+        if not len(self.labels):
+            return self.UNKNOWN
+
+        query = embed_pose(points)
+        # |a - b|^2 = 2 - 2 a.b for unit vectors: one matrix-vector product
+        distances = 2.0 - 2.0 * (self.embeddings @ query)
+        k = min(self.k, len(distances))
+        nearest = np.argpartition(distances, k - 1)[:k]
+        nearest = nearest[distances[nearest] <= self.MAX_DISTANCE]
+        if nearest.size == 0:
+            return self.UNKNOWN
+
+        votes = {}
+        for i in nearest[np.argsort(distances[nearest])]:
+            votes[self.labels[i]] = votes.get(self.labels[i], 0) + 1
+        return max(votes, key=votes.get)
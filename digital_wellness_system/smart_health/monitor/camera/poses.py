@@ -0,0 +1,187 @@
+import numpy as np
+
+# MediaPipe Pose landmark indices used by the yoga classifier
+LANDMARKS = {
+    "left_shoulder": 11, "right_shoulder": 12,
+    "left_elbow": 13, "right_elbow": 14,
+    "left_wrist": 15, "right_wrist": 16,
+    "left_hip": 23, "right_hip": 24,
+    "left_knee": 25, "right_knee": 26,
+    "left_ankle": 27, "right_ankle": 28,
+}
+
+# Joint angle -> (a, b, c) landmarks; the angle is measured at b
+JOINT_ANGLES = {
+    "left_elbow": ("left_shoulder", "left_elbow", "left_wrist"),
+    "right_elbow": ("right_shoulder", "right_elbow", "right_wrist"),
+    "left_shoulder": ("left_elbow", "left_shoulder", "left_hip"),
+    "right_shoulder": ("right_hip", "right_shoulder", "right_elbow"),
+    "left_knee": ("left_hip", "left_knee", "left_ankle"),
+    "right_knee": ("right_hip", "right_knee", "right_ankle"),
+    "left_hip": ("left_shoulder", "left_hip", "left_knee"),
+    "right_hip": ("right_shoulder", "right_hip", "right_knee"),
+}
+
+# Extra feature -> (a, b): vertical pixel offset y[a] - y[b]
+Y_OFFSETS = {
+    "left_wrist_below_ankle": ("left_wrist", "left_ankle"),
+    "right_wrist_below_ankle": ("right_wrist", "right_ankle"),
+}
+
+INF = float("inf")
+
+# =================== POSE TABLE ===================
+# Each pose lists "all" - features that must lie strictly inside (min, max) -
+# and "any" - groups of which at least one feature must lie inside its range.
+# When several poses match, the one listed last wins. Adding a pose is a
+# new entry here; no code changes.
+POSE_TABLE = [
+    {
+        "label": "Virabhadrasana II",
+        "all": {
+            "left_elbow": (165, 195), "right_elbow": (165, 195),
+            "left_shoulder": (80, 110), "right_shoulder": (80, 110),
+        },
+        "any": [
+            {"left_knee": (165, 195), "right_knee": (165, 195)},
+            {"left_knee": (90, 120), "right_knee": (90, 120)},
+        ],
+    },
+    {
+        "label": "T Pose",
+        "all": {
+            "left_elbow": (165, 195), "right_elbow": (165, 195),
+            "left_shoulder": (80, 110), "right_shoulder": (80, 110),
+            "left_knee": (160, 195), "right_knee": (160, 195),
+        },
+    },
+    {
+        "label": "Vrikshasana",
+        "any": [
+            {"left_knee": (165, 195), "right_knee": (165, 195)},
+            {"left_knee": (315, 335), "right_knee": (25, 45)},
+        ],
+    },
+    {
+        "label": "Adho Mukha Svanasana",
+        "all": {
+            "left_elbow": (165, 195), "right_elbow": (165, 195),
+            "left_knee": (165, 195), "right_knee": (165, 195),
+            "left_hip": (60, 120), "right_hip": (60, 120),
+        },
+        "any": [
+            {"left_wrist_below_ankle": (0, INF), "right_wrist_below_ankle": (0, INF)},
+        ],
+    },
+    {
+        "label": "Uttanasana",
+        "all": {
+            "left_knee": (165, 195), "right_knee": (165, 195),
+            "left_hip": (20, 60), "right_hip": (20, 60),
+        },
+        "any": [
+            {"left_wrist_below_ankle": (-50, 50), "right_wrist_below_ankle": (-50, 50)},
+        ],
+    },
+    {
+        "label": "Utkatasana",
+        "all": {
+            "left_knee": (80, 120), "right_knee": (80, 120),
+            "left_hip": (80, 120), "right_hip": (80, 120),
+            "left_shoulder": (160, 200), "right_shoulder": (160, 200),
+            "left_elbow": (165, 195), "right_elbow": (165, 195),
+        },
+    },
+    {
+        "label": "Urdhva Hastasana",
+        "all": {
+            "left_knee": (165, 195), "right_knee": (165, 195),
+            "left_hip": (160, 195), "right_hip": (160, 195),
+            "left_shoulder": (160, 200), "right_shoulder": (160, 200),
+            "left_elbow": (165, 195), "right_elbow": (165, 195),
+        },
+    },
+]
+
+
+def _landmark_indices(names, table):
+    return np.array([[LANDMARKS[n] for n in table[name]] for name in names], dtype=np.intp)
+
+
+ANGLE_NAMES = list(JOINT_ANGLES)
+OFFSET_NAMES = list(Y_OFFSETS)
+FEATURE_NAMES = ANGLE_NAMES + OFFSET_NAMES
+ANGLE_TRIPLETS = _landmark_indices(ANGLE_NAMES, JOINT_ANGLES)
+OFFSET_PAIRS = _landmark_indices(OFFSET_NAMES, Y_OFFSETS)
+
+
+def joint_angles(points, triplets=ANGLE_TRIPLETS):
+    """Angles in degrees (0-180) at the middle landmark of every triplet.
+
+    ``points`` is an (N, 2+) array of pixel coordinates; all angles are
+    computed in one NumPy call.
+    """
+    a = points[triplets[:, 0], :2]
+    b = points[triplets[:, 1], :2]
+    c = points[triplets[:, 2], :2]
+    ba = a - b
+    bc = c - b
+    angle = np.abs(np.degrees(
+        np.arctan2(bc[:, 1], bc[:, 0]) - np.arctan2(ba[:, 1], ba[:, 0])
+    ))
+    return np.where(angle > 180, 360 - angle, angle)
+
+
+def pose_features(points):
+    """Joint angles followed by the vertical offsets, in FEATURE_NAMES order"""
+    offsets = points[OFFSET_PAIRS[:, 0], 1] - points[OFFSET_PAIRS[:, 1], 1]
+    return np.concatenate((joint_angles(points), offsets))
+
+
+class PoseClassifier:
+    """Checks every pose of an interval table with vectorized comparisons.
+
+    The table is compiled once into flat arrays of (feature, min, max) terms.
+    Terms are OR-ed into clauses and clauses AND-ed into poses with
+    ``reduceat``, so one classification is a fixed handful of NumPy calls
+    however many poses the table holds.
+    """
+
+    UNKNOWN = "Unknown Pose"
+
+    def __init__(self, table=POSE_TABLE):
+        self.labels = []
+        features, lows, highs, clause_starts, pose_starts = [], [], [], [], []
+
+        for pose in table:
+            self.labels.append(pose["label"])
+            pose_starts.append(len(clause_starts))
+            clauses = [{name: bounds} for name, bounds in pose.get("all", {}).items()]
+            clauses += pose.get("any", [])
+            if not clauses:
+                raise ValueError(f"Pose {pose['label']!r} has no constraints")
+            for clause in clauses:
+                clause_starts.append(len(features))
+                for name, (low, high) in clause.items():
+                    features.append(FEATURE_NAMES.index(name))
+                    lows.append(low)
+                    highs.append(high)
+
+        self._features = np.array(features, dtype=np.intp)
+        self._lows = np.array(lows, dtype=np.float64)
+        self._highs = np.array(highs, dtype=np.float64)
+        self._clause_starts = np.array(clause_starts, dtype=np.intp)
+        self._pose_starts = np.array(pose_starts, dtype=np.intp)
+
+    def matches(self, points):
+        """Boolean array: which table poses the landmarks satisfy"""
+        values = pose_features(np.asarray(points, dtype=np.float64))[self._features]
+        terms = (self._lows < values) & (values < self._highs)
+        clauses = np.logical_or.reduceat(terms, self._clause_starts)
+        return np.logical_and.reduceat(clauses, self._pose_starts)
+
+    def classify(self, points):
+        matched = np.flatnonzero(self.matches(points))
+        if matched.size == 0:
+            return self.UNKNOWN
+        return self.labels[matched[-1]]
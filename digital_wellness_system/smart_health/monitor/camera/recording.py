@@ -0,0 +1,141 @@
+import json
+import struct
+import threading
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b"SHLM"
+VERSION = 1
+HEADER_ALIGN = 64
+
+# Per-stream state byte stored with every frame
+MISSING, ESTIMATED, DETECTED = 0, 1, 2
+
+
+def _record_dtype(streams):
+    fields = [("time", "<f8"), ("width", "<u2"), ("height", "<u2")]
+    for name, indices in streams.items():
+        fields.append((f"{name}_state", "u1"))
+        fields.append((name, "<f4", (len(indices), 3)))
+    return np.dtype(fields)
+
+
+class LandmarkRecorder:
+    """Append-only writer of per-frame landmarks.
+
+    File layout: ``SHLM``, a version byte, the JSON header length, the JSON
+    header (padded to 64 bytes) and then fixed-size little-endian records -
+    timestamp, frame size and, per stream, a state byte plus the recorded
+    landmark rows. Records never change once written, so a file can be
+    memory-mapped while it grows, and a crash loses at most the last
+    partial record.
+    """
+
+    def __init__(self, path, streams, counts, meta=None):
+        """``streams`` maps a name to the landmark indices to keep and
+        ``counts`` to the full landmark count of that model."""
+        self.path = Path(path)
+        self.streams = {name: [int(i) for i in indices] for name, indices in streams.items()}
+        self.dtype = _record_dtype(self.streams)
+        self._record = np.zeros(1, dtype=self.dtype)
+        self._lock = threading.Lock()
+        self.frames = 0
+
+        header = json.dumps({
+            "streams": self.streams,
+            "counts": dict(counts),
+            "meta": meta or {},
+        }).encode("utf-8")
+        prefix = len(MAGIC) + 1 + 4
+        header += b" " * (-(prefix + len(header)) % HEADER_ALIGN)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "wb")
+        self._file.write(MAGIC + struct.pack("<BI", VERSION, len(header)) + header)
+
+    def append(self, timestamp, width, height, landmarks, detected=()):
+        """Write one frame. ``landmarks`` maps stream names to the rows of the
+        stream's indices, in that order, or None; names in ``detected`` came
+        from inference on this very frame."""
+        with self._lock:
+            if self._file is None:
+                return
+            record = self._record[0]
+            record["time"] = timestamp
+            record["width"] = width
+            record["height"] = height
+            for name in self.streams:
+                points = landmarks.get(name)
+                if points is None:
+                    record[f"{name}_state"] = MISSING
+                    record[name] = 0
+                else:
+                    record[f"{name}_state"] = DETECTED if name in detected else ESTIMATED
+                    record[name] = points
+            self._file.write(self._record.tobytes())
+            self.frames += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                print(f"📼 Landmark recording closed: {self.path.name} ({self.frames} frames)")
+
+
+class LandmarkRecording:
+    """Read-only, memory-mapped view of a recording"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            prefix = f.read(len(MAGIC) + 5)
+            if len(prefix) < len(MAGIC) + 5 or prefix[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{self.path.name} is not a landmark recording")
+            version, header_len = struct.unpack("<BI", prefix[len(MAGIC):])
+            if version != VERSION:
+                raise ValueError(f"Unsupported recording version {version}")
+            header = json.loads(f.read(header_len))
+
+        self.streams = header["streams"]
+        self.counts = header["counts"]
+        self.meta = header["meta"]
+        self.dtype = _record_dtype(self.streams)
+
+        offset = len(prefix) + header_len
+        # Ignore a partial record left by an interrupted writer
+        count = (self.path.stat().st_size - offset) // self.dtype.itemsize
+        if count:
+            self.records = np.memmap(self.path, dtype=self.dtype, mode="r", offset=offset, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def duration(self):
+        if not len(self):
+            return 0.0
+        return float(self.records["time"][-1] - self.records["time"][0])
+
+    def frame(self, i):
+        """(timestamp, width, height, landmarks, detected) of record ``i``.
+
+        Landmarks come back as read-only (N,3) arrays of the recorded rows,
+        in the order of the stream's indices - what the camera analysed.
+        """
+        record = self.records[i]
+        landmarks = {}
+        detected = set()
+        for name in self.streams:
+            state = record[f"{name}_state"]
+            if state == MISSING:
+                landmarks[name] = None
+                continue
+            landmarks[name] = record[name]
+            if state == DETECTED:
+                detected.add(name)
+        return float(record["time"]), int(record["width"]), int(record["height"]), landmarks, detected
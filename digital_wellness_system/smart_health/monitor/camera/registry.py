@@ -0,0 +1,165 @@
+import threading
+import time
+
+
+class Station:
+    """One session's monitoring of one camera.
+
+    Holds an analyzer per mode, taken from the pool the first time that mode
+    is used, and the hub streaming the active one. Switching mode stops one
+    hub and starts the other on the same capture, so the device stays open
+    and each analyzer keeps its own session totals. ``owner`` names the
+    person behind the session, for what is kept beyond it. ``clock`` gives
+    the monotonic time idleness is measured in, the hubs' ``idle_since``
+    included.
+    """
+
+    def __init__(self, camera, source, session, pool, start_hub, stop_hub=None, owner=None,
+                 clock=time.monotonic):
+        self.camera_name = camera
+        self.source = source
+        self.session = session
+        self.owner = owner or f"session:{session}"
+        self.pool = pool
+        self._start_hub = start_hub
+        self._on_hub_stopped = stop_hub
+        self.clock = clock
+
+        self.cameras = {}
+        self.mode = None
+        self.hub = None
+        self.lock = threading.Lock()
+        self.created = clock()
+        self.stopped_at = self.created
+
+    def __repr__(self):
+        return f"<Station {self.camera_name}/{self.session[:8]} {self.mode}>"
+
+    def camera(self, mode):
+        """The analyzer of ``mode`` while it is the active one, else None"""
+        return self.cameras.get(mode) if self.mode == mode else None
+
+    def ensure(self, mode):
+        """Return the running hub for ``mode``, switching the stream to it if needed"""
+        with self.lock:
+            if self.hub is not None and self.hub.running and self.mode == mode:
+                print(f"🔁 Joining running {mode} stream of {self.camera_name}")
+                return self.hub
+
+            start = time.perf_counter()
+            self._stop_hub()
+
+            # Coming back to a mode starts its analysis over, as a fresh page does
+            camera = self.cameras.get(mode)
+            if camera is None:
+                camera = self.cameras[mode] = self.pool.acquire(mode, self.source)
+            else:
+                camera.reset()
+
+            self.mode = mode
+            self.hub = self._start_hub(self, mode, camera)
+            print(f"🔀 {self.camera_name} switched to {mode} in {(time.perf_counter() - start) * 1000:.0f} ms")
+            return self.hub
+
+    def _stop_hub(self):
+        hub, self.hub = self.hub, None
+        if hub is not None:
+            hub.stop()
+            self.stopped_at = self.clock()
+        previous = self.cameras.get(self.mode)
+        if previous is not None:
+            previous.stop_recording()
+            if hub is not None and self._on_hub_stopped is not None:
+                self._on_hub_stopped(self, self.mode, previous)
+
+    def idle_for(self, now=None):
+        """Seconds nobody has watched or listened, 0 while somebody does.
+
+        A hub analysing headless is never idle: it runs to keep totals
+        that have not been saved yet.
+        """
+        now = self.clock() if now is None else now
+        hub = self.hub
+        if hub is None or not hub.running:
+            return now - self.stopped_at
+        if hub.idle_since is None or hub.analyzes_unwatched:
+            return 0.0
+        return now - hub.idle_since
+
+    def close(self):
+        """Stop streaming and give the analyzers back to the pool"""
+        with self.lock:
+            self._stop_hub()
+            self.mode = None
+            cameras, self.cameras = self.cameras, {}
+        for camera in cameras.values():
+            self.pool.give_back(camera)
+
+
+class CameraRegistry:
+    """Every station of the server, keyed by (camera name, session id).
+
+    Each camera name maps to a source - a webcam index or stream URL - and
+    every source has one SharedCapture, however many sessions watch it.
+    Each station runs its own hub (and pipeline) threads; OpenCV and
+    MediaPipe release the GIL while they work, so stations on different
+    desks run on different cores. Stations nobody has watched for
+    ``idle_timeout`` seconds are closed on the next lookup, unless they
+    are analysing headless.
+    """
+
+    def __init__(self, pool, start_hub, stop_hub=None, idle_timeout=None, clock=time.monotonic):
+        self.pool = pool
+        self.start_hub = start_hub
+        self.stop_hub = stop_hub
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        self._stations = {}
+        self._lock = threading.Lock()
+
+    def get(self, camera, source, session, owner=None):
+        """The station of ``camera`` for ``session``, created when missing"""
+        self.reap()
+        key = (camera, session)
+        with self._lock:
+            station = self._stations.get(key)
+            if station is None:
+                station = self._stations[key] = Station(
+                    camera, source, session, self.pool, self.start_hub, self.stop_hub, owner, self.clock)
+                print(f"🖥️ New station {station} ({len(self._stations)} active)")
+            return station
+
+    def find(self, camera, session):
+        with self._lock:
+            return self._stations.get((camera, session))
+
+    def stations(self):
+        with self._lock:
+            return list(self._stations.values())
+
+    def close(self, camera=None, session=None):
+        """Close the stations matching ``camera`` and/or ``session`` (all by default)"""
+        with self._lock:
+            keys = [
+                key for key in self._stations
+                if camera in (None, key[0]) and session in (None, key[1])
+            ]
+            stations = [self._stations.pop(key) for key in keys]
+        for station in stations:
+            station.close()
+        return len(stations)
+
+    def reap(self):
+        """Close stations that have been idle longer than ``idle_timeout``"""
+        if not self.idle_timeout:
+            return
+        now = self.clock()
+        with self._lock:
+            idle = [
+                key for key, station in self._stations.items()
+                if station.idle_for(now) > self.idle_timeout
+            ]
+            stations = [self._stations.pop(key) for key in idle]
+        for station in stations:
+            print(f"💤 Closing idle station {station}")
+            station.close()
@@ -0,0 +1,62 @@
+import cv2
+
+from .landmarks import rows
+
+# FaceMesh crops are resized to this square, so every ROI has the same shape
+ROI_SIZE = 256
+# Side of the crop relative to the span of the tracked face points
+ROI_SCALE = 3.0
+ROI_MIN_SIZE = 96
+
+
+def face_roi(landmarks, w, h, scale=ROI_SCALE, min_size=ROI_MIN_SIZE):
+    """Square pixel box (x0, y0, side) around the tracked face points.
+
+    ``landmarks`` are the (x, y, z) rows of the points to frame. The box is
+    ``scale`` times the larger extent of the points and is shifted - not
+    clipped - to stay inside the frame, so it stays square and resizing it
+    keeps the aspect ratio. Returns None if no usable box fits.
+    """
+    xs, ys, _ = zip(*rows(landmarks))
+    x_min, x_max = min(xs) * w, max(xs) * w
+    y_min, y_max = min(ys) * h, max(ys) * h
+    side = int(max(x_max - x_min, y_max - y_min, 1) * scale)
+    side = min(max(side, min_size), w, h)
+    if side >= min(w, h):
+        return None  # the crop would be (almost) the whole frame
+
+    cx, cy = (x_min + x_max) / 2, (y_min + y_max) / 2
+    x0 = int(min(max(cx - side / 2, 0), w - side))
+    y0 = int(min(max(cy - side / 2, 0), h - side))
+    return x0, y0, side
+
+
+def crop_roi(rgb, roi, size=ROI_SIZE):
+    x0, y0, side = roi
+    crop = rgb[y0:y0 + side, x0:x0 + side]
+    interpolation = cv2.INTER_AREA if side > size else cv2.INTER_LINEAR
+    return cv2.resize(crop, (size, size), interpolation=interpolation)
+
+
+def roi_to_frame(landmarks, roi, w, h):
+    """Map (x, y, z) rows normalised to the crop back to the full frame.
+
+    MediaPipe scales z like x, so it is rescaled with the crop width.
+    Returns new rows; the ones given are left untouched.
+    """
+    x0, y0, side = roi
+    sx, sy = side / w, side / h
+    ox, oy = x0 / w, y0 / h
+    return [(x * sx + ox, y * sy + oy, z * sx) for x, y, z in rows(landmarks)]
+
+
+def downscale(rgb, max_width):
+    """Resize to at most ``max_width`` pixels wide, keeping the aspect ratio.
+
+    Normalised landmarks need no mapping back: a uniform resize leaves them
+    unchanged.
+    """
+    h, w = rgb.shape[:2]
+    if not max_width or w <= max_width:
+        return rgb
+    return cv2.resize(rgb, (max_width, round(h * max_width / w)), interpolation=cv2.INTER_AREA)
@@ -0,0 +1,229 @@
+import math
+
+# A face is analysed at most this often; sizes the rings of time windows
+MAX_SAMPLE_RATE = 60
+
+
+class RollingWindow:
+    """Weighted mean and variance of the samples in a fixed-size ring.
+
+    Samples older than ``window`` seconds (when given) drop out as newer
+    ones arrive; the ring holds at most ``capacity`` samples, so memory is
+    fixed however long a session runs. Sums are kept up to date as samples
+    enter and leave - every update is O(1) - and recomputed from the ring
+    each time it wraps, so float error cannot build up over a long day.
+    """
+
+    def __init__(self, capacity, window=None):
+        self.capacity = capacity
+        self.window = window
+        self._times = [0.0] * capacity
+        self._values = [0.0] * capacity
+        self._weights = [0.0] * capacity
+        self.clear()
+
+    def clear(self):
+        self._start = 0  # oldest sample
+        self.count = 0
+        self._pushed = 0
+        self.weight = 0.0
+        self._sum = 0.0
+        self._sumsq = 0.0
+
+    def add(self, value, now=0.0, weight=1.0):
+        if self.count == self.capacity:
+            self._drop_oldest()
+        i = (self._start + self.count) % self.capacity
+        self._times[i] = now
+        self._values[i] = value
+        self._weights[i] = weight
+        self.count += 1
+        self.weight += weight
+        self._sum += weight * value
+        self._sumsq += weight * value * value
+
+        self._pushed += 1
+        if self._pushed % self.capacity == 0:
+            self._resum()
+        if self.window is not None:
+            self.expire(now)
+
+    def expire(self, now):
+        """Drop the samples older than the window"""
+        limit = now - self.window
+        while self.count and self._times[self._start] < limit:
+            self._drop_oldest()
+
+    def _drop_oldest(self):
+        i = self._start
+        weight, value = self._weights[i], self._values[i]
+        self.weight -= weight
+        self._sum -= weight * value
+        self._sumsq -= weight * value * value
+        self._start = (i + 1) % self.capacity
+        self.count -= 1
+        if not self.count:
+            self.weight = self._sum = self._sumsq = 0.0
+
+    def _resum(self):
+        self.weight = self._sum = self._sumsq = 0.0
+        for k in range(self.count):
+            i = (self._start + k) % self.capacity
+            weight, value = self._weights[i], self._values[i]
+            self.weight += weight
+            self._sum += weight * value
+            self._sumsq += weight * value * value
+
+    @property
+    def mean(self):
+        return self._sum / self.weight if self.weight > 0 else None
+
+    @property
+    def variance(self):
+        if self.weight <= 0:
+            return None
+        mean = self._sum / self.weight
+        return max(self._sumsq / self.weight - mean * mean, 0.0)
+
+    @property
+    def std(self):
+        variance = self.variance
+        return None if variance is None else math.sqrt(variance)
+
+
+class MinuteHistogram:
+    """Per-minute totals of a few named quantities for the last ``minutes``.
+
+    One row of floats per minute in a fixed ring; minutes without samples
+    read as zeros. ``rows()`` returns them oldest first, for trend charts.
+    """
+
+    def __init__(self, fields, minutes=60):
+        self.fields = tuple(fields)
+        self.minutes = minutes
+        self._rows = [[0.0] * len(self.fields) for _ in range(minutes)]
+        self._index = {name: i for i, name in enumerate(self.fields)}
+        self.clear()
+
+    def clear(self):
+        self._minute = None  # minute number of the newest row
+        for row in self._rows:
+            row[:] = [0.0] * len(self.fields)
+
+    def _row(self, now):
+        minute = int(now // 60)
+        if self._minute is None:
+            self._minute = minute
+        elif minute > self._minute:
+            # Zero the rows of the minutes skipped since the last sample
+            for m in range(max(self._minute + 1, minute - self.minutes + 1), minute + 1):
+                row = self._rows[m % self.minutes]
+                row[:] = [0.0] * len(self.fields)
+            self._minute = minute
+        elif minute <= self._minute - self.minutes:
+            return None  # older than the ring
+        return self._rows[minute % self.minutes]
+
+    def add(self, now, **amounts):
+        row = self._row(now)
+        if row is not None:
+            for name, amount in amounts.items():
+                row[self._index[name]] += amount
+
+    def totals(self):
+        """Each field summed over the minutes in the ring"""
+        return {name: sum(row[i] for row in self._rows) for name, i in self._index.items()}
+
+    def rows(self):
+        if self._minute is None:
+            return []
+        first = max(0, self._minute - self.minutes + 1)
+        return [
+            dict(minute=m, **dict(zip(self.fields, self._rows[m % self.minutes])))
+            for m in range(first, self._minute + 1)
+        ]
+
+
+class BlinkStatistics:
+    """Rolling fatigue measures of one face, all on the caller's monotonic clock.
+
+    Fed one ``sample()`` per detected face and one ``blink()`` per finished
+    blink, it gives over the last ``window`` seconds:
+
+      blink_rate      blinks per minute
+      ear_mean/std    eye aspect ratio level and steadiness
+      perclos         percent of the time the eyes were closed
+      blink_duration  mean closure time of a blink, in seconds
+
+    plus per-minute blinks, closed time and observed time for the last
+    ``history_minutes``. Memory is fixed; every update is O(1).
+    """
+
+    # Gaps longer than this (face lost) count as unobserved, not closed/open
+    MAX_GAP = 1.0
+
+    def __init__(self, window=60.0, history_minutes=60, max_rate=MAX_SAMPLE_RATE):
+        self.window = window
+        capacity = int(window * max_rate) + 1
+        self.ear = RollingWindow(capacity, window)
+        self.closed = RollingWindow(capacity, window)
+        # At most a few blinks a second are physically possible
+        self.blinks = RollingWindow(int(window * 4) + 1, window)
+        self.history = MinuteHistogram(("blinks", "closed_seconds", "observed_seconds"), history_minutes)
+        self.reset()
+
+    def reset(self):
+        self.ear.clear()
+        self.closed.clear()
+        self.blinks.clear()
+        self.history.clear()
+        self._last = None
+        self._last_closed = False
+
+    def sample(self, now, ear, closed):
+        """One detected face: its EAR and whether the eyes count as closed"""
+        self.ear.add(ear, now)
+        if self._last is not None:
+            # The time since the previous sample is credited to its state
+            dt = now - self._last
+            if 0 < dt <= self.MAX_GAP:
+                self.closed.add(1.0 if self._last_closed else 0.0, now, weight=dt)
+                self.history.add(
+                    now,
+                    closed_seconds=dt if self._last_closed else 0.0,
+                    observed_seconds=dt,
+                )
+        self._last = now
+        self._last_closed = closed
+
+    def blink(self, now, duration):
+        self.blinks.add(duration, now)
+        self.history.add(now, blinks=1)
+
+    def blink_rate(self, now):
+        """Blinks per minute over the window"""
+        self.blinks.expire(now)
+        return round(self.blinks.count * 60.0 / self.window)
+
+    def history_perclos(self):
+        """PERCLOS over the whole per-minute history, or None before any data"""
+        totals = self.history.totals()
+        if not totals["observed_seconds"]:
+            return None
+        return round(totals["closed_seconds"] / totals["observed_seconds"] * 100, 1)
+
+    def snapshot(self, now):
+        for ring in (self.ear, self.closed, self.blinks):
+            ring.expire(now)
+        perclos = self.closed.mean
+        return {
+            "blink_rate": self.blink_rate(now),
+            "ear_mean": _rounded(self.ear.mean, 3),
+            "ear_std": _rounded(self.ear.std, 3),
+            "perclos": _rounded(None if perclos is None else perclos * 100, 1),
+            "blink_duration": _rounded(self.blinks.mean, 2),
+        }
+
+
+def _rounded(value, digits):
+    return None if value is None else round(value, digits)
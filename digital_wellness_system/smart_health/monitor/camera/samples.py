@@ -0,0 +1,72 @@
+class SampleAggregator:
+    """Folds per-frame weekday results into one sample every ``interval`` seconds.
+
+    ``add()`` only updates a few running totals; when an interval is over,
+    its sample (a plain dict) is handed to ``sink``, which must not block -
+    typically ``BufferedWriter.add``. Times are on the camera's clock.
+    """
+
+    def __init__(self, sink, interval=5.0):
+        self.sink = sink
+        self.interval = interval
+        self._start = None
+        self._clear()
+
+    def _clear(self):
+        self._last = None
+        self.frames = 0
+        self.statuses = {}  # status -> seconds
+        self.face_seconds = 0.0
+        self.bad_seconds = 0.0
+        self.blinks = 0
+        self._ear_sum = 0.0
+        self._ear_count = 0
+        self._blink_rate = None
+        self._perclos = None
+
+    def add(self, now, status, bad, face, ear=None, blinks=0, blink_rate=None, perclos=None):
+        if self._start is None:
+            self._start = now
+        # Each frame lasts until the next one
+        dt = now - self._last if self._last is not None else 0.0
+        self._last = now
+
+        self.frames += 1
+        self.statuses[status] = self.statuses.get(status, 0.0) + dt
+        if face:
+            self.face_seconds += dt
+        if bad:
+            self.bad_seconds += dt
+        self.blinks += blinks
+        if ear is not None:
+            self._ear_sum += ear
+            self._ear_count += 1
+        if blink_rate is not None:
+            self._blink_rate = blink_rate
+        if perclos is not None:
+            self._perclos = perclos
+
+        if now - self._start >= self.interval:
+            self.flush(now)
+
+    def flush(self, now=None):
+        """Emit the interval so far, if any frame was added"""
+        if not self.frames:
+            return
+        now = self._last if now is None else now
+        status = max(self.statuses, key=self.statuses.get)
+        sample = {
+            "seconds": round(now - self._start, 3),
+            "frames": self.frames,
+            "status": status,
+            "face_seconds": round(self.face_seconds, 3),
+            "bad_seconds": round(self.bad_seconds, 3),
+            "blinks": self.blinks,
+            "ear": round(self._ear_sum / self._ear_count, 4) if self._ear_count else None,
+            "blink_rate": self._blink_rate,
+            "perclos": self._perclos,
+        }
+        self._start = now
+        self._clear()
+        self._last = now
+        self.sink(sample)
@@ -0,0 +1,122 @@
+import math
+
+from .landmarks import rows
+
+
+class _Track:
+    """Last two detections of one model, for holding or extrapolating"""
+
+    def __init__(self):
+        self.landmarks = None
+        self.time = None
+        self.latency = None   # smoothed inference time in seconds
+        self._previous = None  # (landmarks, time) of the detection before
+        self._velocity = None
+
+    def update(self, landmarks, timestamp):
+        if landmarks is None:
+            self.landmarks = self.time = self._previous = self._velocity = None
+            return
+        if self.landmarks is not None and timestamp > self.time:
+            self._previous = (self.landmarks, self.time)
+        else:
+            self._previous = None
+        self._velocity = None
+        # Arrays become new rows, so a backend reusing its array is harmless
+        self.landmarks = rows(landmarks)
+        self.time = timestamp
+
+    @property
+    def velocity(self):
+        """Per-row (x, y, z) change per second over the last two detections.
+
+        Only worked out when a frame is actually estimated, so a model that
+        runs on every frame never pays for it. None when unknown.
+        """
+        if self._previous is not None:
+            previous, then = self._previous
+            self._previous = None
+            if len(previous) == len(self.landmarks):
+                dt = self.time - then
+                self._velocity = [
+                    ((x1 - x0) / dt, (y1 - y0) / dt, (z1 - z0) / dt)
+                    for (x1, y1, z1), (x0, y0, z0) in zip(self.landmarks, previous)
+                ]
+        return self._velocity
+
+
+class InferenceScheduler:
+    """Runs each model at its own rate and fills in landmarks in between.
+
+    ``intervals`` maps a model name to "run every Nth frame"; ``budgets``
+    maps a name to a per-frame time budget in seconds, in which case the
+    interval adapts to the model's measured latency (a 30 ms model with a
+    10 ms budget runs every 3rd frame). Between runs ``landmarks()`` returns
+    the last detection moved along its velocity - or held still when
+    ``extrapolate`` is off - for at most MAX_HOLD seconds. Landmarks are
+    kept and returned as (x, y, z) rows, the form the weekday models give.
+    """
+
+    MAX_HOLD = 1.0
+    MAX_INTERVAL = 10
+    LATENCY_SMOOTHING = 0.2
+
+    def __init__(self, names, intervals=None, budgets=None, extrapolate=True):
+        self.names = list(names)
+        self.intervals = {name: 1 for name in self.names}
+        self.intervals.update(intervals or {})
+        self.budgets = dict(budgets or {})
+        self.extrapolate = extrapolate
+
+        self._tracks = {name: _Track() for name in self.names}
+        self._countdown = {name: 0 for name in self.names}
+
+    def interval(self, name):
+        budget = self.budgets.get(name)
+        latency = self._tracks[name].latency
+        if budget and latency:
+            return max(1, min(self.MAX_INTERVAL, math.ceil(latency / budget)))
+        return max(1, int(self.intervals.get(name, 1)))
+
+    def due(self):
+        """Names of the models that should run on this frame"""
+        due = []
+        for name in self.names:
+            if self._countdown[name] <= 0 or self._tracks[name].landmarks is None:
+                due.append(name)
+                self._countdown[name] = self.interval(name)
+            self._countdown[name] -= 1
+        return due
+
+    def update(self, name, landmarks, timestamp, latency=None):
+        """Record a fresh inference result (None when nothing was detected)"""
+        track = self._tracks[name]
+        track.update(landmarks, timestamp)
+        if latency is not None:
+            if track.latency is None:
+                track.latency = latency
+            else:
+                track.latency += self.LATENCY_SMOOTHING * (latency - track.latency)
+
+    def landmarks(self, name, timestamp):
+        """Best landmark estimate for ``timestamp``, or None if too stale"""
+        track = self._tracks[name]
+        if track.landmarks is None:
+            return None
+        age = timestamp - track.time
+        if age <= 0:
+            return track.landmarks
+        if age > self.MAX_HOLD:
+            return None
+        velocity = track.velocity if self.extrapolate else None
+        if velocity is not None:
+            return [
+                (x + vx * age, y + vy * age, z + vz * age)
+                for (x, y, z), (vx, vy, vz) in zip(track.landmarks, velocity)
+            ]
+        return track.landmarks
+
+    def reset(self):
+        for name in self.names:
+            self._tracks[name] = _Track()
+            self._countdown[name] = 0
@@ -0,0 +1,174 @@
+import time
+
+import cv2
+import numpy as np
+
+# Every source mimics the part of cv2.VideoCapture the cameras use:
+# read() -> (ok, frame), isOpened() and release().
+
+
+class _Pacer:
+    """Sleeps so frames come out no faster than ``fps`` (no-op when None)"""
+
+    def __init__(self, fps):
+        self.interval = 1.0 / fps if fps else 0.0
+        self._next = None
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if self._next is not None and self._next > now:
+            time.sleep(self._next - now)
+            now = self._next
+        self._next = now + self.interval
+
+
+class DeviceSource:
+    """A webcam (index) or network stream (URL) opened through OpenCV"""
+
+    def __init__(self, device=0):
+        self.device = device
+        self.cap = cv2.VideoCapture(device)
+
+    def read(self):
+        return self.cap.read()
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class FileSource:
+    """Frames decoded from a video file.
+
+    With ``loop`` the file restarts when it ends, so a short clip can stand
+    in for a webcam indefinitely. ``realtime`` paces reads to the file's
+    frame rate; leave it off to decode as fast as possible.
+    """
+
+    def __init__(self, path, loop=False, realtime=False):
+        self.path = str(path)
+        self.loop = loop
+        self.cap = cv2.VideoCapture(self.path)
+        fps = self.cap.get(cv2.CAP_PROP_FPS) if self.cap.isOpened() else 0
+        self.fps = fps if fps and fps == fps else 30.0
+        self._pacer = _Pacer(self.fps if realtime else None)
+
+    def read(self):
+        self._pacer.wait()
+        ok, frame = self.cap.read()
+        if not ok and self.loop and self.cap.isOpened():
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.cap.read()
+        return ok, frame
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class ClipSource:
+    """Loops over frames held in memory - no decoding cost at all.
+
+    ``frames`` is a list of BGR images, e.g. a clip loaded once with
+    ``ClipSource.from_file``. Each read returns a copy, because the cameras
+    flip and draw on the frames they are given.
+    """
+
+    def __init__(self, frames, fps=None):
+        if not len(frames):
+            raise ValueError("ClipSource needs at least one frame")
+        self.frames = frames
+        self._pos = 0
+        self._pacer = _Pacer(fps)
+        self._open = True
+
+    @classmethod
+    def from_file(cls, path, size=None, max_frames=300, fps=None):
+        cap = cv2.VideoCapture(str(path))
+        frames = []
+        while len(frames) < max_frames:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            frames.append(cv2.resize(frame, size) if size else frame)
+        cap.release()
+        return cls(frames, fps)
+
+    def read(self):
+        if not self._open:
+            return False, None
+        self._pacer.wait()
+        frame = self.frames[self._pos].copy()
+        self._pos = (self._pos + 1) % len(self.frames)
+        return True, frame
+
+    def isOpened(self):
+        return self._open
+
+    def release(self):
+        self._open = False
+
+
+class SyntheticSource(ClipSource):
+    """Generated frames at any resolution, for running without a camera.
+
+    An optional ``image`` (e.g. one of the reference pose photos) is
+    letterboxed into the frame so the models have something to find; a bar
+    sweeps across so consecutive frames differ.
+    """
+
+    def __init__(self, width=640, height=480, image=None, frames=30, fps=None):
+        background = np.full((height, width, 3), 96, dtype=np.uint8)
+        if image is not None:
+            if isinstance(image, (str, bytes)) or hasattr(image, "__fspath__"):
+                image = cv2.imread(str(image))
+            if image is None:
+                raise ValueError("SyntheticSource could not read the image")
+            scale = min(width / image.shape[1], height / image.shape[0])
+            w, h = int(image.shape[1] * scale), int(image.shape[0] * scale)
+            x, y = (width - w) // 2, (height - h) // 2
+            background[y:y + h, x:x + w] = cv2.resize(image, (w, h))
+
+        clip = []
+        bar = max(4, width // 40)
+        for i in range(frames):
+            frame = background.copy()
+            x = int(i * (width - bar) / max(1, frames - 1))
+            frame[:height // 16, x:x + bar] = 255
+            clip.append(frame)
+        super().__init__(clip, fps)
+
+
+def open_source(spec=0):
+    """Open a frame source from a short description.
+
+    0, "0", "1"...       webcam by index
+    "rtsp://...", etc.   network stream
+    "file:PATH"          video file, decoded once
+    "loop:PATH"          video file, restarted at the end, paced to its fps
+    "synthetic:WxH"      generated frames (e.g. "synthetic:1280x720")
+    anything else that is an object with read() is returned as is.
+    """
+    if hasattr(spec, "read"):
+        return spec
+    if isinstance(spec, int):
+        return DeviceSource(spec)
+
+    spec = str(spec)
+    if spec.isdigit():
+        return DeviceSource(int(spec))
+    kind, _, arg = spec.partition(":")
+    if kind == "file":
+        return FileSource(arg)
+    if kind == "loop":
+        return FileSource(arg, loop=True, realtime=True)
+    if kind == "synthetic":
+        width, _, height = (arg or "640x480").partition("x")
+        return SyntheticSource(int(width), int(height), fps=30)
+    return DeviceSource(spec)
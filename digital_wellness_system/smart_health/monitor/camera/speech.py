@@ -0,0 +1,210 @@
+import hashlib
+import heapq
+import itertools
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from .telemetry import telemetry
+
+# Alerts the cameras speak; each is synthesized to an audio file once, when
+# the worker starts, and from then on just played back
+PHRASES = ("You look drowsy", "Bad posture detected")
+
+# Lower is more urgent
+URGENT = 0
+NORMAL = 1
+
+
+def _pyttsx3_engine(rate):
+    import pyttsx3
+    engine = pyttsx3.init()
+    engine.setProperty("rate", rate)
+    return engine
+
+
+def _audio_player():
+    """A callable playing an audio file to the end, or None if there is none"""
+    if sys.platform == "win32":
+        import winsound
+        return lambda path: winsound.PlaySound(path, winsound.SND_FILENAME)
+    for command in (["afplay"], ["paplay"], ["aplay", "-q"]):
+        if shutil.which(command[0]):
+            return lambda path, command=command: subprocess.run(
+                command + [path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return None
+
+
+class SpeechWorker:
+    """The one thread that speaks every alert of the server.
+
+    ``say()`` puts the text on a small priority queue and returns at once,
+    so a camera loop never waits for the speech driver. The worker thread
+    owns the pyttsx3 engine - it is not safe to drive from several threads -
+    and speaks the queue most urgent first. An alert storm stays bounded:
+    text already waiting, or spoken less than ``repeat_interval`` seconds
+    ago, is dropped, and a full queue gives way only to a more urgent alert.
+
+    The fixed ``phrases`` are synthesized to files in ``cache_dir`` and
+    played from there when the platform has an audio player; anything else
+    is spoken live.
+    """
+
+    def __init__(self, max_queued=4, repeat_interval=10.0, cache_dir=None,
+                 rate=165, phrases=PHRASES, engine_factory=_pyttsx3_engine,
+                 player=_audio_player, clock=time.monotonic):
+        self.max_queued = max_queued
+        self.repeat_interval = repeat_interval
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "smart_health_speech")
+        self.rate = rate
+        self.phrases = tuple(phrases)
+        self.engine_factory = engine_factory
+        self.player_factory = player
+        self.clock = clock
+
+        self._queue = []  # (priority, order, text)
+        self._order = itertools.count()
+        self._last_spoken = {}
+        self._ready = threading.Condition()
+        self._thread = None
+        self._running = False
+
+        self.engine = None
+        self.player = None
+        self.cached = {}  # text -> audio file
+
+    # ---------- Producers ----------
+    def say(self, text, priority=NORMAL):
+        """Queue ``text`` to be spoken; never blocks. True if it was queued."""
+        self.start()
+        with self._ready:
+            outcome = self._admit(text, priority)
+            if outcome == "queued":
+                self._ready.notify()
+        telemetry.counter("monitor_speech_alerts_total", outcome=outcome).inc()
+        return outcome == "queued"
+
+    def _admit(self, text, priority):
+        if any(queued == text for _, _, queued in self._queue):
+            return "coalesced"
+        spoken = self._last_spoken.get(text)
+        if spoken is not None and self.clock() - spoken < self.repeat_interval:
+            return "coalesced"
+
+        if len(self._queue) >= self.max_queued:
+            # Make room by evicting the least urgent, newest alert - if it is
+            # less urgent than this one
+            least = max(self._queue)
+            if least[0] <= priority:
+                return "dropped"
+            self._queue.remove(least)
+            heapq.heapify(self._queue)
+            telemetry.counter("monitor_speech_alerts_total", outcome="dropped").inc()
+
+        heapq.heappush(self._queue, (priority, next(self._order), text))
+        return "queued"
+
+    @property
+    def pending(self):
+        with self._ready:
+            return len(self._queue)
+
+    # ---------- Worker ----------
+    def start(self):
+        """Start the worker thread, which first builds the phrase cache"""
+        with self._ready:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="speech", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """Stop after the alert being spoken; queued ones are discarded"""
+        with self._ready:
+            self._running = False
+            self._queue.clear()
+            self._ready.notify()
+            thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def _run(self):
+        try:
+            self.engine = self.engine_factory(self.rate)
+        except Exception as e:
+            print(f"⚠️ TTS engine failed to initialize: {e}")
+        self._build_cache()
+
+        me = threading.current_thread()
+        while True:
+            with self._ready:
+                while self._running and self._thread is me and not self._queue:
+                    self._ready.wait()
+                if not self._running or self._thread is not me:
+                    break
+                _, _, text = heapq.heappop(self._queue)
+                # Counted from the start, so an alert raised while it is
+                # still being spoken is not repeated right after it
+                self._last_spoken[text] = self.clock()
+
+            try:
+                outcome = "spoken" if self._speak(text) else "failed"
+            except Exception as e:
+                print(f"⚠️ Could not speak {text!r}: {e}")
+                outcome = "failed"
+            telemetry.counter("monitor_speech_alerts_total", outcome=outcome).inc()
+
+    def _speak(self, text):
+        path = self.cached.get(text)
+        if path is not None:
+            self.player(path)
+        elif self.engine is not None:
+            self.engine.say(text)
+            self.engine.runAndWait()
+        else:
+            return False
+        return True
+
+    def _build_cache(self):
+        """Synthesize the fixed phrases once; files survive server restarts"""
+        if self.engine is None or not self.phrases:
+            return
+        try:
+            self.player = self.player_factory() if self.player_factory else None
+        except Exception:
+            self.player = None
+        if self.player is None:
+            return
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        start = time.perf_counter()
+        for text in self.phrases:
+            key = hashlib.sha1(f"{self.rate}:{text}".encode()).hexdigest()[:16]
+            path = os.path.join(self.cache_dir, f"{key}.wav")
+            try:
+                if not os.path.exists(path) or not os.path.getsize(path):
+                    self.engine.save_to_file(text, path)
+                    self.engine.runAndWait()
+                if os.path.getsize(path):
+                    self.cached[text] = path
+            except Exception as e:
+                print(f"⚠️ Could not synthesize {text!r}: {e}")
+        print(f"🔊 {len(self.cached)} alert phrases cached in {time.perf_counter() - start:.2f}s")
+
+
+# Shared by every camera that is not handed a worker of its own
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_worker():
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = SpeechWorker()
+        return _default
@@ -0,0 +1,212 @@
+import bisect
+import threading
+import time
+
+# Histogram bucket upper bounds in seconds - from a sub-millisecond flip to
+# a stalled one-second read
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.02, 0.035, 0.05, 0.075, 0.1, 0.25, 0.5, 1.0)
+
+# Samples each histogram keeps for its rolling percentiles
+RECENT_SAMPLES = 256
+QUANTILES = (0.5, 0.95, 0.99)
+
+# name -> (type, help) of every metric family the monitor exports
+FAMILIES = {
+    "monitor_stage_seconds": (
+        "histogram", "Time spent in each per-frame stage"),
+    "monitor_stage_recent_seconds": (
+        "gauge", "Per-stage time percentiles over the most recent frames"),
+    "monitor_frames_dropped_total": (
+        "counter", "Frames discarded before they were analysed or sent"),
+    "monitor_inference_errors_total": (
+        "counter", "Frames whose landmark inference raised an error"),
+    "monitor_stream_frames_sent_total": (
+        "counter", "JPEG frames written to video stream clients"),
+    "monitor_stream_clients": (
+        "gauge", "Connected video and metrics stream clients"),
+    "monitor_db_rows_written_total": (
+        "counter", "Rows saved by the background database writers"),
+    "monitor_db_rows_dropped_total": (
+        "counter", "Rows the background database writers had to discard"),
+    "monitor_speech_alerts_total": (
+        "counter", "Spoken alerts by outcome: queued, coalesced, dropped, spoken or failed"),
+}
+
+
+class Counter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class Gauge(Counter):
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def set(self, value):
+        with self._lock:
+            self.value = value
+
+
+class Histogram:
+    """Cumulative bucket counts plus a ring of the latest samples.
+
+    The buckets never reset, as Prometheus expects; the ring gives the
+    percentiles of roughly the last RECENT_SAMPLES frames, so a slowdown
+    shows up right away instead of being averaged into the whole uptime.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._recent = [0.0] * RECENT_SAMPLES
+
+    def observe(self, seconds):
+        i = bisect.bisect_left(BUCKETS, seconds)
+        with self._lock:
+            self._recent[self.count % RECENT_SAMPLES] = seconds
+            self.buckets[i] += 1
+            self.sum += seconds
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            recent = self._recent[:min(self.count, RECENT_SAMPLES)]
+            return list(self.buckets), self.sum, self.count, recent
+
+
+class _Timing:
+    __slots__ = ("timers", "stage", "start")
+
+    def __init__(self, timers, stage):
+        self.timers = timers
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timers.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class StageTimers:
+    """Per-stage histograms of one mode, looked up once and then cached"""
+
+    def __init__(self, registry, mode):
+        self.registry = registry
+        self.mode = mode
+        self._histograms = {}
+
+    def observe(self, stage, seconds):
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            histogram = self._histograms[stage] = self.registry.histogram(
+                "monitor_stage_seconds", mode=self.mode, stage=stage)
+        histogram.observe(seconds)
+
+    def time(self, stage):
+        """``with timers.time("encode"):`` records how long the block took"""
+        return _Timing(self, stage)
+
+
+class Telemetry:
+    """Process-wide registry of hot-path counters, gauges and histograms.
+
+    Every series is created on first use and lives for the whole process,
+    so counters keep counting across camera restarts and mode switches.
+    Recording a value is a dict lookup and one uncontended lock; all the
+    formatting happens in ``render()`` when somebody scrapes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}  # (family, sorted labels) -> metric
+        self._timers = {}
+
+    def _get(self, family, cls, labels):
+        key = (family, tuple(sorted(labels.items())))
+        metric = self._series.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._series.setdefault(key, cls())
+        return metric
+
+    def counter(self, family, **labels):
+        return self._get(family, Counter, labels)
+
+    def gauge(self, family, **labels):
+        return self._get(family, Gauge, labels)
+
+    def histogram(self, family, **labels):
+        return self._get(family, Histogram, labels)
+
+    def timers(self, mode):
+        """Shared StageTimers of ``mode``"""
+        timers = self._timers.get(mode)
+        if timers is None:
+            with self._lock:
+                timers = self._timers.setdefault(mode, StageTimers(self, mode))
+        return timers
+
+    def render(self):
+        """Every series in the Prometheus text exposition format"""
+        with self._lock:
+            series = sorted(self._series.items(), key=lambda item: item[0])
+
+        samples = {family: [] for family in FAMILIES}
+        for (family, labels), metric in series:
+            if isinstance(metric, Histogram):
+                buckets, total, count, recent = metric.snapshot()
+                cumulative = 0
+                for bound, n in zip(BUCKETS + ("+Inf",), buckets):
+                    cumulative += n
+                    samples[family].append((f"{family}_bucket", labels + (("le", bound),), cumulative))
+                samples[family].append((f"{family}_sum", labels, total))
+                samples[family].append((f"{family}_count", labels, count))
+                if recent:
+                    recent.sort()
+                    for q in QUANTILES:
+                        value = recent[min(len(recent) - 1, int(q * len(recent)))]
+                        samples["monitor_stage_recent_seconds"].append(
+                            ("monitor_stage_recent_seconds", labels + (("quantile", q),), value))
+            else:
+                samples.setdefault(family, []).append((family, labels, metric.value))
+
+        lines = []
+        for family, rows in samples.items():
+            if not rows:
+                continue
+            kind, help_text = FAMILIES.get(family, ("untyped", family))
+            lines.append(f"# HELP {family} {help_text}")
+            lines.append(f"# TYPE {family} {kind}")
+            for name, labels, value in rows:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+    return "{" + pairs + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+telemetry = Telemetry()
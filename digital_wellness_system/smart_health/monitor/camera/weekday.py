@@ -1,29 +1,32 @@
 import cv2
-import mediapipe as mp
 import math
 import time
-import pyttsx3
-from collections import deque
+import uuid
 from .base_camera import VideoCamera
-import threading
-
-
-# =================== VOICE ===================
-try:
-    engine = pyttsx3.init()
-    engine.setProperty("rate", 165)
-except:
-    engine = None
-    print("⚠️ TTS engine failed to initialize")
-
-def speak(text):
-    if engine:
-        threading.Thread(
-            target=lambda: (engine.say(text), engine.runAndWait()),
-            daemon=True
-        ).start()
+from .inference import create_backend
+from .landmarks import rows
+from .scheduler import InferenceScheduler
+from .roi import face_roi, crop_roi, roi_to_frame, downscale
+from .rolling import BlinkStatistics, RollingWindow
+from .baseline import PostureBaseline, DriftDetector
+from .samples import SampleAggregator
+from . import speech
+
+
+# =================== LANDMARKS ===================
+LEFT_EYE = [33, 159, 158, 133, 153, 145]
+RIGHT_EYE = [362, 386, 385, 263, 380, 374]
+NOSE_TIP = 1
+SHOULDERS = [11, 12]
+
+# The only FaceMesh points the analytics read. The models hand back just
+# these, as (x, y, z) rows in this order: both eyes, then the nose tip
+FACE_POINTS = LEFT_EYE + RIGHT_EYE + [NOSE_TIP]
+NOSE_ROW = FACE_POINTS.index(NOSE_TIP)
 
 # =================== HELPERS ===================
+# A dozen points are too few for NumPy calls to pay off: the per-frame
+# math works on the plain numbers of the rows
 def dist(p1, p2):
     return math.hypot(p1[0] - p2[0], p1[1] - p2[1])
 
@@ -38,86 +41,240 @@ def head_tilt_angle(left_eye, right_eye):
     dy = right_eye[1] - left_eye[1]
     return abs(math.degrees(math.atan2(dy, dx)))
 
+def face_metrics(face_lm, w, h):
+    """Mean EAR of both eyes, eye-corner pixel points and their distance"""
+    points = [(int(x*w), int(y*h)) for x, y, _ in face_lm[:NOSE_ROW]]
+    left_eye, right_eye = points[:6], points[6:]
+    l_eye, r_eye = left_eye[0], right_eye[3]
+    return (EAR(left_eye) + EAR(right_eye)) / 2, l_eye, r_eye, dist(l_eye, r_eye)
+
 # =================== CAMERA CLASS ===================
 class WeekdayCamera(VideoCamera):
-    def __init__(self):
-        super().__init__()
-        print("💼 WeekdayCamera initialized!")
+    MODE = "weekday"
 
-        self.mp_face = mp.solutions.face_mesh
-        self.mp_pose = mp.solutions.pose
+    # Run FaceMesh on every frame (blinks are short) and Pose on every 3rd
+    DEFAULT_SCHEDULE = {"face": 1, "pose": 3}
 
-        self.face_mesh = self.mp_face.FaceMesh(
-            static_image_mode=False,
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
-        # self.face_mesh = self.mp_face.FaceMesh(
-        # static_image_mode=False,
-        # max_num_faces=1,
-        # min_detection_confidence=0.7
-        # )
-
-        self.pose = self.mp_pose.Pose(
-            static_image_mode=False,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
+    # Pose gets a copy no wider than this; FaceMesh a crop around the last face
+    POSE_INPUT_WIDTH = 640
+
+    # Telemetry stage name of each model's inference time
+    INFERENCE_STAGES = {"face": "face_mesh", "pose": "pose"}
+
+    RECORDED_STREAMS = {
+        "face": (478, FACE_POINTS),
+        "pose": (33, SHOULDERS),
+    }
+
+    def __init__(self, backend="inprocess", schedule=None, budgets=None,
+                 roi=True, pose_input_width=POSE_INPUT_WIDTH,
+                 clock=time.monotonic, voice=True, source=None):
+        super().__init__(source)
+        print("💼 WeekdayCamera initialized!")
+
+        # Every timer reads self.clock(), so recorded video can be replayed
+        # on its own frame timestamps. Alerts go to the shared speech worker,
+        # or to the SpeechWorker passed as ``voice``; voice=False mutes them
+        # (nothing loads the speech driver then)
+        self.clock = clock
+        self.voice = speech.default_worker() if voice is True else voice or None
+
+        # "process" runs FaceMesh and Pose in parallel worker processes;
+        # None builds no models - the instance is then fed through update()
+        self.backend = None if backend is None else create_backend({
+            "face": ("face_mesh", dict(
+                static_image_mode=False,
+                max_num_faces=1,
+                refine_landmarks=True,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5
+            ), FACE_POINTS),
+            "pose": ("pose", dict(
+                static_image_mode=False,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5
+            ), SHOULDERS),
+        }, kind=backend)
+
+        # Between runs a model's landmarks are extrapolated from its last two
+        # detections; ``budgets`` (seconds per frame) adapts the rates instead
+        self.scheduler = InferenceScheduler(
+            ("face", "pose"),
+            intervals=schedule or self.DEFAULT_SCHEDULE,
+            budgets=budgets
         )
 
-        self.LEFT_EYE = [33, 159, 158, 133, 153, 145]
-        self.RIGHT_EYE = [362, 386, 385, 263, 380, 374]
+        self.roi_enabled = roi
+        self.pose_input_width = pose_input_width
+
+        self.LEFT_EYE = LEFT_EYE
+        self.RIGHT_EYE = RIGHT_EYE
 
         # -------- Blink / Drowsy --------
         self.EAR_THRESHOLD = 0.23
         self.EYE_CLOSED_FRAMES = 3
         self.DROWSY_TIME = 10
 
+        self.BLINK_RATE_THRESHOLD = 15
+        self.BLINK_ALERT_DELAY = 120
+
+        # Blink rate, EAR level, PERCLOS... over the last minute, in fixed memory
+        self.blink_stats = BlinkStatistics(window=60.0)
+
+        # -------- Distance / Posture --------
+        self.DISTANCE_CLOSE_FACTOR = 0.65
+        self.DISTANCE_CONFIRM_TIME = 2.0
+        self.HEAD_TILT_IGNORE = 8
+        self.BASELINE_TIME = 3
+        self.POSTURE_SOUND_DELAY = 120
+
+        # A stored baseline (see use_baseline) is on probation for
+        # BASELINE_CHECK_TIME seconds: posture more than DRIFT_SIGMA off it
+        # all that time starts calibration over. A fresh calibration is only
+        # stored after BASELINE_CONFIRM_TIME seconds without drifting off it
+        # for half that time. Later on, DRIFT_TIME seconds off the baseline
+        # mean the desk or camera changed. Frames judged bad posture never
+        # count as off the baseline, so a long slouch is not taken for a new
+        # setup; only frames within REFINE_SIGMA of it refine it
+        self.BASELINE_CHECK_TIME = 5
+        self.BASELINE_CONFIRM_TIME = 60
+        self.DRIFT_TIME = 900
+        self.DRIFT_SIGMA = 3.0
+        self.REFINE_SIGMA = 1.5
+        self.stored_baseline = None
+
+        # Set by start_sampling(): folds the frames into periodic samples;
+        # set by start_event_log(): receives each bad-posture stretch
+        self.sampler = None
+        self.event_sink = None
+        self.posture_category = None
+        self.posture_category_start = None
+
+        self.reset()
+
+    def reset(self):
+        """Start the analysis over - recalibrate and zero the session.
+
+        The models are kept, so a pooled camera is ready again at once.
+        """
+        self.scheduler.reset()
+
+        # -------- Blink / Drowsy --------
         self.frames_closed = 0
         self.blink_count = 0
-        self.ear_buffer = deque(maxlen=5)
+        self.ear_buffer = RollingWindow(5)
         self.drowsy_start = None
         self.drowsy_alert = False
 
-        self.blink_times = deque()
-        self.BLINK_RATE_THRESHOLD = 15
-        self.BLINK_ALERT_DELAY = 120
+        self.blink_stats.reset()
         self.low_blink_start = None
         self.blink_rate_alert = False
 
         # -------- Distance / Posture --------
-        self.DISTANCE_CLOSE_FACTOR = 0.65
-        self.DISTANCE_CONFIRM_TIME = 2.0
-        self.HEAD_TILT_IGNORE = 8
         self.close_start = None
 
-        self.BASELINE_TIME = 3
-        self.baseline_start = time.time()
-        self.baseline_ready = False
-
-        self.base_shoulder_nose = 0
-        self.base_shoulder_diff = 0
-        self.base_eye_dist = 0
-        self.base_shoulder_mid = 0
-        self.samples = 0
+        self.drift = DriftDetector(self.DRIFT_TIME, self.DRIFT_SIGMA)
+        self.baseline_changed = False
+        self._recalibrate()
 
         self.bad_posture_start = None
-        self.POSTURE_SOUND_DELAY = 120
         self.posture_alert = False
-        
+
         # -------- Session Tracking --------
-        self.total_bad_posture_time = 0
         self.last_bad_posture_update = None
+        self.reset_session()
+
+    def _recalibrate(self):
+        self.baseline = PostureBaseline()
+        self.baseline_start = self.clock()
+        self.baseline_ready = False
+        self.baseline_checking = False
+        self.baseline_confirmed = False
+        self._use_baseline_means()
+
+    def _use_baseline_means(self):
+        self.base_shoulder_nose = self.baseline.mean("shoulder_nose")
+        self.base_shoulder_diff = self.baseline.mean("shoulder_diff")
+        self.base_eye_dist = self.baseline.mean("eye_dist")
+        self.base_shoulder_mid = self.baseline.mean("shoulder_mid")
+
+    def use_baseline(self, state):
+        """Start from a stored baseline (PostureBaseline.state()) instead of calibrating"""
+        self.stored_baseline = PostureBaseline.from_state(state) if state else None
+
+    def baseline_state(self):
+        """The baseline to store if it changed since the last call, else None.
+
+        A fresh calibration is held back until it is confirmed, so a bad one
+        never replaces the stored baseline.
+        """
+        if not (self.baseline_changed and self.baseline_confirmed):
+            return None
+        self.baseline_changed = False
+        return self.baseline.state()
+
+    def start_sampling(self, sink, interval=5.0):
+        """Hand ``sink`` a summary of every ``interval`` seconds of analysis"""
+        self.stop_sampling()
+        self.sampler = SampleAggregator(sink, interval)
+
+    def stop_sampling(self):
+        """Emit the interval in progress and stop sampling"""
+        sampler, self.sampler = self.sampler, None
+        if sampler is not None:
+            sampler.flush()
+
+    def start_event_log(self, sink):
+        """Hand ``sink`` one event per uninterrupted stretch of a bad-posture status"""
+        self.stop_event_log()
+        self.event_sink = sink
+
+    def stop_event_log(self):
+        """Close the stretch in progress and stop logging"""
+        self._end_posture_event(self.clock())
+        self.event_sink = None
+
+    def _track_posture_event(self, category):
+        if category != self.posture_category:
+            now = self.clock()
+            self._end_posture_event(now)
+            if category is not None:
+                self.posture_category = category
+                self.posture_category_start = now
+
+    def _end_posture_event(self, now):
+        category, self.posture_category = self.posture_category, None
+        if category is not None and self.event_sink is not None:
+            self.event_sink({
+                "session": self.session_key,
+                "category": category,
+                "seconds": round(now - self.posture_category_start, 3),
+            })
+
+    def reset_session(self):
+        """Zero the totals saved with a session, keeping the calibration.
+
+        Also starts a new ``session_key``, which ties the samples and posture
+        events recorded from now on to the session saved next.
+        """
+        # What was recorded so far belongs to the session that just ended
+        if self.sampler is not None:
+            self.sampler.flush()
+        self._end_posture_event(self.clock())
+        self.session_key = uuid.uuid4().hex
+
+        self.total_bad_posture_time = 0
+        self.bad_posture_start = None
         self.session_blink_count = 0  # Blinks for current session only
 
     def release(self):
         """Cleanup MediaPipe and camera"""
+        self.stop_sampling()
+        self.stop_event_log()
         try:
-            if hasattr(self, 'face_mesh') and self.face_mesh:
-                self.face_mesh.close()
-            if hasattr(self, 'pose') and self.pose:
-                self.pose.close()
+            if getattr(self, 'backend', None):
+                self.backend.close()
+                self.backend = None
             print("🧹 WeekdayCamera MediaPipe cleaned up")
         except Exception as e:
             print(f"Warning during MediaPipe cleanup: {e}")
@@ -130,102 +287,172 @@ class WeekdayCamera(VideoCamera):
         if frame is None:
             return None
 
-        frame = cv2.flip(frame, 1)
+        frame, overlay = self.analyze(frame)
+        with self.timers.time("overlay"):
+            self.draw_overlay(frame, overlay)
+        return self.encode(frame)
+
+    def analyze(self, frame):
+        """Run inference on a raw frame and advance the blink/posture state.
+
+        Returns the flipped frame and a snapshot of the values to draw on it
+        (None when inference failed), so drawing and encoding can happen on
+        another thread while the next frame is analysed.
+        """
+        timers = self.timers
+        with timers.time("flip"):
+            frame = cv2.flip(frame, 1)
         h, w, _ = frame.shape
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        with timers.time("cvtcolor"):
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+        due = self.scheduler.due()
+        inputs = {}
+        roi = None
+        with timers.time("resize"):
+            if "face" in due:
+                # Crop around where the face should be; the full frame until one is found
+                estimate = self.scheduler.landmarks("face", self.clock()) if self.roi_enabled else None
+                if estimate is not None:
+                    roi = face_roi(estimate, w, h)
+                inputs["face"] = crop_roi(rgb, roi) if roi else rgb
+            if "pose" in due:
+                inputs["pose"] = downscale(rgb, self.pose_input_width)
 
-        face_res = None
-        pose_res = None
-        
         try:
-            face_res = self.face_mesh.process(rgb)
-            pose_res = self.pose.process(rgb)
+            fresh = self.backend.process(inputs, names=due)
         except Exception as e:
+            self.inference_errors.inc()
             print(f"⚠️ MediaPipe processing error: {e}")
-            ret, jpeg = cv2.imencode(".jpg", frame)
-            return jpeg.tobytes() if ret else None
-
+            return frame, None
+
+        # face_mesh / pose as measured by the backend, worker processes included
+        for name in due:
+            latency = self.backend.latency.get(name)
+            if latency is not None:
+                timers.observe(self.INFERENCE_STAGES[name], latency)
+
+        if roi and fresh.get("face") is not None:
+            fresh["face"] = roi_to_frame(fresh["face"], roi, w, h)
+
+        now = self.clock()
+        for name in due:
+            self.scheduler.update(name, fresh.get(name), now, self.backend.latency.get(name))
+
+        # Fresh detections or estimates filled in by the scheduler
+        landmarks = {
+            "face": self.scheduler.landmarks("face", now),
+            "pose": self.scheduler.landmarks("pose", now),
+        }
+        if self.recorder is not None:
+            self.recorder.append(now, w, h, landmarks, detected=due)
+
+        with timers.time("analytics"):
+            overlay = self.update(landmarks["face"], landmarks["pose"], w, h, face_fresh="face" in due)
+        return frame, overlay
+
+    def update(self, face_lm, pose_lm, w, h, face_fresh=True):
+        """Advance the blink/posture state from one frame's landmarks.
+
+        Needs no MediaPipe, so a landmark recording can be replayed straight
+        through it. ``face_fresh`` is False when the face landmarks were
+        estimated rather than detected on this frame. Landmarks are the
+        FACE_POINTS and SHOULDERS rows, as lists or arrays.
+        """
         status = "GOOD POSTURE"
         color = (0, 255, 0)
         bad = False
+        blink_rate = None
+        fatigue = dict.fromkeys(("ear_mean", "ear_std", "perclos", "blink_duration"))
+        calibrating = False
+        bad_elapsed = None
+        sampled_ear = None
+        blinked = 0
 
         # ================= FACE / BLINK =================
-        if face_res and face_res.multi_face_landmarks:
-            lm = face_res.multi_face_landmarks[0].landmark
-            left_eye = [(int(lm[i].x*w), int(lm[i].y*h)) for i in self.LEFT_EYE]
-            right_eye = [(int(lm[i].x*w), int(lm[i].y*h)) for i in self.RIGHT_EYE]
-
-            avgEAR = (EAR(left_eye) + EAR(right_eye)) / 2
-            self.ear_buffer.append(avgEAR)
-            smoothEAR = sum(self.ear_buffer) / len(self.ear_buffer)
-
-            if smoothEAR < self.EAR_THRESHOLD:
-                self.frames_closed += 1
-                if self.drowsy_start is None:
-                    self.drowsy_start = time.time()
-            else:
-                if self.frames_closed >= self.EYE_CLOSED_FRAMES:
-                    self.blink_count += 1
-                    self.session_blink_count += 1  # Track session blinks separately
-                    self.blink_times.append(time.time())
-                self.frames_closed = 0
-                self.drowsy_start = None
-                self.drowsy_alert = False
-
-            if self.drowsy_start and time.time() - self.drowsy_start >= self.DROWSY_TIME:
+        if face_lm is not None:
+            face_lm = rows(face_lm)
+            avgEAR, L_EYE, R_EYE, eye_dist = face_metrics(face_lm, w, h)
+
+            # Eyelids are only sampled on real detections - an estimated
+            # frame would count the same eye state twice
+            if face_fresh:
+                now = self.clock()
+                sampled_ear = avgEAR
+                self.ear_buffer.add(avgEAR)
+                closed = self.ear_buffer.mean < self.EAR_THRESHOLD
+                self.blink_stats.sample(now, avgEAR, closed)
+
+                if closed:
+                    self.frames_closed += 1
+                    if self.drowsy_start is None:
+                        self.drowsy_start = now
+                else:
+                    if self.frames_closed >= self.EYE_CLOSED_FRAMES:
+                        self.blink_count += 1
+                        self.session_blink_count += 1  # Track session blinks separately
+                        self.blink_stats.blink(now, now - self.drowsy_start)
+                        blinked = 1
+                    self.frames_closed = 0
+                    self.drowsy_start = None
+                    self.drowsy_alert = False
+
+            if self.drowsy_start and self.clock() - self.drowsy_start >= self.DROWSY_TIME:
                 status, color = "DROWSY", (0, 0, 255)
                 if not self.drowsy_alert:
-                    speak("You look drowsy")
+                    if self.voice:
+                        self.voice.say("You look drowsy", speech.URGENT)
                     self.drowsy_alert = True
 
-            now = time.time()
-            while self.blink_times and now - self.blink_times[0] > 60:
-                self.blink_times.popleft()
-
-            blink_rate = len(self.blink_times)
-            cv2.putText(frame, f"Blinks: {self.blink_count}", (30, 80),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255,255,0), 2)
-            cv2.putText(frame, f"Blink Rate: {blink_rate}/min", (30, 110),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255,255,255), 2)
+            fatigue = self.blink_stats.snapshot(self.clock())
+            blink_rate = fatigue["blink_rate"]
 
         # ================= POSTURE =================
-        if face_res and face_res.multi_face_landmarks and pose_res and pose_res.pose_landmarks:
-            flm = face_res.multi_face_landmarks[0].landmark
-            plm = pose_res.pose_landmarks.landmark
-
+        if face_lm is not None and pose_lm is not None:
             # Get key points
-            NOSE = int(flm[1].y*h)
-            L_EYE = (int(flm[33].x*w), int(flm[33].y*h))
-            R_EYE = (int(flm[263].x*w), int(flm[263].y*h))
-            L_SH = int(plm[11].y*h)
-            R_SH = int(plm[12].y*h)
+            NOSE = int(face_lm[NOSE_ROW][1]*h)
+            L_SH, R_SH = (int(y*h) for _, y, _ in rows(pose_lm))
 
             shoulder_mid = (L_SH + R_SH) // 2
             shoulder_nose = NOSE - shoulder_mid
             shoulder_diff = abs(L_SH - R_SH)
-            eye_dist = dist(L_EYE, R_EYE)
             tilt = head_tilt_angle(L_EYE, R_EYE)
 
+            measures = {
+                "shoulder_nose": shoulder_nose,
+                "shoulder_diff": shoulder_diff,
+                "eye_dist": eye_dist,
+                "shoulder_mid": shoulder_mid,
+            }
+            now = self.clock()
+
+            # A stored baseline for this frame size skips the calibration,
+            # on probation until BASELINE_CHECK_TIME has passed
+            if not self.baseline_ready and self.stored_baseline is not None:
+                if self.stored_baseline.fits(w, h):
+                    self.baseline = self.stored_baseline
+                    self.baseline_ready = True
+                    self.baseline_checking = True
+                    self.baseline_confirmed = True
+                    self.baseline_start = now
+                    self.drift.reset(self.BASELINE_CHECK_TIME)
+                    self._use_baseline_means()
+                    print(f"📐 Stored baseline loaded ({self.baseline.samples} samples)")
+                self.stored_baseline = None
+
             # Baseline calibration
             if not self.baseline_ready:
-                if time.time() - self.baseline_start < self.BASELINE_TIME:
-                    self.base_shoulder_nose += shoulder_nose
-                    self.base_shoulder_diff += shoulder_diff
-                    self.base_eye_dist += eye_dist
-                    self.base_shoulder_mid += shoulder_mid
-                    self.samples += 1
-                    
-                    # Show calibration message
-                    cv2.putText(frame, "CALIBRATING...", (30, 200),
-                                cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 0), 2)
-                else:
-                    if self.samples > 0:
-                        self.base_shoulder_nose /= self.samples
-                        self.base_shoulder_diff /= self.samples
-                        self.base_eye_dist /= self.samples
-                        self.base_shoulder_mid /= self.samples
-                        self.baseline_ready = True
-                        print(f"✅ Baseline set - Eye dist: {self.base_eye_dist:.1f}, Shoulder-Nose: {self.base_shoulder_nose:.1f}")
+                if now - self.baseline_start < self.BASELINE_TIME:
+                    self.baseline.add(measures, w, h)
+                    calibrating = True
+                elif self.baseline.samples > 0:
+                    self.baseline_ready = True
+                    self.baseline_checking = True
+                    self.baseline_changed = True
+                    self.baseline_start = now
+                    self.drift.reset(self.BASELINE_CONFIRM_TIME / 2)
+                    self._use_baseline_means()
+                    print(f"✅ Baseline set - Eye dist: {self.base_eye_dist:.1f}, Shoulder-Nose: {self.base_shoulder_nose:.1f}")
             else:
                 # Check posture only after baseline is ready
                 if eye_dist < self.base_eye_dist * self.DISTANCE_CLOSE_FACTOR:
@@ -239,36 +466,99 @@ class WeekdayCamera(VideoCamera):
                 elif shoulder_nose > self.base_shoulder_nose + 20:
                     status, color, bad = "FORWARD HEAD", (0,0,255), True
 
+                # Bad posture is what the baseline is there to catch, not a
+                # sign that it is stale: such frames count as fitting it
+                deviation = self.baseline.deviation(measures)
+                check_time = self.BASELINE_CHECK_TIME if self.baseline_confirmed else self.BASELINE_CONFIRM_TIME
+                if self.drift.update(now, 0.0 if bad else deviation):
+                    print("📐 Baseline does not fit - recalibrating" if self.baseline_checking
+                          else "📐 Posture baseline drifted - recalibrating")
+                    self._recalibrate()
+                    calibrating = True
+                elif self.baseline_checking and now - self.baseline_start >= check_time:
+                    self.baseline_checking = False
+                    if not self.baseline_confirmed:
+                        self.baseline_confirmed = True
+                        print("✅ Baseline confirmed")
+                    self.drift.reset(self.DRIFT_TIME)
+
+                if self.baseline_ready and not bad and deviation <= self.REFINE_SIGMA:
+                    # Good posture close to the baseline keeps refining it
+                    self.baseline.add(measures, w, h)
+                    self.baseline_changed = True
+                    self._use_baseline_means()
+
         # ================= ALERT TIMER & TRACKING =================
         if bad:
             if self.bad_posture_start is None:
-                self.bad_posture_start = time.time()
+                self.bad_posture_start = self.clock()
             
-            elapsed = int(time.time() - self.bad_posture_start)
-            cv2.putText(frame, f"Bad posture: {elapsed}s", (30, 300),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0,255,255), 2)
+            elapsed = int(self.clock() - self.bad_posture_start)
+            bad_elapsed = elapsed
 
             if elapsed >= self.POSTURE_SOUND_DELAY and not self.posture_alert:
-                speak("Bad posture detected")
+                if self.voice:
+                    self.voice.say("Bad posture detected")
                 self.posture_alert = True
         else:
             # Only add to total if we were previously in bad posture
             if self.bad_posture_start is not None:
-                elapsed_bad = time.time() - self.bad_posture_start
+                elapsed_bad = self.clock() - self.bad_posture_start
                 self.total_bad_posture_time += elapsed_bad
             
             self.bad_posture_start = None
             self.posture_alert = False
 
+        self._track_posture_event(status if bad else None)
+
+        if self.sampler is not None:
+            self.sampler.add(
+                self.clock(), status, bad, face_lm is not None,
+                ear=sampled_ear, blinks=blinked,
+                blink_rate=blink_rate, perclos=fatigue["perclos"]
+            )
+
+        overlay = {
+            "status": status,
+            "color": color,
+            "blink_count": self.blink_count,
+            "blink_rate": blink_rate,
+            "perclos": fatigue["perclos"],
+            "ear_mean": fatigue["ear_mean"],
+            "ear_std": fatigue["ear_std"],
+            "blink_duration": fatigue["blink_duration"],
+            "calibrating": calibrating,
+            "bad_posture_elapsed": bad_elapsed,
+        }
+        self.publish_metrics(overlay)
+        return overlay
+
+    def draw_overlay(self, frame, overlay):
+        """Burn the analysis results into the frame"""
+        if overlay is None:
+            return frame
+        h = frame.shape[0]
+
+        if overlay["blink_rate"] is not None:
+            cv2.putText(frame, f"Blinks: {overlay['blink_count']}", (30, 80),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255,255,0), 2)
+            cv2.putText(frame, f"Blink Rate: {overlay['blink_rate']}/min", (30, 110),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255,255,255), 2)
+
+        if overlay["calibrating"]:
+            # Show calibration message
+            cv2.putText(frame, "CALIBRATING...", (30, 200),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 0), 2)
+
+        if overlay["bad_posture_elapsed"] is not None:
+            cv2.putText(frame, f"Bad posture: {overlay['bad_posture_elapsed']}s", (30, 300),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0,255,255), 2)
+
         # Display status
-        cv2.putText(frame, status, (30, 150),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1.1, color, 3)
+        cv2.putText(frame, overlay["status"], (30, 150),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.1, overlay["color"], 3)
 
         # Add mode indicator
         cv2.putText(frame, "WEEKDAY MODE", (30, h - 20), 
                     cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
-
-        ret, jpeg = cv2.imencode(".jpg", frame)
-        if not ret:
-            return None
-        return jpeg.tobytes()
\ No newline at end of file
+        return frame
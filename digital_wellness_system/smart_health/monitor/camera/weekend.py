@@ -1,37 +1,77 @@
 import cv2
 import mediapipe as mp
-import math
+import numpy as np
 import time
 from .base_camera import VideoCamera
+from .inference import create_backend
+from .poses import PoseClassifier
+from .pose_index import ReferencePoseClassifier
 
 mp_pose = mp.solutions.pose
-mp_drawing = mp.solutions.drawing_utils
+
+
+def draw_pose_landmarks(frame, landmarks):
+    """Draw the pose skeleton from an (N,3) normalised landmark array"""
+    h, w, _ = frame.shape
+    pts = [(int(x*w), int(y*h)) for x, y, _ in landmarks]
+    for a, b in mp_pose.POSE_CONNECTIONS:
+        cv2.line(frame, pts[a], pts[b], (224, 224, 224), 2)
+    for p in pts:
+        cv2.circle(frame, p, 2, (0, 0, 255), 2)
+
 
 class WeekendCamera(VideoCamera):
-    def __init__(self):
-        super().__init__()
+    MODE = "weekend"
+    RECORDED_STREAMS = {"pose": (33, list(range(33)))}
+
+    def __init__(self, backend="inprocess", classifier="table", clock=time.monotonic, source=None,
+                 pose_index_dir=None):
+        super().__init__(source)
         print("🎯 WeekendCamera initialized!")
 
-        self.pose = mp_pose.Pose(
-            static_image_mode=False,
-            min_detection_confidence=0.5,
-            model_complexity=1
-        )
+        # Hold timer clock - frame timestamps when replaying a recording
+        self.clock = clock
+
+        # None builds no model - the instance is then fed through update()
+        self.backend = None if backend is None else create_backend({
+            "pose": ("pose", dict(
+                static_image_mode=False,
+                min_detection_confidence=0.5,
+                model_complexity=1
+            )),
+        }, kind=backend)
+
+        # "table": angle windows from POSE_TABLE in poses.py
+        # "reference": nearest reference photo from monitor/images, with
+        # the index cached in pose_index_dir
+        # or any object with a classify(points) method
+        if classifier == "reference":
+            self.classifier = ReferencePoseClassifier(cache_dir=pose_index_dir)
+        elif classifier == "table":
+            self.classifier = PoseClassifier()
+        else:
+            self.classifier = classifier
+
+        self.POSE_STABILITY_THRESHOLD = 5
+        self.HOLD_DURATION = 5
+
+        self.reset()
 
+    def reset(self):
+        """Forget the current pose and hold; the model is kept"""
         self.previous_pose = "Unknown Pose"
         self.pose_counter = 0
-        self.POSE_STABILITY_THRESHOLD = 5
 
         self.pose_locked = False
         self.hold_start_time = None
-        self.HOLD_DURATION = 5
         self.final_pose = "Unknown Pose"
 
     def release(self):
         """Cleanup MediaPipe and camera"""
         try:
-            if hasattr(self, 'pose') and self.pose:
-                self.pose.close()
+            if getattr(self, 'backend', None):
+                self.backend.close()
+                self.backend = None
             print("🧹 WeekendCamera MediaPipe cleaned up")
         except Exception as e:
             print(f"Warning during MediaPipe cleanup: {e}")
@@ -39,111 +79,10 @@ class WeekendCamera(VideoCamera):
         # Call parent release
         super().release()
 
-    # ---------- ANGLE CALCULATION ----------
-    def calculateAngle(self, a, b, c):
-        x1, y1, _ = a
-        x2, y2, _ = b
-        x3, y3, _ = c
-        angle = math.degrees(math.atan2(y3 - y2, x3 - x2) -
-                             math.atan2(y1 - y2, x1 - x2))
-        angle = abs(angle)
-        if angle > 180:
-            angle = 360 - angle
-        return angle
-
     # ---------- YOGA CLASSIFICATION ----------
     def classifyPose(self, landmarks):
-        label = "Unknown Pose"
-        L = mp_pose.PoseLandmark
-
-        left_elbow_angle = self.calculateAngle(landmarks[L.LEFT_SHOULDER.value],
-                                               landmarks[L.LEFT_ELBOW.value],
-                                               landmarks[L.LEFT_WRIST.value])
-
-        right_elbow_angle = self.calculateAngle(landmarks[L.RIGHT_SHOULDER.value],
-                                                landmarks[L.RIGHT_ELBOW.value],
-                                                landmarks[L.RIGHT_WRIST.value])
-
-        left_shoulder_angle = self.calculateAngle(landmarks[L.LEFT_ELBOW.value],
-                                                  landmarks[L.LEFT_SHOULDER.value],
-                                                  landmarks[L.LEFT_HIP.value])
-
-        right_shoulder_angle = self.calculateAngle(landmarks[L.RIGHT_HIP.value],
-                                                   landmarks[L.RIGHT_SHOULDER.value],
-                                                   landmarks[L.RIGHT_ELBOW.value])
-
-        left_knee_angle = self.calculateAngle(landmarks[L.LEFT_HIP.value],
-                                             landmarks[L.LEFT_KNEE.value],
-                                             landmarks[L.LEFT_ANKLE.value])
-
-        right_knee_angle = self.calculateAngle(landmarks[L.RIGHT_HIP.value],
-                                              landmarks[L.RIGHT_KNEE.value],
-                                              landmarks[L.RIGHT_ANKLE.value])
-
-        left_hip_angle = self.calculateAngle(landmarks[L.LEFT_SHOULDER.value],
-                                            landmarks[L.LEFT_HIP.value],
-                                            landmarks[L.LEFT_KNEE.value])
-
-        right_hip_angle = self.calculateAngle(landmarks[L.RIGHT_SHOULDER.value],
-                                             landmarks[L.RIGHT_HIP.value],
-                                             landmarks[L.RIGHT_KNEE.value])
-
-        # -------- Virabhadrasana II or T Pose --------
-        if 165 < left_elbow_angle < 195 and 165 < right_elbow_angle < 195:
-            if 80 < left_shoulder_angle < 110 and 80 < right_shoulder_angle < 110:
-                if 165 < left_knee_angle < 195 or 165 < right_knee_angle < 195:
-                    if 90 < left_knee_angle < 120 or 90 < right_knee_angle < 120:
-                        label = "Virabhadrasana II"
-                        print("Virabhadrasana II Detected")
-
-                if 160 < left_knee_angle < 195 and 160 < right_knee_angle < 195:
-                    label = "T Pose"
-
-        # -------- Vrikshasana (Tree Pose) --------
-        if 165 < left_knee_angle < 195 or 165 < right_knee_angle < 195:
-            if 315 < left_knee_angle < 335 or 25 < right_knee_angle < 45:
-                label = "Vrikshasana"
-
-        # -------- Adho Mukha Svanasana (Downward Dog) --------
-        if 165 < left_elbow_angle < 195 and 165 < right_elbow_angle < 195:
-            if 165 < left_knee_angle < 195 and 165 < right_knee_angle < 195:
-                if 60 < left_hip_angle < 120 and 60 < right_hip_angle < 120:
-
-                    left_wrist_y = landmarks[L.LEFT_WRIST.value][1]
-                    left_ankle_y = landmarks[L.LEFT_ANKLE.value][1]
-                    right_wrist_y = landmarks[L.RIGHT_WRIST.value][1]
-                    right_ankle_y = landmarks[L.RIGHT_ANKLE.value][1]
-
-                    if left_wrist_y > left_ankle_y or right_wrist_y > right_ankle_y:
-                        label = "Adho Mukha Svanasana"
-
-        # -------- Uttanasana (Forward Bend) --------
-        if 165 < left_knee_angle < 195 and 165 < right_knee_angle < 195:
-            if 20 < left_hip_angle < 60 and 20 < right_hip_angle < 60:
-
-                left_wrist_y = landmarks[L.LEFT_WRIST.value][1]
-                left_ankle_y = landmarks[L.LEFT_ANKLE.value][1]
-                right_wrist_y = landmarks[L.RIGHT_WRIST.value][1]
-                right_ankle_y = landmarks[L.RIGHT_ANKLE.value][1]
-
-                if abs(left_wrist_y - left_ankle_y) < 50 or abs(right_wrist_y - right_ankle_y) < 50:
-                    label = "Uttanasana"
-
-        # -------- Utkatasana (Chair Pose) --------
-        if 80 < left_knee_angle < 120 and 80 < right_knee_angle < 120:
-            if 80 < left_hip_angle < 120 and 80 < right_hip_angle < 120:
-                if 160 < left_shoulder_angle < 200 and 160 < right_shoulder_angle < 200:
-                    if 165 < left_elbow_angle < 195 and 165 < right_elbow_angle < 195:
-                        label = "Utkatasana"
-
-        # -------- Urdhva Hastasana (Raised Hands Pose) --------
-        if 165 < left_knee_angle < 195 and 165 < right_knee_angle < 195:
-            if 160 < left_hip_angle < 195 and 160 < right_hip_angle < 195:
-                if 160 < left_shoulder_angle < 200 and 160 < right_shoulder_angle < 200:
-                    if 165 < left_elbow_angle < 195 and 165 < right_elbow_angle < 195:
-                        label = "Urdhva Hastasana"
-
-        return label
+        """Label an (33, 3) array of pixel landmarks using the pose table"""
+        return self.classifier.classify(landmarks)
 
     # ---------- GENERATE CAMERA FRAME ----------
     def get_frame(self):
@@ -152,25 +91,57 @@ class WeekendCamera(VideoCamera):
         if frame is None:
             return None
 
-        frame = cv2.flip(frame, 1)
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        results = None
+        frame, overlay = self.analyze(frame)
+        with self.timers.time("overlay"):
+            self.draw_overlay(frame, overlay)
+        return self.encode(frame)
+
+    def analyze(self, frame):
+        """Run pose inference and advance the pose lock / hold state.
+
+        Returns the flipped frame and a snapshot of what to draw on it
+        (None when inference failed).
+        """
+        timers = self.timers
+        with timers.time("flip"):
+            frame = cv2.flip(frame, 1)
+        with timers.time("cvtcolor"):
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
         try:
-            results = self.pose.process(rgb)
+            pose_lm = self.backend.process(rgb).get("pose")
         except Exception as e:
+            self.inference_errors.inc()
             print(f"⚠️ MediaPipe processing error: {e}")
-            ret, jpeg = cv2.imencode(".jpg", frame)
-            return jpeg.tobytes() if ret else None
+            return frame, None
 
+        latency = self.backend.latency.get("pose")
+        if latency is not None:
+            timers.observe("pose", latency)
+
+        h, w, _ = frame.shape
+        if self.recorder is not None:
+            self.recorder.append(self.clock(), w, h, {"pose": pose_lm}, detected=("pose",))
+
+        with timers.time("analytics"):
+            overlay = self.update(pose_lm, w, h)
+        return frame, overlay
+
+    def update(self, pose_lm, w, h):
+        """Advance the pose lock / hold state from one frame's landmarks"""
         label = "Unknown Pose"
+        overlay = {
+            "pose_landmarks": None,
+            "label": None,
+            "hold_remaining": None,
+            "final_pose": None,
+        }
 
-        if results and results.pose_landmarks:
-            mp_drawing.draw_landmarks(frame, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
+        if pose_lm is not None:
+            overlay["pose_landmarks"] = pose_lm
 
-            h, w, _ = frame.shape
-            lm = results.pose_landmarks.landmark
-            pts = [(int(p.x*w), int(p.y*h), p.z*w) for p in lm]
+            pts = pose_lm * (w, h, w)
+            np.trunc(pts[:, :2], out=pts[:, :2])
 
             label = self.classifyPose(pts)
 
@@ -184,29 +155,48 @@ class WeekendCamera(VideoCamera):
                 if self.pose_counter >= self.POSE_STABILITY_THRESHOLD and label != "Unknown Pose":
                     self.pose_locked = True
                     self.final_pose = label
-                    self.hold_start_time = time.time()
+                    self.hold_start_time = self.clock()
 
                 # Display current pose
-                cv2.putText(frame, label, (20, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.3, (0, 255, 0), 3)
+                overlay["label"] = label
 
             else:
-                elapsed = int(time.time() - self.hold_start_time)
+                elapsed = int(self.clock() - self.hold_start_time)
                 remaining = self.HOLD_DURATION - elapsed
 
                 if remaining > 0:
-                    cv2.putText(frame, f"HOLD {remaining}s", (150, 250), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 255), 3)
-                    cv2.putText(frame, self.final_pose, (140, 200), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 3)
+                    overlay["hold_remaining"] = remaining
+                    overlay["final_pose"] = self.final_pose
                 else:
                     self.pose_locked = False
                     self.pose_counter = 0
                     self.previous_pose = "Unknown Pose"
 
+        self.publish_metrics(overlay)
+        return overlay
+
+    def metrics_values(self, overlay):
+        # Only what was made of the landmarks: they change on every frame,
+        # so sending them would defeat the change-only event stream
+        return {key: value for key, value in overlay.items() if key != "pose_landmarks"}
+
+    def draw_overlay(self, frame, overlay):
+        """Draw the skeleton, pose label and hold countdown"""
+        if overlay is None:
+            return frame
+
+        if overlay["pose_landmarks"] is not None:
+            draw_pose_landmarks(frame, overlay["pose_landmarks"])
+
+        if overlay["label"] is not None:
+            cv2.putText(frame, overlay["label"], (20, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.3, (0, 255, 0), 3)
+
+        if overlay["hold_remaining"] is not None:
+            cv2.putText(frame, f"HOLD {overlay['hold_remaining']}s", (150, 250), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 255), 3)
+            cv2.putText(frame, overlay["final_pose"], (140, 200), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 3)
+
         h, w, _ = frame.shape
         # Add mode indicator
         cv2.putText(frame, "WEEKEND MODE", (20, h - 20), 
                     cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 0, 255), 2)
-
-        ret, jpeg = cv2.imencode(".jpg", frame)
-        if not ret:
-            return None
-        return jpeg.tobytes()
\ No newline at end of file
+        return frame
@@ -0,0 +1,89 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from monitor.models import WeekdaySession, YogaSession
+from monitor.offline import analyze_video, video_files
+
+
+class Command(BaseCommand):
+    help = "Analyse a directory of recorded webcam videos and save one session per file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", help="Directory containing the video files")
+        parser.add_argument("--mode", choices=["weekday", "weekend"], default="weekday",
+                            help="Run the posture/blink analyzer or the yoga pose analyzer")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="Number of worker processes (default: one per CPU)")
+        parser.add_argument("--classifier", choices=["table", "reference"],
+                            default=getattr(settings, "MONITOR_POSE_CLASSIFIER", "table"),
+                            help="Weekend pose classifier")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Print the summaries without saving sessions")
+
+    def handle(self, *args, **options):
+        directory = options["directory"]
+        if not os.path.isdir(directory):
+            raise CommandError(f"{directory} is not a directory")
+
+        paths = video_files(directory)
+        if not paths:
+            self.stdout.write(f"No video files found in {directory}")
+            return
+
+        mode = options["mode"]
+        workers = max(1, min(options["workers"], len(paths)))
+        self.stdout.write(f"🎞️ Analysing {len(paths)} {mode} video(s) with {workers} worker(s)")
+
+        # MediaPipe graphs are not fork-safe, so workers start fresh
+        context = multiprocessing.get_context("spawn")
+        saved = failed = 0
+        pose_index_dir = getattr(settings, "MONITOR_POSE_INDEX_DIR", None)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = {
+                pool.submit(analyze_video, str(path), mode, options["classifier"], pose_index_dir): path
+                for path in paths
+            }
+            for future in as_completed(futures):
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    # A worker that dies (e.g. a native crash) breaks the pool
+                    # and fails every file still queued: report each one
+                    # instead of abandoning the summaries already collected
+                    summary = {"path": str(futures[future]), "error": f"{type(e).__name__}: {e}"}
+                name = os.path.basename(summary["path"])
+
+                if "error" in summary:
+                    failed += 1
+                    self.stderr.write(f"❌ {name}: {summary['error']}")
+                    continue
+
+                speed = summary["duration"] / summary["elapsed"] if summary["elapsed"] else 0
+                line = f"✅ {name}: {summary['duration']:.1f}s of video in {summary['elapsed']:.1f}s ({speed:.1f}x)"
+                if mode == "weekday":
+                    line += f", blinks: {summary['blink_count']}, bad posture: {int(summary['bad_posture_time'])}s"
+                    if summary["perclos"] is not None:
+                        line += f", PERCLOS: {summary['perclos']}%"
+                elif summary["holds"]:
+                    line += ", holds: " + ", ".join(f"{pose} x{n}" for pose, n in summary["holds"].items())
+                self.stdout.write(line)
+
+                if not options["dry_run"]:
+                    self.save(summary)
+                    saved += 1
+
+        self.stdout.write(f"💾 {saved} session(s) saved, {failed} file(s) failed")
+
+    def save(self, summary):
+        if summary["mode"] == "weekday":
+            WeekdaySession.objects.create(
+                duration=int(summary["duration"]),
+                blink_count=summary["blink_count"],
+                bad_posture_time=int(summary["bad_posture_time"])
+            )
+        else:
+            YogaSession.objects.create(duration=int(summary["duration"]))
@@ -0,0 +1,65 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from monitor.offline import replay_recording
+
+RECORDING_SUFFIX = ".lmk"
+
+
+def _parse_override(text):
+    name, sep, value = text.partition("=")
+    if not sep or not name:
+        raise CommandError(f"--set expects NAME=VALUE, got {text!r}")
+    try:
+        return name, json.loads(value)
+    except ValueError:
+        return name, value
+
+
+class Command(BaseCommand):
+    help = "Replay landmark recordings through the blink/posture/pose analytics without MediaPipe"
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", help="Recording files or directories of .lmk files")
+        parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                            help="Override a camera attribute, e.g. --set EAR_THRESHOLD=0.21")
+        parser.add_argument("--pose-table", metavar="FILE",
+                            help="JSON pose table to classify weekend recordings with")
+
+    def handle(self, *args, **options):
+        overrides = dict(_parse_override(text) for text in options["set"])
+
+        classifier = "table"
+        if options["pose_table"]:
+            from monitor.camera.poses import PoseClassifier
+            with open(options["pose_table"]) as f:
+                classifier = PoseClassifier(json.load(f))
+
+        paths = []
+        for path in options["paths"]:
+            if os.path.isdir(path):
+                paths += sorted(
+                    os.path.join(path, name) for name in os.listdir(path)
+                    if name.endswith(RECORDING_SUFFIX)
+                )
+            else:
+                paths.append(path)
+
+        for path in paths:
+            summary = replay_recording(path, overrides, classifier)
+            name = os.path.basename(path)
+            if "error" in summary:
+                self.stderr.write(f"❌ {name}: {summary['error']}")
+                continue
+
+            line = (f"▶️ {name}: {summary['frames']} frames, {summary['duration']:.1f}s "
+                    f"replayed in {summary['elapsed']:.2f}s")
+            if summary["mode"] == "weekday":
+                line += f", blinks: {summary['blink_count']}, bad posture: {int(summary['bad_posture_time'])}s"
+                if summary["perclos"] is not None:
+                    line += f", PERCLOS: {summary['perclos']}%"
+            elif summary["holds"]:
+                line += ", holds: " + ", ".join(f"{pose} x{n}" for pose, n in summary["holds"].items())
+            self.stdout.write(line)
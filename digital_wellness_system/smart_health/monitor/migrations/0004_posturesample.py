@@ -0,0 +1,42 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0003_posturebaseline"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PostureSample",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("session", models.CharField(max_length=40)),
+                ("camera", models.CharField(max_length=64)),
+                ("time", models.DateTimeField()),
+                ("seconds", models.FloatField()),
+                ("frames", models.IntegerField()),
+                ("status", models.CharField(max_length=32)),
+                ("face_seconds", models.FloatField(default=0)),
+                ("bad_seconds", models.FloatField(default=0)),
+                ("blinks", models.IntegerField(default=0)),
+                ("ear", models.FloatField(null=True)),
+                ("blink_rate", models.FloatField(null=True)),
+                ("perclos", models.FloatField(null=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["session", "time"], name="monitor_pos_session_8f6065_idx")
+                ],
+            },
+        ),
+    ]
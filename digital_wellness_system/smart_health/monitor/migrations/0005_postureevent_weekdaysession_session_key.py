@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0004_posturesample"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="weekdaysession",
+            name="session_key",
+            field=models.CharField(blank=True, default="", max_length=40),
+        ),
+        migrations.CreateModel(
+            name="PostureEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("session", models.CharField(max_length=40)),
+                ("camera", models.CharField(max_length=64)),
+                ("category", models.CharField(max_length=32)),
+                ("start", models.DateTimeField()),
+                ("end", models.DateTimeField()),
+                ("seconds", models.FloatField()),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["session", "start"], name="monitor_pos_session_97c209_idx")
+                ],
+            },
+        ),
+    ]
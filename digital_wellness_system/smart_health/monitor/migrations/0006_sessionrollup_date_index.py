@@ -0,0 +1,90 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:39
+
+import datetime
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def _periods(when):
+    day = timezone.localdate(when) if timezone.is_aware(when) else when.date()
+    return (("day", day), ("week", day - datetime.timedelta(days=day.weekday())))
+
+
+def backfill_rollups(apps, schema_editor):
+    """Roll up the sessions saved before the rollup table existed"""
+    SessionRollup = apps.get_model("monitor", "SessionRollup")
+    sessions = [
+        ("weekday", apps.get_model("monitor", "WeekdaySession"), ("blink_count", "bad_posture_time")),
+        ("weekend", apps.get_model("monitor", "YogaSession"), ()),
+    ]
+    totals = {}
+    for mode, model, extra in sessions:
+        for row in model.objects.values("date", "duration", *extra).iterator():
+            for period, start in _periods(row["date"]):
+                total = totals.setdefault((mode, period, start), [0, 0, 0, 0])
+                total[0] += 1
+                total[1] += row["duration"]
+                total[2] += row.get("blink_count", 0)
+                total[3] += row.get("bad_posture_time", 0)
+
+    SessionRollup.objects.bulk_create([
+        SessionRollup(
+            mode=mode, period=period, start=start,
+            sessions=n, duration=duration, blink_count=blinks, bad_posture_time=bad,
+        )
+        for (mode, period, start), (n, duration, blinks, bad) in totals.items()
+    ])
+
+
+def clear_rollups(apps, schema_editor):
+    apps.get_model("monitor", "SessionRollup").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0005_postureevent_weekdaysession_session_key"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="weekdaysession",
+            name="date",
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="yogasession",
+            name="date",
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.CreateModel(
+            name="SessionRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("mode", models.CharField(max_length=8)),
+                ("period", models.CharField(max_length=4)),
+                ("start", models.DateField()),
+                ("sessions", models.IntegerField(default=0)),
+                ("duration", models.IntegerField(default=0)),
+                ("blink_count", models.IntegerField(default=0)),
+                ("bad_posture_time", models.IntegerField(default=0)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("mode", "period", "start"), name="unique_rollup_period"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, clear_rollups),
+    ]
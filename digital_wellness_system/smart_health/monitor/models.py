@@ -1,9 +1,20 @@
-from django.db import models
+import datetime
+
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
 
 class YogaSession(models.Model):
-    date = models.DateTimeField(auto_now_add=True)
+    date = models.DateTimeField(auto_now_add=True, db_index=True)
     duration = models.IntegerField()  # seconds
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                SessionRollup.record("weekend", self.date, self.duration)
+
     @property
     def duration_minutes(self):
         return round(self.duration / 60, 2)
@@ -13,10 +24,20 @@ class YogaSession(models.Model):
 
 
 class WeekdaySession(models.Model):
-    date = models.DateTimeField(auto_now_add=True)
+    date = models.DateTimeField(auto_now_add=True, db_index=True)
     duration = models.IntegerField()  # seconds
     blink_count = models.IntegerField(default=0)
     bad_posture_time = models.IntegerField(default=0)  # seconds
+    # Monitoring run the samples and posture events of this session carry
+    session_key = models.CharField(max_length=40, blank=True, default="")
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                SessionRollup.record(
+                    "weekday", self.date, self.duration, self.blink_count, self.bad_posture_time)
 
     @property
     def duration_minutes(self):
@@ -27,4 +48,113 @@ class WeekdaySession(models.Model):
         return round(self.bad_posture_time / 60, 2)
 
     def __str__(self):
-        return f"{self.date} - {self.duration}s"
\ No newline at end of file
+        return f"{self.date} - {self.duration}s"
+
+class PostureBaseline(models.Model):
+    """A person's calibrated posture at one camera, reused across sessions"""
+    owner = models.CharField(max_length=64)  # "user:<id>" or "session:<key>"
+    camera = models.CharField(max_length=64)
+    width = models.IntegerField()
+    height = models.IntegerField()
+    # Welford statistics per measure: {"eye_dist": [n, mean, m2], ...}
+    stats = models.JSONField(default=dict)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["owner", "camera"], name="unique_baseline_per_camera"),
+        ]
+
+    def state(self):
+        """The form WeekdayCamera.use_baseline() takes"""
+        return {"width": self.width, "height": self.height, "stats": self.stats}
+
+    def __str__(self):
+        return f"{self.owner} @ {self.camera} ({self.width}x{self.height})"
+
+
+class PostureSample(models.Model):
+    """A few seconds of weekday monitoring, summed up for charts of the day"""
+    session = models.CharField(max_length=40)  # WeekdaySession.session_key
+    camera = models.CharField(max_length=64)
+    time = models.DateTimeField()  # end of the interval
+    seconds = models.FloatField()
+    frames = models.IntegerField()
+    status = models.CharField(max_length=32)  # most frequent in the interval
+    face_seconds = models.FloatField(default=0)
+    bad_seconds = models.FloatField(default=0)
+    blinks = models.IntegerField(default=0)
+    ear = models.FloatField(null=True)
+    blink_rate = models.FloatField(null=True)  # per minute, at the interval's end
+    perclos = models.FloatField(null=True)  # percent
+
+    class Meta:
+        indexes = [models.Index(fields=["session", "time"])]
+
+    def __str__(self):
+        return f"{self.time} - {self.status} ({self.seconds}s)"
+
+
+class PostureEvent(models.Model):
+    """One uninterrupted stretch of a bad-posture status ("SLOUCHED", ...)"""
+    session = models.CharField(max_length=40)  # WeekdaySession.session_key
+    camera = models.CharField(max_length=64)
+    category = models.CharField(max_length=32)
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    seconds = models.FloatField()
+
+    class Meta:
+        indexes = [models.Index(fields=["session", "start"])]
+
+    def __str__(self):
+        return f"{self.start} - {self.category} ({self.seconds}s)"
+
+
+def rollup_periods(when):
+    """(period, first day) of the day and the Monday-based week ``when`` falls in"""
+    day = timezone.localdate(when) if timezone.is_aware(when) else when.date()
+    return (("day", day), ("week", day - datetime.timedelta(days=day.weekday())))
+
+
+class SessionRollup(models.Model):
+    """Totals of one mode over a day or a week, updated as each session is saved.
+
+    History pages read their summaries from here instead of scanning every
+    session. Sessions deleted later are not subtracted.
+    """
+    mode = models.CharField(max_length=8)  # "weekday" or "weekend"
+    period = models.CharField(max_length=4)  # "day" or "week"
+    start = models.DateField()
+    sessions = models.IntegerField(default=0)
+    duration = models.IntegerField(default=0)  # seconds
+    blink_count = models.IntegerField(default=0)
+    bad_posture_time = models.IntegerField(default=0)  # seconds
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["mode", "period", "start"], name="unique_rollup_period"),
+        ]
+
+    @classmethod
+    def record(cls, mode, when, duration, blink_count=0, bad_posture_time=0):
+        """Add one session to its day and week"""
+        for period, start in rollup_periods(when):
+            cls.objects.get_or_create(mode=mode, period=period, start=start)
+            cls.objects.filter(mode=mode, period=period, start=start).update(
+                sessions=F("sessions") + 1,
+                duration=F("duration") + duration,
+                blink_count=F("blink_count") + blink_count,
+                bad_posture_time=F("bad_posture_time") + bad_posture_time,
+            )
+
+    @property
+    def duration_minutes(self):
+        return round(self.duration / 60, 1)
+
+    @property
+    def bad_posture_percent(self):
+        return round(self.bad_posture_time * 100 / self.duration) if self.duration else 0
+
+    def __str__(self):
+        return f"{self.mode} {self.period} of {self.start}: {self.sessions} sessions"
@@ -0,0 +1,146 @@
+import time
+from pathlib import Path
+
+import cv2
+
+# Kept free of Django imports: these functions run in pool worker processes
+VIDEO_SUFFIXES = {".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v"}
+DEFAULT_FPS = 30.0
+
+
+class FrameClock:
+    """Clock that reads the timestamp of the frame being analysed"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def video_files(directory):
+    return sorted(p for p in Path(directory).iterdir() if p.suffix.lower() in VIDEO_SUFFIXES)
+
+
+def _camera(mode, clock, classifier, backend="inprocess", pose_index_dir=None):
+    # Imported here so the parent process never loads MediaPipe
+    if mode == "weekday":
+        from .camera.weekday import WeekdayCamera
+        return WeekdayCamera(backend=backend, clock=clock, voice=False)
+    from .camera.weekend import WeekendCamera
+    return WeekendCamera(backend=backend, classifier=classifier, clock=clock, pose_index_dir=pose_index_dir)
+
+
+def _track_hold(camera, held, holds):
+    if held and not camera.pose_locked:
+        # A pose was held for the full HOLD_DURATION
+        holds[camera.final_pose] = holds.get(camera.final_pose, 0) + 1
+
+
+def _summary(camera, mode, path, frames, duration, now, holds, started):
+    summary = {
+        "path": path,
+        "mode": mode,
+        "frames": frames,
+        "duration": duration,
+        "elapsed": time.perf_counter() - started,
+    }
+
+    if mode == "weekday":
+        bad_posture_time = camera.total_bad_posture_time
+        if camera.bad_posture_start is not None:
+            # Still slouching when the recording ended
+            bad_posture_time += now - camera.bad_posture_start
+        summary["blink_count"] = camera.session_blink_count
+        # Over the last hour of the recording at most
+        summary["perclos"] = camera.blink_stats.history_perclos()
+        summary["bad_posture_time"] = min(bad_posture_time, duration)
+    else:
+        summary["holds"] = holds
+
+    return summary
+
+
+def analyze_video(path, mode="weekday", classifier="table", pose_index_dir=None):
+    """Run a recorded video through the live analyzers as fast as possible.
+
+    Timers follow the frame timestamps (frame index / fps) rather than the
+    wall clock, so a 10 minute recording gives the same totals as 10 live
+    minutes however quickly it is processed. Returns a summary dict; on
+    failure the dict carries an "error" message instead.
+    """
+    path = str(path)
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        return {"path": path, "mode": mode, "error": "could not open video"}
+
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    if not fps or fps != fps or fps > 1000:  # missing, NaN or bogus
+        fps = DEFAULT_FPS
+
+    clock = FrameClock()
+    camera = None
+    frames = 0
+    holds = {}
+    started = time.perf_counter()
+
+    try:
+        camera = _camera(mode, clock, classifier, pose_index_dir=pose_index_dir)
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            clock.now = frames / fps
+            frames += 1
+
+            held = getattr(camera, "pose_locked", False)
+            camera.analyze(frame)
+            _track_hold(camera, held, holds)
+    except Exception as e:
+        return {"path": path, "mode": mode, "error": str(e)}
+    finally:
+        cap.release()
+        if camera is not None:
+            camera.release()
+
+    return _summary(camera, mode, path, frames, frames / fps, clock.now, holds, started)
+
+
+def replay_recording(path, overrides=None, classifier="table"):
+    """Feed a landmark recording through the analytics without MediaPipe.
+
+    ``overrides`` sets camera attributes before the replay starts, e.g.
+    ``{"EAR_THRESHOLD": 0.21}``; ``classifier`` may also be a classifier
+    object, such as a PoseClassifier built from an edited pose table.
+    Timers run on the recorded timestamps, so hours replay in seconds.
+    """
+    from .camera.recording import LandmarkRecording
+
+    path = str(path)
+    started = time.perf_counter()
+    try:
+        recording = LandmarkRecording(path)
+    except (OSError, ValueError) as e:
+        return {"path": path, "error": str(e)}
+
+    # Older recordings kept the analyzer class under "camera"
+    analyzer = recording.meta.get("analyzer", recording.meta.get("camera"))
+    mode = "weekday" if analyzer == "WeekdayCamera" else "weekend"
+    clock = FrameClock()
+    if len(recording):
+        clock.now = float(recording.records["time"][0])
+    camera = _camera(mode, clock, classifier, backend=None)
+    for name, value in (overrides or {}).items():
+        setattr(camera, name, value)
+
+    holds = {}
+    for i in range(len(recording)):
+        clock.now, w, h, landmarks, detected = recording.frame(i)
+        if mode == "weekday":
+            camera.update(landmarks["face"], landmarks["pose"], w, h, face_fresh="face" in detected)
+        else:
+            held = camera.pose_locked
+            camera.update(landmarks["pose"], w, h)
+            _track_hold(camera, held, holds)
+
+    return _summary(camera, mode, path, len(recording), recording.duration, clock.now, holds, started)
@@ -1,3 +1,1854 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import io
+import json
+import math
+import multiprocessing
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.apps import apps
+from django.core.management import call_command
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from .camera.base_camera import FrameBuffer, FrameCursor
+from .camera.baseline import MEASURES, DriftDetector, PostureBaseline, RunningStats
+from .camera.broadcast import FrameHub
+from .camera.inference import _inference_worker
+from .camera.metrics import MetricsChannel, _Deltas, delta_events
+from .camera.pipeline import DropOldestQueue, FramePipeline
+from .camera.pose_index import JOINTS, TWINS, ReferencePoseClassifier, embed_pose, label_for
+from .camera.poses import JOINT_ANGLES, LANDMARKS, POSE_TABLE, PoseClassifier, joint_angles
+from .camera.recording import DETECTED, ESTIMATED, MISSING, LandmarkRecorder, LandmarkRecording
+from .camera.registry import CameraRegistry
+from .camera.roi import ROI_SIZE, crop_roi, downscale, face_roi, roi_to_frame
+from .camera.rolling import BlinkStatistics, MinuteHistogram, RollingWindow
+from .camera.scheduler import InferenceScheduler
+from .camera.sources import ClipSource, FileSource, SyntheticSource, open_source
+from .camera.speech import URGENT, SpeechWorker
+from .camera.telemetry import BUCKETS, Counter, Telemetry, telemetry
+from .models import PostureEvent, PostureSample, SessionRollup, WeekdaySession, YogaSession, rollup_periods
+from .offline import FrameClock, _camera, _summary, replay_recording
+from .views import _history_page, _page_query, _posture_breakdown
+from .writer import BufferedWriter
+
+
+# =========================
+# POSE CLASSIFIER
+# =========================
+def _angle(a, b, c):
+    angle = abs(math.degrees(math.atan2(c[1] - b[1], c[0] - b[0]) - math.atan2(a[1] - b[1], a[0] - b[0])))
+    return 360 - angle if angle > 180 else angle
+
+
+def _ladder(points):
+    """The if/elif ladder WeekendCamera.classifyPose used before the pose table"""
+    p = {name: points[index] for name, index in LANDMARKS.items()}
+    a = {name: _angle(p[x], p[y], p[z]) for name, (x, y, z) in JOINT_ANGLES.items()}
+    label = "Unknown Pose"
+
+    if 165 < a["left_elbow"] < 195 and 165 < a["right_elbow"] < 195:
+        if 80 < a["left_shoulder"] < 110 and 80 < a["right_shoulder"] < 110:
+            if 165 < a["left_knee"] < 195 or 165 < a["right_knee"] < 195:
+                if 90 < a["left_knee"] < 120 or 90 < a["right_knee"] < 120:
+                    label = "Virabhadrasana II"
+            if 160 < a["left_knee"] < 195 and 160 < a["right_knee"] < 195:
+                label = "T Pose"
+
+    if 165 < a["left_knee"] < 195 or 165 < a["right_knee"] < 195:
+        if 315 < a["left_knee"] < 335 or 25 < a["right_knee"] < 45:
+            label = "Vrikshasana"
+
+    if 165 < a["left_elbow"] < 195 and 165 < a["right_elbow"] < 195:
+        if 165 < a["left_knee"] < 195 and 165 < a["right_knee"] < 195:
+            if 60 < a["left_hip"] < 120 and 60 < a["right_hip"] < 120:
+                if p["left_wrist"][1] > p["left_ankle"][1] or p["right_wrist"][1] > p["right_ankle"][1]:
+                    label = "Adho Mukha Svanasana"
+
+    if 165 < a["left_knee"] < 195 and 165 < a["right_knee"] < 195:
+        if 20 < a["left_hip"] < 60 and 20 < a["right_hip"] < 60:
+            if (abs(p["left_wrist"][1] - p["left_ankle"][1]) < 50
+                    or abs(p["right_wrist"][1] - p["right_ankle"][1]) < 50):
+                label = "Uttanasana"
+
+    if 80 < a["left_knee"] < 120 and 80 < a["right_knee"] < 120:
+        if 80 < a["left_hip"] < 120 and 80 < a["right_hip"] < 120:
+            if 160 < a["left_shoulder"] < 200 and 160 < a["right_shoulder"] < 200:
+                if 165 < a["left_elbow"] < 195 and 165 < a["right_elbow"] < 195:
+                    label = "Utkatasana"
+
+    if 165 < a["left_knee"] < 195 and 165 < a["right_knee"] < 195:
+        if 160 < a["left_hip"] < 195 and 160 < a["right_hip"] < 195:
+            if 160 < a["left_shoulder"] < 200 and 160 < a["right_shoulder"] < 200:
+                if 165 < a["left_elbow"] < 195 and 165 < a["right_elbow"] < 195:
+                    label = "Urdhva Hastasana"
+
+    return label
+
+
+def _turn(origin, towards, degrees, length):
+    """The point ``length`` away from ``origin``, ``degrees`` off the direction of ``towards``"""
+    d = (towards - origin) / np.linalg.norm(towards - origin)
+    t = math.radians(degrees)
+    rotated = np.array([d[0] * math.cos(t) - d[1] * math.sin(t), d[0] * math.sin(t) + d[1] * math.cos(t)])
+    return origin + rotated * length
+
+
+def _skeleton(angles, rng):
+    """33 pose landmarks whose joint angles are ``angles``, with random limb lengths and bends"""
+    points = np.zeros((33, 3))
+    for side, x in (("left", 300.0), ("right", 340.0)):
+        def lm(name):
+            return LANDMARKS[f"{side}_{name}"]
+
+        def bend(angle):
+            return angle * rng.choice((-1, 1))
+
+        shoulder = np.array([x, 200.0])
+        hip = shoulder + [rng.uniform(-20, 20), rng.uniform(120, 180)]
+        elbow = _turn(shoulder, hip, bend(angles[f"{side}_shoulder"]), rng.uniform(60, 120))
+        wrist = _turn(elbow, shoulder, bend(angles[f"{side}_elbow"]), rng.uniform(60, 120))
+        knee = _turn(hip, shoulder, bend(angles[f"{side}_hip"]), rng.uniform(80, 140))
+        ankle = _turn(knee, hip, bend(angles[f"{side}_knee"]), rng.uniform(80, 140))
+        for name, point in (("shoulder", shoulder), ("hip", hip), ("elbow", elbow),
+                            ("wrist", wrist), ("knee", knee), ("ankle", ankle)):
+            points[lm(name), :2] = point
+    return points
+
+
+class PoseClassifierTests(SimpleTestCase):
+    def test_skeleton_has_the_requested_angles(self):
+        rng = np.random.default_rng(1)
+        angles = {name: rng.uniform(5, 175) for name in JOINT_ANGLES}
+        measured = joint_angles(_skeleton(angles, rng))
+        np.testing.assert_allclose(measured, list(angles.values()), atol=1e-6)
+
+    def test_matches_the_old_ladder(self):
+        """Random skeletons near every pose of the table get the ladder's label"""
+        classifier = PoseClassifier()
+        rng = np.random.default_rng(6)
+        seen = set()
+        for _ in range(4000):
+            # Mostly inside one pose's windows, sometimes just anywhere
+            target = POSE_TABLE[rng.integers(len(POSE_TABLE))]
+            windows = dict(target.get("all", {}))
+            for group in target.get("any", []):
+                windows.update(group)
+            angles = {}
+            for name in JOINT_ANGLES:
+                low, high = windows.get(name, (0, 180))
+                if low >= 180 or rng.random() < 0.1:
+                    low, high = 0, 180
+                angles[name] = rng.uniform(max(low, 0.5), min(high, 179.5))
+            points = _skeleton(angles, rng)
+
+            expected = _ladder(points)
+            seen.add(expected)
+            self.assertEqual(classifier.classify(points), expected, angles)
+
+        # Every pose was hit at least once, so all the table's rows were compared
+        self.assertEqual(seen, {pose["label"] for pose in POSE_TABLE} | {PoseClassifier.UNKNOWN})
+
+    def test_unknown_when_nothing_matches(self):
+        points = _skeleton({name: 10.0 for name in JOINT_ANGLES}, np.random.default_rng(0))
+        self.assertEqual(PoseClassifier().classify(points), PoseClassifier.UNKNOWN)
+
+    def test_pose_without_constraints_is_rejected(self):
+        with self.assertRaises(ValueError):
+            PoseClassifier([{"label": "Nothing"}])
+
+
+# =========================
+# REFERENCE POSE INDEX
+# =========================
+def _mirrored(points, width=640):
+    """The landmarks MediaPipe finds in the horizontally flipped image"""
+    mirrored = points.copy()
+    mirrored[JOINTS, 0] = width - points[TWINS, 0]
+    mirrored[JOINTS, 1] = points[TWINS, 1]
+    return mirrored
+
+
+_T_POSE = {"left_shoulder": 90, "right_shoulder": 90, "left_elbow": 180, "right_elbow": 180,
+           "left_hip": 175, "right_hip": 175, "left_knee": 180, "right_knee": 180}
+_CHAIR = {"left_shoulder": 170, "right_shoulder": 170, "left_elbow": 175, "right_elbow": 175,
+          "left_hip": 100, "right_hip": 100, "left_knee": 100, "right_knee": 100}
+
+
+class PoseIndexTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.references = {"T Pose": _skeleton(_T_POSE, rng), "Utkatasana": _skeleton(_CHAIR, rng)}
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.images = os.path.join(directory.name, "images")
+        self.cache = os.path.join(directory.name, "cache")
+        os.mkdir(self.images)
+        for name in ("T-Pose.png", "Utkatasana.png"):
+            with open(os.path.join(self.images, name), "wb") as f:
+                f.write(b"png")
+
+    def build_index(self, paths, backend=None):
+        """build_index without MediaPipe: the references, each also mirrored"""
+        embeddings, labels = [], []
+        for path in paths:
+            for mirror in (False, True):
+                embeddings.append(embed_pose(self.references[label_for(path)], mirror))
+                labels.append(label_for(path))
+        return np.array(embeddings), labels
+
+    def classifier(self):
+        with mock.patch("monitor.camera.pose_index.build_index", side_effect=self.build_index) as build:
+            classifier = ReferencePoseClassifier(images_dir=self.images, cache_dir=self.cache)
+        return classifier, build.call_count
+
+    def test_embedding_ignores_position_scale_and_mirroring(self):
+        points = self.references["T Pose"]
+        embedding = embed_pose(points)
+        self.assertAlmostEqual(float(np.linalg.norm(embedding)), 1.0, places=6)
+        np.testing.assert_allclose(embed_pose(points * 1.7 + (40, -25, 0)), embedding, atol=1e-6)
+
+        mirrored = _mirrored(points)
+        self.assertGreater(np.abs(embed_pose(mirrored) - embedding).max(), 0.01)
+        np.testing.assert_allclose(embed_pose(points, mirror=True), embed_pose(mirrored), atol=1e-6)
+        np.testing.assert_allclose(embed_pose(mirrored, mirror=True), embedding, atol=1e-6)
+
+    def test_nearest_reference_wins(self):
+        classifier, _ = self.classifier()
+        rng = np.random.default_rng(8)
+        for label, points in self.references.items():
+            near = points + rng.normal(0, 3, points.shape)
+            self.assertEqual(classifier.classify(near), label)
+            self.assertEqual(classifier.classify(_mirrored(near)), label)
+
+        # Halfway between the two is close to neither
+        classifier.MAX_DISTANCE = 0.01
+        halfway = (self.references["T Pose"] + self.references["Utkatasana"]) / 2
+        self.assertEqual(classifier.classify(halfway), ReferencePoseClassifier.UNKNOWN)
+
+    def test_index_is_cached_outside_the_images(self):
+        _, builds = self.classifier()
+        self.assertEqual(builds, 1)
+        self.assertEqual(sorted(os.listdir(self.images)), ["T-Pose.png", "Utkatasana.png"])
+        cached = sorted(os.listdir(self.cache))
+        self.assertEqual([os.path.splitext(name)[1] for name in cached], [".json", ".npy"])
+
+        # Loaded from the cache; a changed image is indexed again
+        classifier, builds = self.classifier()
+        self.assertEqual((builds, len(classifier.labels)), (0, 4))
+        os.utime(os.path.join(self.images, "T-Pose.png"), ns=(1, 1))
+        _, builds = self.classifier()
+        self.assertEqual(builds, 1)
+
+    def test_failed_write_leaves_no_index_behind(self):
+        with mock.patch("monitor.camera.pose_index.np.save", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.classifier()
+        self.assertFalse([name for name in os.listdir(self.cache) if name.endswith((".npy", ".tmp"))])
+        _, builds = self.classifier()
+        self.assertEqual(builds, 1)
+
+
+# =========================
+# LANDMARK RECORDINGS
+# =========================
+def _face(closed=False, slouch=False):
+    """The FACE_POINTS rows of normalised FaceMesh landmarks, eyes open or closed"""
+    from .camera.weekday import FACE_POINTS, LEFT_EYE, NOSE_TIP, RIGHT_EYE
+    face = np.zeros((478, 3), dtype=np.float32)
+    gap = 2 if closed else 10
+    for eye, x in ((LEFT_EYE, 280), (RIGHT_EYE, 360)):
+        face[eye[0], :2] = (x, 200)
+        face[eye[3], :2] = (x + 30, 200)
+        for top, bottom, dx in ((1, 5, 10), (2, 4, 20)):
+            face[eye[top], :2] = (x + dx, 200 - gap / 2)
+            face[eye[bottom], :2] = (x + dx, 200 + gap / 2)
+    face[NOSE_TIP, :2] = (335, 320 if slouch else 240)
+    face[:, 0] /= 640
+    face[:, 1] /= 480
+    return face[FACE_POINTS]
+
+
+def _pose():
+    """The shoulder rows of normalised Pose landmarks"""
+    return np.array([(250 / 640, 380 / 480, 0), (420 / 640, 380 / 480, 0)], dtype=np.float32)
+
+
+class LandmarkRecordingTests(SimpleTestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.path = os.path.join(self.dir.name, "test.lmk")
+
+    def test_frames_read_back_as_written(self):
+        rng = np.random.default_rng(14)
+        recorder = LandmarkRecorder(self.path, {"a": [1, 3], "b": [0]}, {"a": 5, "b": 2}, {"camera": "desk-1"})
+        written = []
+        for i in range(10):
+            # Just the recorded rows, as the cameras hand them over
+            a = rng.random((2, 3)).astype(np.float32)
+            b = None if i % 4 == 0 else rng.random((1, 3)).astype(np.float32).tolist()
+            detected = ("a",) if i % 2 else ()
+            recorder.append(i * 0.5, 640, 480, {"a": a, "b": b}, detected)
+            written.append((a, b, detected))
+        recorder.close()
+
+        recording = LandmarkRecording(self.path)
+        self.assertEqual(len(recording), 10)
+        self.assertEqual(recording.meta, {"camera": "desk-1"})
+        self.assertEqual(recording.duration, 4.5)
+        self.assertEqual(recording.records["a_state"].tolist(), [ESTIMATED, DETECTED] * 5)
+        self.assertEqual(recording.records["b_state"][0], MISSING)
+        for i, (a, b, detected) in enumerate(written):
+            time, w, h, landmarks, fresh = recording.frame(i)
+            self.assertEqual((time, w, h), (i * 0.5, 640, 480))
+            self.assertEqual(fresh, set(detected))
+            np.testing.assert_array_equal(landmarks["a"], a)
+            if b is None:
+                self.assertIsNone(landmarks["b"])
+            else:
+                np.testing.assert_array_equal(landmarks["b"], np.array(b, dtype=np.float32))
+
+    def test_partial_last_record_is_ignored(self):
+        recorder = LandmarkRecorder(self.path, {"a": [0]}, {"a": 1})
+        for i in range(3):
+            recorder.append(i, 10, 10, {"a": np.ones((1, 3), dtype=np.float32)})
+        recorder.close()
+        with open(self.path, "ab") as f:
+            f.write(b"\0" * 5)
+        self.assertEqual(len(LandmarkRecording(self.path)), 3)
+
+    def test_other_files_are_rejected(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a recording")
+        with self.assertRaises(ValueError):
+            LandmarkRecording(self.path)
+        self.assertIn("error", replay_recording(self.path))
+
+    def test_replay_gives_the_live_totals(self):
+        """A recorded weekday run replays to the totals it had live"""
+        clock = FrameClock()
+        camera = _camera("weekday", clock, "table", backend=None)
+        camera.start_recording(self.path, meta={"camera": "desk-1"})
+        pose = _pose()
+        for i in range(900):
+            clock.now = i / 30
+            # A blink every 3 s; slouching for the second half
+            face = _face(closed=i % 90 in (40, 41, 42, 43), slouch=i > 450)
+            pose_now = pose if i % 3 == 0 else None
+            detected = ("face", "pose") if pose_now is not None else ("face",)
+            camera.recorder.append(clock.now, 640, 480, {"face": face, "pose": pose_now}, detected)
+            camera.update(face, pose_now, 640, 480)
+        camera.stop_recording()
+        live = _summary(camera, "weekday", self.path, 900, clock.now, clock.now, {}, 0.0)
+
+        replayed = replay_recording(self.path)
+        self.assertEqual(replayed["mode"], "weekday")
+        self.assertEqual(replayed["frames"], 900)
+        self.assertEqual(replayed["blink_count"], 10)
+        self.assertGreater(replayed["bad_posture_time"], 0)
+        for key in ("blink_count", "perclos", "bad_posture_time"):
+            self.assertEqual(replayed[key], live[key], key)
+
+
+# =========================
+# FRAME BUFFER
+# =========================
+class FrameBufferTests(SimpleTestCase):
+    def test_readers_get_the_newest_frame_and_count_what_they_missed(self):
+        buffer = FrameBuffer(size=2)
+        fast, slow = FrameCursor(), FrameCursor()
+        dropped = Counter()
+        for i in range(1, 6):
+            buffer.put(f"frame {i}", float(i))
+            self.assertEqual(buffer.latest(fast, 0, dropped=dropped), (float(i), f"frame {i}"))
+            if i == 1:
+                self.assertEqual(buffer.latest(slow, 0), (1.0, "frame 1"))
+        self.assertEqual(buffer.latest(slow, 0, dropped=dropped), (5.0, "frame 5"))
+
+        self.assertEqual(buffer.frames_captured, 5)
+        self.assertEqual((fast.frames_consumed, fast.frames_dropped), (5, 0))
+        self.assertEqual((slow.frames_consumed, slow.frames_dropped), (2, 3))
+        self.assertEqual(dropped.value, 3)
+
+    def test_full_buffer_overwrites_the_oldest(self):
+        buffer = FrameBuffer(size=2)
+        for i in range(1, 6):
+            buffer.put(f"frame {i}", float(i))
+        self.assertEqual([frame for _, _, frame in buffer._frames], ["frame 4", "frame 5"])
+        # Frames from before a reader's first read are not drops
+        cursor = FrameCursor()
+        self.assertEqual(buffer.latest(cursor, 0), (5.0, "frame 5"))
+        self.assertEqual(cursor.frames_dropped, 0)
+
+    def test_nothing_new_times_out(self):
+        buffer = FrameBuffer()
+        cursor = FrameCursor()
+        self.assertEqual(buffer.latest(cursor, 0.01), (None, None))
+        buffer.put("frame", 1.0)
+        buffer.latest(cursor, 0)
+        self.assertEqual(buffer.latest(cursor, 0.01), (None, None))
+        self.assertEqual(cursor.frames_consumed, 1)
+
+    def test_close_wakes_a_waiting_reader(self):
+        buffer = FrameBuffer()
+        got = []
+        reader = threading.Thread(target=lambda: got.append(buffer.latest(FrameCursor(), 5)))
+        reader.start()
+        time.sleep(0.05)
+        buffer.close()
+        reader.join(1)
+        self.assertEqual(got, [(None, None)])
+
+        buffer.reopen()
+        buffer.put("frame", 2.0)
+        self.assertEqual(buffer.latest(FrameCursor(), 0), (2.0, "frame"))
+
+
+# =========================
+# FRAME SOURCES
+# =========================
+class FrameSourceTests(SimpleTestCase):
+    def test_clip_loops_and_hands_out_copies(self):
+        frames = [np.full((4, 4, 3), i, dtype=np.uint8) for i in range(3)]
+        source = ClipSource(frames)
+        values = []
+        for _ in range(7):
+            ok, frame = source.read()
+            self.assertTrue(ok)
+            values.append(int(frame[0, 0, 0]))
+            frame[:] = 255  # cameras draw on what they read
+        self.assertEqual(values, [0, 1, 2, 0, 1, 2, 0])
+        self.assertEqual(int(frames[0].max()), 0)
+
+        source.release()
+        self.assertFalse(source.isOpened())
+        self.assertEqual(source.read(), (False, None))
+
+    def test_empty_clip_is_rejected(self):
+        with self.assertRaises(ValueError):
+            ClipSource([])
+
+    def test_synthetic_frames_have_the_size_and_move(self):
+        source = open_source("synthetic:320x200")
+        self.assertIsInstance(source, SyntheticSource)
+        ok, first = source.read()
+        ok, second = source.read()
+        self.assertEqual(first.shape, (200, 320, 3))
+        self.assertFalse(np.array_equal(first, second))
+
+    def test_looped_file_restarts(self):
+        import cv2
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "clip.avi")
+            writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+            for i in range(5):
+                writer.write(np.full((48, 64, 3), i * 50, dtype=np.uint8))
+            writer.release()
+
+            once = FileSource(path)
+            self.assertEqual(sum(once.read()[0] for _ in range(8)), 5)
+            once.release()
+
+            looped = open_source(f"file:{path}")
+            looped.loop = True
+            self.assertTrue(all(looped.read()[0] for _ in range(12)))
+            looped.release()
+
+    def test_open_source_kinds(self):
+        clip = ClipSource([np.zeros((2, 2, 3), dtype=np.uint8)])
+        self.assertIs(open_source(clip), clip)
+        loop = open_source("loop:/no/such/clip.mp4")
+        self.assertIsInstance(loop, FileSource)
+        self.assertTrue(loop.loop)
+        self.assertFalse(loop.isOpened())
+        self.assertEqual(open_source("synthetic").read()[1].shape, (480, 640, 3))
+
+
+# =========================
+# ROLLING STATISTICS
+# =========================
+class RollingWindowTests(SimpleTestCase):
+    def test_matches_numpy_over_the_same_samples(self):
+        rng = np.random.default_rng(21)
+        ring = RollingWindow(50, window=2.0)
+        kept = []  # (time, value, weight) still in the window
+        now = 0.0
+        for _ in range(5000):
+            now += rng.exponential(0.05)
+            value, weight = rng.uniform(0.1, 0.4), rng.uniform(0.01, 1.0)
+            ring.add(value, now, weight)
+            kept = [s for s in kept + [(now, value, weight)] if s[0] >= now - 2.0][-50:]
+
+            _, values, weights = np.array(kept).T
+            self.assertEqual(ring.count, len(kept))
+            self.assertAlmostEqual(ring.mean, np.average(values, weights=weights), places=9)
+            variance = np.average((values - np.average(values, weights=weights)) ** 2, weights=weights)
+            self.assertAlmostEqual(ring.variance, variance, places=9)
+
+    def test_empty_window(self):
+        ring = RollingWindow(4, window=1.0)
+        self.assertIsNone(ring.mean)
+        self.assertIsNone(ring.std)
+        ring.add(1.0, 0.0)
+        ring.expire(5.0)
+        self.assertEqual(ring.count, 0)
+        self.assertIsNone(ring.variance)
+
+
+class MinuteHistogramTests(SimpleTestCase):
+    def test_skipped_minutes_read_as_zero(self):
+        histogram = MinuteHistogram(("blinks",), minutes=3)
+        histogram.add(10, blinks=1)
+        histogram.add(70, blinks=2)
+        histogram.add(200, blinks=4)  # minute 3; minute 2 had nothing
+        self.assertEqual([row["blinks"] for row in histogram.rows()], [2, 0, 4])
+        self.assertEqual(histogram.totals(), {"blinks": 6})
+        histogram.add(0, blinks=8)  # older than the ring
+        self.assertEqual(histogram.totals(), {"blinks": 6})
+
+
+class BlinkStatisticsTests(SimpleTestCase):
+    def test_matches_numpy_over_the_same_samples(self):
+        rng = np.random.default_rng(12)
+        window, minutes = 20.0, 2
+        stats = BlinkStatistics(window=window, history_minutes=minutes)
+        samples = []    # (time, ear)
+        intervals = []  # (time, closed before it, seconds)
+        blinks = []     # (time, duration)
+        now, closed = 0.0, False
+
+        for i in range(6000):
+            # Mostly camera-rate gaps, now and then the face is lost for a while
+            now += rng.uniform(1.5, 4.0) if rng.random() < 0.005 else rng.uniform(0.02, 0.06)
+            ear = rng.uniform(0.1, 0.35)
+            if samples and 0 < now - samples[-1][0] <= BlinkStatistics.MAX_GAP:
+                intervals.append((now, closed, now - samples[-1][0]))
+            closed = ear < 0.2
+            stats.sample(now, ear, closed)
+            samples.append((now, ear))
+            if rng.random() < 0.01:
+                duration = rng.uniform(0.05, 0.4)
+                stats.blink(now, duration)
+                blinks.append((now, duration))
+
+            if i % 50:
+                continue
+            snapshot = stats.snapshot(now)
+            start = now - window
+
+            ears = np.array([e for t, e in samples if t >= start])
+            self.assertAlmostEqual(snapshot["ear_mean"], ears.mean(), delta=0.0006)
+            self.assertAlmostEqual(snapshot["ear_std"], ears.std(), delta=0.0006)
+
+            recent = [(c, dt) for t, c, dt in intervals if t >= start]
+            if recent:
+                flags, seconds = np.array(recent, dtype=float).T
+                self.assertAlmostEqual(snapshot["perclos"], np.average(flags, weights=seconds) * 100, delta=0.06)
+
+            durations = [d for t, d in blinks if t >= start]
+            self.assertEqual(snapshot["blink_rate"], round(len(durations) * 60 / window))
+            if durations:
+                self.assertAlmostEqual(snapshot["blink_duration"], np.mean(durations), delta=0.006)
+            else:
+                self.assertIsNone(snapshot["blink_duration"])
+
+            # The per-minute history covers the current minute and the one before
+            first_minute = int(now // 60) - minutes + 1
+            history = [(c, dt) for t, c, dt in intervals if int(t // 60) >= first_minute]
+            if history:
+                flags, seconds = np.array(history, dtype=float).T
+                self.assertAlmostEqual(
+                    stats.history_perclos(), np.average(flags, weights=seconds) * 100, delta=0.06)
+            else:
+                self.assertIsNone(stats.history_perclos())
+            self.assertEqual(
+                stats.history.totals()["blinks"],
+                sum(1 for t, _ in blinks if int(t // 60) >= first_minute))
+
+    def test_no_data(self):
+        stats = BlinkStatistics()
+        self.assertIsNone(stats.history_perclos())
+        self.assertEqual(stats.snapshot(10.0), {
+            "blink_rate": 0, "ear_mean": None, "ear_std": None, "perclos": None, "blink_duration": None,
+        })
+
+
+# =========================
+# POSTURE BASELINE
+# =========================
+class RunningStatsTests(SimpleTestCase):
+    def test_matches_numpy(self):
+        values = np.random.default_rng(22).normal(50, 7, 500)
+        stats = RunningStats()
+        for value in values:
+            stats.add(value)
+        self.assertEqual(stats.n, 500)
+        self.assertAlmostEqual(stats.mean, values.mean(), places=9)
+        self.assertAlmostEqual(stats.variance, values.var(ddof=1), places=9)
+        self.assertAlmostEqual(stats.std, values.std(ddof=1), places=9)
+
+    def test_old_samples_fade_out(self):
+        stats = RunningStats()
+        for _ in range(1000):
+            stats.add(0.0, max_n=100)
+        # Each new sample keeps a weight of 1/max_n
+        for _ in range(100):
+            stats.add(10.0, max_n=100)
+        self.assertEqual(stats.n, 100)
+        self.assertAlmostEqual(stats.mean, 10 * (1 - 0.99 ** 100), places=9)
+
+    def test_one_sample_has_no_spread(self):
+        stats = RunningStats()
+        stats.add(3.0)
+        self.assertEqual((stats.mean, stats.variance), (3.0, 0.0))
+
+
+def _measures(**changes):
+    measures = {"shoulder_nose": -140, "shoulder_diff": 0, "eye_dist": 110, "shoulder_mid": 380}
+    measures.update(changes)
+    return measures
+
+
+class PostureBaselineTests(SimpleTestCase):
+    def test_deviation_is_the_worst_measure_in_spreads(self):
+        baseline = PostureBaseline()
+        for i in range(100):
+            # shoulder_nose spreads by 10 px, the others by 1 px or not at all
+            baseline.add(_measures(shoulder_nose=-140 + (10 if i % 2 else -10), eye_dist=110 + i % 2), 640, 480)
+        spread = baseline.stats["shoulder_nose"].std
+        self.assertAlmostEqual(baseline.deviation(_measures(shoulder_nose=-140 + 2 * spread)), 2.0, delta=0.02)
+        # Below MIN_STD the floor is used, so 8 px is 2 spreads, not 16
+        self.assertAlmostEqual(baseline.deviation(_measures(shoulder_mid=388)), 8 / PostureBaseline.MIN_STD, delta=0.02)
+        self.assertAlmostEqual(baseline.deviation(_measures(shoulder_nose=-140 - spread, eye_dist=98.5)), 12 / 4, delta=0.02)
+
+    def test_state_round_trip(self):
+        baseline = PostureBaseline()
+        for i in range(10):
+            baseline.add(_measures(shoulder_nose=-140 + i), 640, 480)
+        restored = PostureBaseline.from_state(baseline.state())
+        self.assertTrue(restored.fits(640, 480))
+        self.assertFalse(restored.fits(1280, 720))
+        self.assertEqual(restored.samples, 10)
+        for name in MEASURES:
+            self.assertEqual(restored.mean(name), baseline.mean(name))
+        self.assertEqual(restored.deviation(_measures(shoulder_nose=-120)), baseline.deviation(_measures(shoulder_nose=-120)))
+
+
+class DriftDetectorTests(SimpleTestCase):
+    def run_for(self, drift, start, seconds, deviation, fps=10):
+        fired = False
+        for i in range(int(seconds * fps)):
+            fired = drift.update(start + i / fps, deviation(i) if callable(deviation) else deviation) or fired
+        return fired
+
+    def test_fires_after_hold_seconds_off_the_baseline(self):
+        drift = DriftDetector(60)
+        self.assertFalse(self.run_for(drift, 0, 55, 5.0))
+        self.assertTrue(self.run_for(drift, 55, 10, 5.0))
+
+    def test_deviation_within_sigma_does_not_count(self):
+        drift = DriftDetector(60, sigma=3.0)
+        self.assertFalse(self.run_for(drift, 0, 600, 2.9))
+        self.assertEqual(drift.level, 0.0)
+
+    def test_good_frames_in_between_hold_it_back(self):
+        drift = DriftDetector(60)
+        # Off the baseline every other frame: the level settles near a half
+        self.assertFalse(self.run_for(drift, 0, 600, lambda i: 5.0 if i % 2 else 0.0))
+        self.assertAlmostEqual(drift.level, 0.5, delta=0.05)
+
+    def test_reset(self):
+        drift = DriftDetector(60)
+        self.run_for(drift, 0, 30, 5.0)
+        drift.reset(5)
+        self.assertEqual(drift.level, 0.0)
+        self.assertTrue(self.run_for(drift, 30, 6, 5.0))
+
+
+def _moved(landmarks, dy):
+    """The same landmarks ``dy`` pixels lower in a 480 px high frame"""
+    landmarks = landmarks.copy()
+    landmarks[:, 1] += dy / 480
+    return landmarks
+
+
+class _Sitting:
+    """A weekday camera on a frame clock, fed the same landmarks for a while"""
+
+    fps = 5
+
+    def setUp(self):
+        self.clock = FrameClock()
+        self.camera = _camera("weekday", self.clock, "table", backend=None)
+
+    def sit(self, seconds, face, pose):
+        overlay = None
+        for _ in range(int(seconds * self.fps)):
+            self.clock.now += 1 / self.fps
+            overlay = self.camera.update(face, pose, 640, 480)
+        return overlay
+
+
+class WeekdayBaselineTests(_Sitting, SimpleTestCase):
+    def calibrated_state(self):
+        self.sit(70, _face(), _pose())
+        state = self.camera.baseline_state()
+        self.assertIsNotNone(state)
+        return state
+
+    def test_fresh_calibration_is_stored_once_confirmed(self):
+        self.sit(30, _face(), _pose())
+        self.assertTrue(self.camera.baseline_ready)
+        self.assertIsNone(self.camera.baseline_state())
+        self.sit(40, _face(), _pose())
+        state = self.camera.baseline_state()
+        self.assertEqual(PostureBaseline.from_state(state).mean("shoulder_nose"), -140)
+
+    def test_sustained_slouch_does_not_recalibrate(self):
+        self.calibrated_state()
+        overlay = self.sit(1000, _face(slouch=True), _pose())
+        self.assertEqual(overlay["status"], "FORWARD HEAD")
+        self.assertEqual(self.camera.base_shoulder_nose, -140)
+        # Nothing new to store: the slouch never refined the baseline
+        self.assertIsNone(self.camera.baseline_state())
+        self.sit(1, _face(), _pose())
+        self.assertAlmostEqual(self.camera.total_bad_posture_time, 1000, delta=1)
+
+    def test_moved_camera_recalibrates(self):
+        self.calibrated_state()
+        # Everything 40 px higher in the frame: not a bad posture, just a new setup
+        self.sit(1000, _moved(_face(), -40), _moved(_pose(), -40))
+        self.assertEqual(self.camera.base_shoulder_mid, 340)
+        self.assertIsNotNone(self.camera.baseline_state())
+
+    def test_slouched_start_keeps_the_stored_baseline(self):
+        state = self.calibrated_state()
+        camera = self.camera = _camera("weekday", self.clock, "table", backend=None)
+        camera.use_baseline(state)
+        overlay = self.sit(30, _face(slouch=True), _pose())
+        self.assertEqual(overlay["status"], "FORWARD HEAD")
+        self.assertTrue(camera.baseline_confirmed)
+        self.assertFalse(camera.baseline_checking)
+        self.assertEqual(camera.baseline.samples, PostureBaseline.from_state(state).samples)
+
+    def test_stored_baseline_that_does_not_fit_is_not_overwritten_at_once(self):
+        state = self.calibrated_state()
+        camera = self.camera = _camera("weekday", self.clock, "table", backend=None)
+        camera.use_baseline(state)
+        self.sit(10, _moved(_face(), -40), _moved(_pose(), -40))
+        self.assertFalse(camera.baseline_confirmed)
+        self.assertIsNone(camera.baseline_state())
+
+
+def _tilted():
+    """Shoulder rows with the right shoulder 40 px lower"""
+    pose = _pose()
+    pose[1, 1] += 40 / 480
+    return pose
+
+
+class PostureEventTests(_Sitting, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.events = []
+        self.camera.start_event_log(self.events.append)
+        self.sit(70, _face(), _pose())
+
+    def test_a_stretch_is_one_event_from_its_first_to_its_last_frame(self):
+        self.sit(10, _face(slouch=True), _pose())
+        self.assertEqual(self.events, [])
+        self.sit(1, _face(), _pose())
+        self.assertEqual(self.events, [
+            {"session": self.camera.session_key, "category": "FORWARD HEAD", "seconds": 10.0},
+        ])
+
+    def test_changing_category_splits_the_stretch(self):
+        self.sit(3, _face(), _tilted())
+        self.sit(4, _face(slouch=True), _pose())
+        self.sit(2, _face(), _tilted())
+        self.sit(1, _face(), _pose())
+        self.assertEqual(
+            [(event["category"], event["seconds"]) for event in self.events],
+            [("SHOULDERS TILTED", 3.0), ("FORWARD HEAD", 4.0), ("SHOULDERS TILTED", 2.0)]
+        )
+
+    def test_stretch_in_progress_goes_to_the_session_it_belongs_to(self):
+        self.sit(3, _face(slouch=True), _pose())
+        old_session = self.camera.session_key
+        self.camera.reset_session()
+        self.sit(2, _face(slouch=True), _pose())
+        self.camera.stop_event_log()
+        self.sit(5, _face(slouch=True), _pose())
+        self.assertEqual(self.events, [
+            # From the first bad frame to the last one before each cut
+            {"session": old_session, "category": "FORWARD HEAD", "seconds": 2.8},
+            {"session": self.camera.session_key, "category": "FORWARD HEAD", "seconds": 1.8},
+        ])
+
+
+# =========================
+# FACE ROI
+# =========================
+def _to_crop(points, roi, w, h):
+    """What FaceMesh reports for ``points`` when it only sees the crop"""
+    x0, y0, side = roi
+    return [((x * w - x0) / side, (y * h - y0) / side, z * w / side) for x, y, z in points]
+
+
+class FaceRoiTests(SimpleTestCase):
+    w, h = 640, 480
+
+    def points(self, cx, cy, span=40):
+        """A few face points around pixel (cx, cy), normalised"""
+        return [((cx + dx) / self.w, (cy + dy) / self.h, dz)
+                for dx, dy, dz in ((-span / 2, 0, 0.01), (span / 2, 0, -0.02), (0, span / 2, 0.0))]
+
+    def test_crop_coordinates_map_back_to_the_frame(self):
+        for cx, cy in ((320, 240), (5, 5), (635, 475), (600, 30)):
+            points = self.points(cx, cy)
+            roi = face_roi(points, self.w, self.h)
+            back = roi_to_frame(_to_crop(points, roi, self.w, self.h), roi, self.w, self.h)
+            np.testing.assert_allclose(back, points, atol=1e-9)
+
+    def test_box_is_square_and_shifted_inside_the_frame(self):
+        x0, y0, side = face_roi(self.points(320, 240), self.w, self.h)
+        self.assertEqual(side, 120)
+        self.assertEqual((x0 + side / 2, y0 + side / 2), (320, 250))
+
+        self.assertEqual(face_roi(self.points(5, 5), self.w, self.h)[:2], (0, 0))
+        x0, y0, side = face_roi(self.points(635, 475), self.w, self.h)
+        self.assertEqual((x0, y0), (self.w - side, self.h - side))
+
+        # A tiny face still gets a usable crop; one filling the frame gets none
+        self.assertEqual(face_roi(self.points(320, 240, span=4), self.w, self.h)[2], 96)
+        self.assertIsNone(face_roi(self.points(320, 240, span=200), self.w, self.h))
+
+    def test_a_marked_pixel_survives_crop_and_mapping_back(self):
+        rgb = np.zeros((self.h, self.w, 3), dtype=np.uint8)
+        rgb[398:403, 598:603] = 255
+        points = self.points(600, 400)
+        roi = face_roi(points, self.w, self.h)
+        crop = crop_roi(rgb, roi)
+        self.assertEqual(crop.shape, (ROI_SIZE, ROI_SIZE, 3))
+
+        ys, xs = np.nonzero(crop[:, :, 0] > 128)
+        found = [(xs.mean() / ROI_SIZE, ys.mean() / ROI_SIZE, 0.0)]
+        (x, y, _), = roi_to_frame(found, roi, self.w, self.h)
+        self.assertAlmostEqual(x * self.w, 600, delta=1)
+        self.assertAlmostEqual(y * self.h, 400, delta=1)
+
+    def test_rows_given_as_an_array_are_left_alone(self):
+        points = np.array(self.points(320, 240), dtype=np.float64)
+        before = points.copy()
+        roi = face_roi(points, self.w, self.h)
+        back = roi_to_frame(points, roi, self.w, self.h)
+        self.assertIsInstance(back, list)
+        np.testing.assert_array_equal(points, before)
+
+    def test_downscale_keeps_the_aspect_ratio(self):
+        rgb = np.zeros((720, 1280, 3), dtype=np.uint8)
+        self.assertEqual(downscale(rgb, 640).shape, (360, 640, 3))
+        self.assertIs(downscale(rgb, 1920), rgb)
+        self.assertIs(downscale(rgb, None), rgb)
+
+
+# =========================
+# INFERENCE SCHEDULER
+# =========================
+class InferenceSchedulerTests(SimpleTestCase):
+    def frames(self, scheduler, count):
+        """Which models are due on each of ``count`` frames, all detecting"""
+        pattern = []
+        for i in range(count):
+            due = scheduler.due()
+            for name in due:
+                scheduler.update(name, [(0.5, 0.5, 0.0)], i / 30)
+            pattern.append("".join(sorted(name[0] for name in due)))
+        return pattern
+
+    def test_fixed_intervals(self):
+        scheduler = InferenceScheduler(["face", "pose"], {"face": 1, "pose": 3})
+        self.assertEqual(self.frames(scheduler, 7), ["fp", "f", "f", "fp", "f", "f", "fp"])
+
+    def test_a_model_that_found_nothing_runs_every_frame(self):
+        scheduler = InferenceScheduler(["pose"], {"pose": 3})
+        for _ in range(3):
+            self.assertEqual(scheduler.due(), ["pose"])
+            scheduler.update("pose", None, 0.0)
+
+    def test_budget_sets_the_interval_from_the_latency(self):
+        scheduler = InferenceScheduler(["face"], {"face": 1}, budgets={"face": 0.01})
+        self.assertEqual(scheduler.interval("face"), 1)
+        scheduler.update("face", [(0.5, 0.5, 0.0)], 0.0, latency=0.03)
+        self.assertEqual(scheduler.interval("face"), 3)
+        # Smoothed: 0.03 + 0.2 * (0.05 - 0.03) = 0.034
+        scheduler.update("face", [(0.5, 0.5, 0.0)], 0.1, latency=0.05)
+        self.assertEqual(scheduler.interval("face"), 4)
+        scheduler.update("face", [(0.5, 0.5, 0.0)], 0.2, latency=5.0)
+        self.assertEqual(scheduler.interval("face"), InferenceScheduler.MAX_INTERVAL)
+        self.assertEqual(self.frames(scheduler, 11).count("f"), 2)
+
+    def test_landmarks_move_along_between_runs(self):
+        scheduler = InferenceScheduler(["face"])
+        scheduler.update("face", np.array([(0.1, 0.2, 0.0)], dtype=np.float32), 10.0)
+        # One detection has no velocity yet: held still, as plain rows
+        held = scheduler.landmarks("face", 10.5)
+        self.assertIsInstance(held, list)
+        np.testing.assert_allclose(held, [(0.1, 0.2, 0.0)], rtol=1e-6)
+        scheduler.update("face", [(0.2, 0.2, 0.1)], 10.1)
+        (x, y, z), = scheduler.landmarks("face", 10.15)
+        self.assertAlmostEqual(x, 0.25, places=6)
+        self.assertAlmostEqual(y, 0.2, places=6)
+        self.assertAlmostEqual(z, 0.15, places=6)
+        # Exactly at the detection, the detection itself
+        self.assertEqual(scheduler.landmarks("face", 10.1), [(0.2, 0.2, 0.1)])
+
+        still = InferenceScheduler(["face"], extrapolate=False)
+        still.update("face", [(0.1, 0.2, 0.0)], 10.0)
+        still.update("face", [(0.2, 0.2, 0.1)], 10.1)
+        self.assertEqual(still.landmarks("face", 10.15), [(0.2, 0.2, 0.1)])
+
+    def test_estimates_stop_after_max_hold(self):
+        scheduler = InferenceScheduler(["face"])
+        scheduler.update("face", [(0.1, 0.2, 0.0)], 10.0)
+        scheduler.update("face", [(0.1, 0.2, 0.0)], 10.1)
+        self.assertIsNotNone(scheduler.landmarks("face", 10.1 + InferenceScheduler.MAX_HOLD))
+        self.assertIsNone(scheduler.landmarks("face", 10.11 + InferenceScheduler.MAX_HOLD))
+        # Nothing detected: no estimate at all
+        scheduler.update("face", None, 10.2)
+        self.assertIsNone(scheduler.landmarks("face", 10.2))
+
+
+# =========================
+# BUFFERED WRITER
+# =========================
+def _sample(i=0):
+    return PostureSample(
+        session="test", camera="default", time=timezone.now(),
+        seconds=5.0, frames=150, status="GOOD POSTURE", blinks=i
+    )
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class BufferedWriterTests(TransactionTestCase):
+    # The writer saves from its own thread, outside any test transaction
+
+    def writer(self, **kwargs):
+        writer = BufferedWriter(PostureSample, **kwargs)
+        self.addCleanup(writer.close)
+        return writer
+
+    def test_writes_once_a_batch_is_full(self):
+        writer = self.writer(batch_size=5, flush_interval=60)
+        for i in range(4):
+            writer.add(_sample(i))
+        time.sleep(0.2)
+        self.assertEqual(PostureSample.objects.count(), 0)
+        self.assertEqual(writer.pending, 4)
+
+        writer.add(_sample(4))
+        # Taken without a flush() (shared-cache SQLite cannot be read mid-write)
+        self.assertTrue(_wait_for(lambda: writer.pending == 0))
+        self.assertTrue(writer.flush(timeout=5.0))
+        self.assertEqual(sorted(PostureSample.objects.values_list("blinks", flat=True)), [0, 1, 2, 3, 4])
+        self.assertEqual(writer.pending, 0)
+
+    def test_writes_after_the_flush_interval(self):
+        writer = self.writer(batch_size=1000, flush_interval=0.3)
+        started = time.monotonic()
+        writer.add(_sample())
+        writer.add(_sample())
+        self.assertTrue(_wait_for(lambda: writer.pending == 0))
+        self.assertGreaterEqual(time.monotonic() - started, 0.25)
+        self.assertTrue(writer.flush(timeout=5.0))
+        self.assertEqual(PostureSample.objects.count(), 2)
+
+    def test_close_writes_what_is_pending(self):
+        writer = self.writer(batch_size=1000, flush_interval=60)
+        for i in range(3):
+            writer.add(_sample(i))
+        writer.close()
+        self.assertEqual(PostureSample.objects.count(), 3)
+        self.assertFalse(any(t.name == "writer-posturesample" for t in threading.enumerate()))
+
+        # A closed writer starts again on the next row
+        writer.add(_sample())
+        self.assertTrue(writer.flush(timeout=5.0))
+        self.assertEqual(PostureSample.objects.count(), 4)
+
+    def test_flush_waits_for_the_write(self):
+        writer = self.writer(batch_size=1000, flush_interval=60)
+        writer.add(_sample())
+        self.assertTrue(writer.flush(timeout=5.0))
+        self.assertEqual(PostureSample.objects.count(), 1)
+        # Nothing pending: returns at once
+        self.assertTrue(writer.flush(timeout=0))
+
+    def test_oldest_rows_are_dropped_beyond_max_pending(self):
+        writer = self.writer(batch_size=1000, flush_interval=60, max_pending=3)
+        for i in range(5):
+            writer.add(_sample(i))
+        writer.close()
+        self.assertEqual(sorted(PostureSample.objects.values_list("blinks", flat=True)), [2, 3, 4])
+
+
+# =========================
+# SESSION HISTORY
+# =========================
+@override_settings(MONITOR_HISTORY_PAGE_SIZE=4)
+class HistoryPageTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        for i in range(11):
+            WeekdaySession.objects.create(duration=60 + i)
+        # Ties on the date are broken by id
+        tie = timezone.now()
+        WeekdaySession.objects.filter(duration__lt=65).update(date=tie)
+
+    def pages(self, param="before"):
+        cursor, pages = None, []
+        while True:
+            request = self.factory.get("/", {param: cursor} if cursor else {})
+            rows, cursor = _history_page(WeekdaySession.objects.all(), request, param)
+            pages.append([s.pk for s in rows])
+            if cursor is None:
+                return pages
+
+    def test_cursors_walk_every_row_once_in_order(self):
+        pages = self.pages()
+        self.assertEqual([len(page) for page in pages], [4, 4, 3])
+        expected = list(WeekdaySession.objects.order_by("-date", "-id").values_list("pk", flat=True))
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_cursor_parameter_can_be_renamed(self):
+        self.assertEqual(self.pages("weekday_before"), self.pages())
+
+    def test_malformed_cursor_is_404(self):
+        for cursor in ("junk", "2026-01-01T00:00:00_x", "yesterday_5", "_"):
+            request = self.factory.get("/", {"before": cursor})
+            with self.assertRaises(Http404, msg=cursor):
+                _history_page(WeekdaySession.objects.all(), request)
+
+    def test_views_page_and_404(self):
+        first = self.client.get("/weekday/history/")
+        self.assertEqual(len(first.context["sessions"]), 4)
+        self.assertEqual(first.context["summary"]["totals"]["sessions"], 11)
+
+        second = self.client.get("/weekday/history/", {"before": first.context["older"]})
+        self.assertEqual(len(second.context["sessions"]), 4)
+        self.assertFalse({s.pk for s in first.context["sessions"]} & {s.pk for s in second.context["sessions"]})
+
+        self.assertEqual(self.client.get("/weekday/history/", {"before": "junk"}).status_code, 404)
+        self.assertEqual(self.client.get("/history/", {"weekend_before": "junk"}).status_code, 404)
+
+    def test_page_query_keeps_the_other_cursor(self):
+        request = self.factory.get("/", {"weekday_before": "a_1", "weekend_before": "b_2"})
+        self.assertEqual(_page_query(request, "weekday_before", "c_3"), "weekend_before=b_2&weekday_before=c_3")
+        self.assertEqual(_page_query(request, "weekday_before", None), "weekend_before=b_2")
+
+
+class PostureBreakdownTests(TestCase):
+    def setUp(self):
+        start = timezone.now()
+        for key, category, seconds in (
+            ("a", "SLOUCHED", 10), ("a", "SLOUCHED", 5), ("a", "FORWARD HEAD", 20),
+            ("b", "SLOUCHED", 4), ("other", "TOO CLOSE", 99),
+        ):
+            PostureEvent.objects.create(
+                session=key, camera="default", category=category,
+                start=start, end=start + datetime.timedelta(seconds=seconds), seconds=seconds
+            )
+        for key in ("a", "b", "c", ""):
+            WeekdaySession.objects.create(duration=60, session_key=key)
+
+    def test_sessions_and_totals_in_one_query(self):
+        sessions = list(WeekdaySession.objects.order_by("id"))
+        with self.assertNumQueries(1):
+            totals = _posture_breakdown(sessions)
+
+        self.assertEqual(totals, [
+            {"category": "FORWARD HEAD", "seconds": 20, "events": 1},
+            {"category": "SLOUCHED", "seconds": 19, "events": 3},
+        ])
+        self.assertEqual(
+            [[(row["category"], row["seconds"], row["events"]) for row in s.breakdown] for s in sessions],
+            [[("FORWARD HEAD", 20, 1), ("SLOUCHED", 15, 2)], [("SLOUCHED", 4, 1)], [], []]
+        )
+
+    def test_history_page_shows_the_totals(self):
+        response = self.client.get("/weekday/history/")
+        self.assertEqual([row["category"] for row in response.context["posture_totals"]], ["FORWARD HEAD", "SLOUCHED"])
+        self.assertContains(response, "Forward Head: 20s (1×)")
+        self.assertContains(response, "20s in 1 stretch")
+
+
+class SessionRollupTests(TestCase):
+    def rollup(self, mode, period):
+        day, week = (start for _, start in rollup_periods(timezone.now()))
+        return SessionRollup.objects.get(mode=mode, period=period, start=day if period == "day" else week)
+
+    def test_saving_sessions_adds_them_up(self):
+        WeekdaySession.objects.create(duration=100, blink_count=10, bad_posture_time=5)
+        WeekdaySession.objects.create(duration=50, blink_count=3, bad_posture_time=1)
+        YogaSession.objects.create(duration=30)
+
+        for period in ("day", "week"):
+            weekday = self.rollup("weekday", period)
+            self.assertEqual(
+                (weekday.sessions, weekday.duration, weekday.blink_count, weekday.bad_posture_time),
+                (2, 150, 13, 6))
+            weekend = self.rollup("weekend", period)
+            self.assertEqual((weekend.sessions, weekend.duration), (1, 30))
+
+    def test_saving_again_does_not_count_twice(self):
+        session = WeekdaySession.objects.create(duration=100)
+        session.duration = 200
+        session.save()
+        self.assertEqual(self.rollup("weekday", "day").sessions, 1)
+        self.assertEqual(self.rollup("weekday", "day").duration, 100)
+
+    def test_increments_are_done_in_the_database(self):
+        # Counts changed behind the model's back (another process) are added to
+        WeekdaySession.objects.create(duration=10)
+        SessionRollup.objects.filter(mode="weekday").update(sessions=10, duration=1000)
+        WeekdaySession.objects.create(duration=20)
+        rollup = self.rollup("weekday", "day")
+        self.assertEqual((rollup.sessions, rollup.duration), (11, 1020))
+
+    @override_settings(TIME_ZONE="Asia/Kolkata")
+    def test_days_and_weeks_are_local(self):
+        # Sunday 20:00 UTC is already Monday in India
+        when = datetime.datetime(2026, 3, 1, 20, 0, tzinfo=datetime.timezone.utc)
+        self.assertEqual(rollup_periods(when), (
+            ("day", datetime.date(2026, 3, 2)),
+            ("week", datetime.date(2026, 3, 2)),
+        ))
+        SessionRollup.record("weekend", when, 60)
+        SessionRollup.record("weekend", when - datetime.timedelta(hours=2), 60)
+        weeks = SessionRollup.objects.filter(mode="weekend", period="week").order_by("start")
+        self.assertEqual([(w.start, w.sessions) for w in weeks], [
+            (datetime.date(2026, 2, 23), 1),
+            (datetime.date(2026, 3, 2), 1),
+        ])
+
+
+# =========================
+# OFFLINE ANALYSIS
+# =========================
+class _CrashingPool:
+    """Stands in for the process pool: the worker for "crash.mp4" dies"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, path, mode, *args):
+        future = Future()
+        if os.path.basename(path) == "crash.mp4":
+            future.set_exception(BrokenProcessPool("A child process terminated abruptly"))
+        else:
+            future.set_result({
+                "path": path, "mode": mode, "frames": 300, "duration": 10.0,
+                "elapsed": 1.0, "blink_count": 3, "perclos": None, "bad_posture_time": 2.0,
+            })
+        return future
+
+
+class AnalyzeVideosTests(TestCase):
+    def test_a_crashed_worker_fails_only_its_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ("a.mp4", "crash.mp4", "b.mp4"):
+                open(os.path.join(directory, name), "wb").close()
+            out, err = io.StringIO(), io.StringIO()
+            with mock.patch("monitor.management.commands.analyze_videos.ProcessPoolExecutor", _CrashingPool):
+                call_command("analyze_videos", directory, workers=2, stdout=out, stderr=err)
+
+        self.assertIn("crash.mp4: BrokenProcessPool", err.getvalue())
+        self.assertIn("2 session(s) saved, 1 file(s) failed", out.getvalue())
+        self.assertEqual(WeekdaySession.objects.count(), 2)
+
+
+# =========================
+# INFERENCE WORKERS
+# =========================
+class _Point:
+    def __init__(self, x, y, z):
+        self.x, self.y, self.z = x, y, z
+
+
+class _FakeGraph:
+    """Stands in for a MediaPipe graph: a landmark per pixel row of the frame"""
+
+    def process(self, rgb):
+        return [_Point(float(row[0, 0]), float(row[0, 1]), float(row[0, 2])) for row in rgb]
+
+    def close(self):
+        pass
+
+
+_FAKE_MODELS = {"fake": (lambda **options: _FakeGraph(), lambda result: result, 478)}
+
+
+class InferenceWorkerTests(SimpleTestCase):
+    def run_worker(self, spec, frame):
+        """One frame through _inference_worker on a thread; what it sends back"""
+        parent, child = multiprocessing.Pipe()
+        ring = np.zeros((1,) + frame.shape, dtype=np.uint8)
+        shm = shared_memory.SharedMemory(create=True, size=ring.nbytes)
+        self.addCleanup(shm.unlink)
+        self.addCleanup(shm.close)
+        np.ndarray(ring.shape, dtype=np.uint8, buffer=shm.buf)[0] = frame
+        with mock.patch.dict("monitor.camera.inference.MODELS", _FAKE_MODELS):
+            worker = threading.Thread(target=_inference_worker, args=(child, spec))
+            worker.start()
+            parent.send(("process", 7, shm.name, ring.shape, 0))
+            reply = parent.recv()
+            parent.send(("stop",))
+            worker.join(5)
+        return reply
+
+    def test_only_the_asked_rows_travel_back(self):
+        frame = np.arange(478 * 2 * 3, dtype=np.uint8).reshape(478, 2, 3)
+        request_id, landmarks, error = self.run_worker(("fake", {}, [5, 1, 3]), frame)
+        self.assertEqual((request_id, error), (7, None))
+        self.assertEqual(landmarks, [tuple(float(v) for v in frame[i, 0]) for i in (5, 1, 3)])
+        dense = np.zeros((478, 3), dtype=np.float32)
+        self.assertLess(len(pickle.dumps(landmarks)), len(pickle.dumps(dense)) // 20)
+
+    def test_without_indices_every_landmark_comes_back(self):
+        frame = np.arange(33 * 2 * 3, dtype=np.uint8).reshape(33, 2, 3)
+        _, landmarks, error = self.run_worker(("fake", {}), frame)
+        self.assertIsNone(error)
+        self.assertEqual(landmarks.dtype, np.float32)
+        np.testing.assert_array_equal(landmarks, frame[:, 0])
+
+
+# =========================
+# FRAME HUB
+# =========================
+class _StubCamera:
+    """Counts what a hub asks of it; frames are numbered byte strings"""
+
+    def __init__(self):
+        self.frames = 0
+        self.analyzed = 0
+        self.stopped = False
+
+    def get_frame(self):
+        time.sleep(0.002)
+        self.frames += 1
+        return b"frame %d" % self.frames
+
+    def analyze_next(self):
+        time.sleep(0.002)
+        self.analyzed += 1
+        return True
+
+    def stop(self):
+        self.stopped = True
+
+
+def _settled(read, pause=0.05):
+    """``read()`` once it has stopped changing (an in-flight call may finish)"""
+    time.sleep(pause)
+    value = read()
+    time.sleep(pause)
+    return value
+
+
+class FrameHubTests(SimpleTestCase):
+    def hub(self, **kwargs):
+        self.camera = _StubCamera()
+        hub = FrameHub(self.camera, "test", **kwargs)
+        hub.start()
+        self.addCleanup(hub.stop)
+        return hub
+
+    def test_headless_hub_analyzes_with_nobody_watching(self):
+        hub = self.hub(headless=True)
+        self.assertTrue(hub.analyzes_unwatched)
+        self.assertTrue(_wait_for(lambda: self.camera.analyzed > 5))
+        self.assertEqual(self.camera.frames, 0)
+        self.assertEqual(hub.frames_published, 0)
+        self.assertGreater(hub.frames_headless, 0)
+
+    def test_headless_hub_encodes_only_while_subscribed(self):
+        hub = self.hub(headless=True)
+        self.assertTrue(_wait_for(lambda: self.camera.analyzed > 0))
+
+        subscription = hub.subscribe()
+        self.assertIsNotNone(subscription.next_frame())
+        analyzed = self.camera.analyzed
+        for _ in range(3):
+            self.assertIsNotNone(subscription.next_frame())
+        self.assertEqual(self.camera.analyzed, analyzed)
+
+        subscription.close()
+        frames = _settled(lambda: self.camera.frames)
+        self.assertTrue(_wait_for(lambda: self.camera.analyzed > analyzed + 5))
+        self.assertEqual(self.camera.frames, frames)
+
+    def test_hub_without_headless_runs_only_for_clients(self):
+        hub = self.hub()
+        self.assertFalse(hub.analyzes_unwatched)
+        time.sleep(0.05)
+        self.assertEqual((self.camera.frames, self.camera.analyzed), (0, 0))
+
+        # A metrics listener gets the analysis, still without frames
+        hub.listen()
+        self.assertTrue(_wait_for(lambda: self.camera.analyzed > 5))
+        self.assertEqual(self.camera.frames, 0)
+        hub.unlisten()
+        analyzed = _settled(lambda: self.camera.analyzed)
+        time.sleep(0.05)
+        self.assertEqual(self.camera.analyzed, analyzed)
+
+    def test_every_subscriber_gets_the_same_frames(self):
+        hub = self.hub()
+        subscriptions = [hub.subscribe() for _ in range(3)]
+        self.assertEqual(hub.subscriber_count, 3)
+        received = [[], [], []]
+
+        def watch(subscription, frames):
+            while len(frames) < 5:
+                frames.append(subscription.next_frame())
+
+        viewers = [threading.Thread(target=watch, args=pair) for pair in zip(subscriptions, received)]
+        for viewer in viewers:
+            viewer.start()
+        for viewer in viewers:
+            viewer.join(5)
+        for frames, subscription in zip(received, subscriptions):
+            self.assertNotIn(None, frames)
+            numbers = [int(frame.split()[1]) for frame in frames]
+            self.assertEqual(numbers, sorted(set(numbers)))
+            # Published frames the viewer did not get are counted as skipped
+            self.assertEqual(subscription.frames_received + subscription.frames_skipped, numbers[-1] - numbers[0] + 1)
+        # One analysis loop serves them all
+        self.assertLessEqual(self.camera.frames, hub.frames_published + 1)
+
+    def test_async_subscriber_awaits_frames(self):
+        hub = self.hub()
+
+        async def watch():
+            subscription = hub.subscribe()
+            frames = []
+            async for frame in subscription:
+                frames.append(frame)
+                if len(frames) == 3:
+                    break
+            return frames, subscription
+
+        frames, subscription = asyncio.run(watch())
+        self.assertEqual(len(frames), 3)
+        self.assertEqual(len(set(frames)), 3)
+        self.assertTrue(subscription.closed)
+        self.assertEqual(hub.subscriber_count, 0)
+
+    def test_waits_end_on_timeout_and_on_stop(self):
+        hub = self.hub()
+        # A camera that never delivers a frame
+        self.camera.get_frame = lambda: time.sleep(0.002)
+        subscription = hub.subscribe()
+        self.assertIsNone(subscription.next_frame(timeout=0.05))
+        self.assertIsNone(asyncio.run(subscription.anext_frame(timeout=0.05)))
+
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(subscription.next_frame(timeout=5)))
+        waiter.start()
+        time.sleep(0.05)
+        hub.stop()
+        waiter.join(1)
+        self.assertEqual(got, [None])
+        self.assertFalse(subscription.active)
+        self.assertTrue(self.camera.stopped)
+
+    def test_idle_since_follows_viewers_and_listeners(self):
+        hub = self.hub()
+        self.assertIsNotNone(hub.idle_since)
+        subscription = hub.subscribe()
+        hub.listen()
+        self.assertIsNone(hub.idle_since)
+        self.assertEqual(hub.client_count, 2)
+
+        subscription.close()
+        subscription.close()
+        self.assertIsNone(hub.idle_since)
+        before = time.monotonic()
+        hub.unlisten()
+        hub.unlisten()
+        self.assertEqual(hub.client_count, 0)
+        self.assertGreaterEqual(hub.idle_since, before)
+
+
+# =========================
+# METRICS STREAM
+# =========================
+def _data(event):
+    """The JSON payload of a server-sent event"""
+    return json.loads(event[len("data: "):])
+
+
+class DeltaEventsTests(SimpleTestCase):
+    def test_events_carry_only_changed_values(self):
+        channel = MetricsChannel()
+        channel.publish({"status": "GOOD POSTURE", "blink_count": 3, "perclos": None})
+        events = delta_events(channel, lambda: True, rate=None)
+        self.assertEqual(_data(next(events)), {"status": "GOOD POSTURE", "blink_count": 3, "perclos": None})
+        channel.publish({"status": "GOOD POSTURE", "blink_count": 4, "perclos": None})
+        self.assertEqual(_data(next(events)), {"blink_count": 4})
+
+    def test_unchanged_values_send_nothing(self):
+        channel = MetricsChannel()
+        channel.publish({"label": "T Pose"})
+        seq, _ = channel.snapshot()
+        channel.publish({"label": "T Pose"})
+        self.assertEqual(channel.snapshot()[0], seq)
+
+        deltas = _Deltas(rate=None, keepalive=60)
+        self.assertIsNotNone(deltas.event(*channel.snapshot()))
+        # Changed and changed back between two sends: the client is up to date
+        channel.publish({"label": "Vrikshasana"})
+        channel.publish({"label": "T Pose"})
+        self.assertIsNone(deltas.event(*channel.snapshot()))
+        self.assertIsNone(deltas.event(*channel.snapshot()))
+
+    def test_keepalive_after_quiet_seconds(self):
+        channel = MetricsChannel()
+        channel.publish({"label": "T Pose"})
+        deltas = _Deltas(rate=None, keepalive=0)
+        deltas.event(*channel.snapshot())
+        self.assertEqual(deltas.event(*channel.snapshot()), ": keepalive\n\n")
+
+    def test_weekend_values_leave_the_landmarks_out(self):
+        camera = _camera("weekend", FrameClock(), "table", backend=None)
+        camera.update(np.full((33, 3), 0.5, dtype=np.float32), 640, 480)
+        _, values = camera.metrics.snapshot()
+        self.assertEqual(set(values), {"label", "hold_remaining", "final_pose"})
+        self.assertEqual(values["label"], "Unknown Pose")
+
+
+# =========================
+# TELEMETRY
+# =========================
+class TelemetryRenderTests(SimpleTestCase):
+    def test_prometheus_text_format(self):
+        registry = Telemetry()
+        registry.counter("monitor_frames_dropped_total", stage="capture", mode="weekday").inc(3)
+        registry.gauge("monitor_stream_clients", mode="weekday", kind="video").set(2)
+        registry.gauge("monitor_stream_clients", mode='say "hi"\n', kind="a\\b").set(1.5)
+        timers = registry.timers("weekday")
+        for seconds in (0.0004, 0.003, 0.003, 2.0):
+            timers.observe("encode", seconds)
+
+        lines = registry.render().splitlines()
+        self.assertEqual(lines[:2], [
+            "# HELP monitor_stage_seconds Time spent in each per-frame stage",
+            "# TYPE monitor_stage_seconds histogram",
+        ])
+        labels = 'mode="weekday",stage="encode"'
+        self.assertIn(f'monitor_stage_seconds_bucket{{{labels},le="0.0005"}} 1', lines)
+        self.assertIn(f'monitor_stage_seconds_bucket{{{labels},le="0.005"}} 3', lines)
+        self.assertIn(f'monitor_stage_seconds_bucket{{{labels},le="1.0"}} 3', lines)
+        self.assertIn(f'monitor_stage_seconds_bucket{{{labels},le="+Inf"}} 4', lines)
+        self.assertIn(f"monitor_stage_seconds_count{{{labels}}} 4", lines)
+        self.assertIn(f"monitor_stage_seconds_sum{{{labels}}} 2.0064", lines)
+        self.assertIn(f'monitor_stage_recent_seconds{{{labels},quantile="0.5"}} 0.003', lines)
+        self.assertIn(f'monitor_stage_recent_seconds{{{labels},quantile="0.99"}} 2.0', lines)
+
+        # Labels sorted and escaped, integers without a decimal point
+        self.assertIn('monitor_frames_dropped_total{mode="weekday",stage="capture"} 3', lines)
+        self.assertIn('monitor_stream_clients{kind="video",mode="weekday"} 2', lines)
+        self.assertIn('monitor_stream_clients{kind="a\\\\b",mode="say \\"hi\\"\\n"} 1.5', lines)
+        # One HELP and TYPE per family, none for families without series
+        self.assertEqual(lines.count("# TYPE monitor_stream_clients gauge"), 1)
+        self.assertNotIn("# TYPE monitor_db_rows_written_total counter", lines)
+
+    def test_bucket_counts_are_cumulative(self):
+        registry = Telemetry()
+        for seconds in (0.0001, 0.007, 0.07, 0.7, 7.0):
+            registry.timers("weekend").observe("pose", seconds)
+        counts = [int(line.rsplit(" ", 1)[1]) for line in registry.render().splitlines()
+                  if line.startswith("monitor_stage_seconds_bucket")]
+        self.assertEqual(len(counts), len(BUCKETS) + 1)
+        self.assertEqual(counts, sorted(counts))
+        self.assertEqual((counts[0], counts[-1]), (1, 5))
+
+    def test_endpoint_serves_the_text_format(self):
+        registry = Telemetry()
+        registry.counter("monitor_inference_errors_total", mode="weekday").inc()
+        with mock.patch("monitor.views.telemetry", registry):
+            response = self.client.get("/metrics/prometheus/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        self.assertEqual(response.content.decode(), "\n".join([
+            "# HELP monitor_inference_errors_total Frames whose landmark inference raised an error",
+            "# TYPE monitor_inference_errors_total counter",
+            'monitor_inference_errors_total{mode="weekday"} 1',
+        ]) + "\n")
+
+
+# =========================
+# CAMERA REGISTRY
+# =========================
+class _StubAnalyzerPool:
+    """Hands out named stand-in cameras and remembers what came back"""
+
+    def __init__(self):
+        self.given_back = []
+
+    def acquire(self, mode, source):
+        return mock.Mock(name=f"{mode}@{source}")
+
+    def give_back(self, camera):
+        self.given_back.append(camera)
+
+
+class _StubHub:
+    """What a station reads of a FrameHub"""
+
+    def __init__(self, idle_since, headless=False):
+        self.running = True
+        self.idle_since = idle_since
+        self.analyzes_unwatched = headless
+
+    def stop(self):
+        self.running = False
+
+
+class CameraRegistryTests(SimpleTestCase):
+    timeout = 600
+
+    def setUp(self):
+        self.now = 1000.0
+        self.pool = _StubAnalyzerPool()
+        self.headless = False
+        self.registry = CameraRegistry(self.pool, self.start_hub, idle_timeout=self.timeout, clock=lambda: self.now)
+
+    def start_hub(self, station, mode, camera):
+        return _StubHub(self.now, headless=self.headless)
+
+    def test_stations_are_keyed_by_camera_and_session(self):
+        station = self.registry.get("desk-1", 0, "s1")
+        self.assertIs(self.registry.get("desk-1", 0, "s1"), station)
+        self.assertIs(self.registry.find("desk-1", "s1"), station)
+        others = {self.registry.get("desk-1", 0, "s2"), self.registry.get("desk-2", 1, "s1")}
+        self.assertEqual(len(others | {station}), 3)
+        self.assertIsNone(self.registry.find("desk-2", "s2"))
+
+        self.assertEqual(self.registry.close(session="s1"), 2)
+        self.assertEqual([s.session for s in self.registry.stations()], ["s2"])
+
+    def test_each_station_gets_its_own_analyzers(self):
+        one = self.registry.get("desk-1", 0, "s1")
+        two = self.registry.get("desk-1", 0, "s2")
+        one.ensure("weekday")
+        two.ensure("weekday")
+        self.assertIsNot(one.camera("weekday"), two.camera("weekday"))
+        self.assertIsNone(one.camera("weekend"))
+        camera = one.camera("weekday")
+        self.registry.close(session="s1")
+        self.assertEqual(self.pool.given_back, [camera])
+
+    def test_unwatched_stations_are_reaped_after_the_timeout(self):
+        station = self.registry.get("desk-1", 0, "s1")
+        hub = station.ensure("weekday")
+        self.now += self.timeout
+        self.registry.get("desk-1", 0, "s2")
+        self.assertIs(self.registry.find("desk-1", "s1"), station)
+
+        self.now += 1
+        self.registry.get("desk-1", 0, "s2")
+        self.assertIsNone(self.registry.find("desk-1", "s1"))
+        self.assertFalse(hub.running)
+        self.assertEqual(len(self.pool.given_back), 1)
+
+    def test_watched_stations_are_kept(self):
+        station = self.registry.get("desk-1", 0, "s1")
+        station.ensure("weekday").idle_since = None
+        self.now += 10 * self.timeout
+        self.registry.reap()
+        self.assertIs(self.registry.find("desk-1", "s1"), station)
+        self.assertEqual(station.idle_for(), 0.0)
+
+    def test_headless_hub_keeps_its_station_alive(self):
+        self.headless = True
+        station = self.registry.get("desk-1", 0, "s1")
+        hub = station.ensure("weekday")
+        self.now += 10 * self.timeout
+        self.registry.reap()
+        self.assertIs(self.registry.find("desk-1", "s1"), station)
+        # A hub that has stopped keeps nothing alive
+        hub.stop()
+        self.registry.reap()
+        self.assertIsNone(self.registry.find("desk-1", "s1"))
+
+    def test_station_that_never_streamed_is_idle_from_its_creation(self):
+        self.registry.get("desk-1", 0, "s1")
+        self.now += self.timeout + 1
+        self.registry.reap()
+        self.assertEqual(self.registry.stations(), [])
+
+
+# =========================
+# STARTUP
+# =========================
+class WarmUpTests(SimpleTestCase):
+    def ready(self, *argv, environ=None):
+        """Run MonitorConfig.ready() as program ``argv``; was warm() called?"""
+        with mock.patch.object(sys, "argv", list(argv)), \
+                mock.patch.dict(os.environ, environ or {}), \
+                mock.patch("monitor.views.analyzers.warm") as warm, \
+                mock.patch("monitor.views.voice.start") as start:
+            apps.get_app_config("monitor").ready()
+        self.assertEqual(warm.called, start.called)
+        return warm.called
+
+    def test_servers_warm_up(self):
+        self.assertTrue(self.ready("/usr/bin/gunicorn", "smart_health.wsgi"))
+        self.assertTrue(self.ready("manage.py", "runserver", "--noreload"))
+        self.assertTrue(self.ready("manage.py", "runserver", environ={"RUN_MAIN": "true"}))
+
+    def test_other_commands_do_not(self):
+        self.assertFalse(self.ready("manage.py", "migrate"))
+        self.assertFalse(self.ready("manage.py", "test", "monitor"))
+        # The autoreloader's parent process only watches files
+        with mock.patch.dict(os.environ):
+            os.environ.pop("RUN_MAIN", None)
+            self.assertFalse(self.ready("manage.py", "runserver"))
+
+    @override_settings(MONITOR_WARM_UP=False)
+    def test_setting_turns_it_off(self):
+        self.assertFalse(self.ready("/usr/bin/gunicorn", "smart_health.wsgi"))
+
+
+# =========================
+# FRAME PIPELINE
+# =========================
+class DropOldestQueueTests(SimpleTestCase):
+    def test_full_queue_drops_the_oldest(self):
+        dropped = mock.Mock()
+        queue = DropOldestQueue(2, dropped=dropped)
+        for i in range(5):
+            queue.put(i)
+        self.assertEqual(len(queue), 2)
+        self.assertEqual((queue.dropped, dropped.inc.call_count), (3, 3))
+        self.assertEqual([queue.get(0), queue.get(0), queue.get(0)], [3, 4, None])
+
+    def test_depth_is_at_least_one(self):
+        queue = DropOldestQueue(0)
+        queue.put("a")
+        queue.put("b")
+        self.assertEqual((len(queue), queue.get(0)), (1, "b"))
+
+    def test_close_wakes_a_waiting_reader(self):
+        queue = DropOldestQueue(2)
+        queue.put("stale")
+        queue.close()
+        queue.put("late")
+        self.assertEqual(len(queue), 0)
+        got = []
+        reader = threading.Thread(target=lambda: got.append(queue.get(5)))
+        start = time.monotonic()
+        reader.start()
+        reader.join(1)
+        self.assertEqual(got, [None])
+        self.assertLess(time.monotonic() - start, 1)
+
+
+class _StubAnalyzer:
+    """A camera whose frames are numbers and whose JPEGs name them"""
+
+    MODE = "pipeline-test"
+
+    def __init__(self, encode_time=0.0):
+        self.timers = telemetry.timers(self.MODE)
+        self.encode_time = encode_time
+        self.captured = 0
+        self.encoded = 0
+
+    def get_raw_frame(self):
+        time.sleep(0.002)
+        self.captured += 1
+        return self.captured
+
+    def analyze(self, frame):
+        return frame, {"frame": frame}
+
+    def draw_overlay(self, frame, overlay):
+        return frame
+
+    def encode(self, frame):
+        time.sleep(self.encode_time)
+        self.encoded += 1
+        return b"%d" % frame
+
+
+class FramePipelineTests(SimpleTestCase):
+    def pipeline(self, camera, **kwargs):
+        pipeline = FramePipeline(camera, **kwargs)
+        self.addCleanup(pipeline.stop)
+        return pipeline
+
+    def test_frames_come_out_in_order(self):
+        pipeline = self.pipeline(_StubAnalyzer())
+        frames = [int(pipeline.get_frame()) for _ in range(5)]
+        self.assertEqual(frames, sorted(set(frames)))
+
+    def test_slow_encoder_drops_frames_within_the_queue_depths(self):
+        depths = {"annotate": 1, "encode": 2, "output": 1}
+        pipeline = self.pipeline(_StubAnalyzer(encode_time=0.03), queue_depths=depths)
+        self.assertIsNotNone(pipeline.get_frame())
+        for _ in range(20):
+            for name, depth in depths.items():
+                self.assertLessEqual(len(pipeline.queues[name]), depth, name)
+            time.sleep(0.005)
+        self.assertIsNotNone(pipeline.get_frame())
+        # Inference outruns encoding, and the frames waiting for it are dropped
+        self.assertGreater(pipeline.queues["encode"].dropped, 0)
+        self.assertLess(pipeline.camera.encoded, pipeline.camera.captured)
+
+    def test_analysis_alone_renders_nothing(self):
+        camera = _StubAnalyzer()
+        pipeline = self.pipeline(camera)
+        for _ in range(3):
+            self.assertTrue(pipeline.analyze_next())
+        self.assertEqual(camera.encoded, 0)
+        self.assertGreaterEqual(pipeline.frames_analysed, 3)
+
+    def test_stop_ends_every_stage_and_start_resumes(self):
+        pipeline = self.pipeline(_StubAnalyzer())
+        self.assertIsNotNone(pipeline.get_frame())
+        threads = list(pipeline._threads)
+        pipeline.stop()
+        self.assertFalse(pipeline.running)
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertTrue(all(len(queue) == 0 for queue in pipeline.queues.values()))
+        self.assertIsNotNone(pipeline.get_frame())
+
+
+# =========================
+# SPEECH
+# =========================
+class _FakeEngine:
+    """Records what pyttsx3 would have said or saved; ``gate`` holds speech back"""
+
+    def __init__(self):
+        self.spoken = []
+        self.saved = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self._next = None
+
+    def say(self, text):
+        self._next = (text, None)
+
+    def save_to_file(self, text, path):
+        self._next = (text, path)
+
+    def runAndWait(self):
+        text, path = self._next
+        if path is None:
+            self.gate.wait(5)
+            self.spoken.append(text)
+        else:
+            with open(path, "wb") as f:
+                f.write(b"RIFF")
+            self.saved.append(text)
+
+
+class SpeechWorkerTests(SimpleTestCase):
+    def worker(self, engine, built=None, **kwargs):
+        """A worker on ``engine``; with ``built`` its thread waits for that event first"""
+        def factory(rate):
+            if built is not None:
+                built.wait(5)
+            return engine
+        kwargs.setdefault("player", None)
+        worker = SpeechWorker(engine_factory=factory, **kwargs)
+        self.addCleanup(worker.stop)
+        return worker
+
+    def test_urgent_alert_displaces_a_posture_one(self):
+        engine, built = _FakeEngine(), threading.Event()
+        worker = self.worker(engine, built, max_queued=2)
+        self.assertTrue(worker.say("Bad posture 1"))
+        self.assertTrue(worker.say("Bad posture 2"))
+        self.assertTrue(worker.say("You look drowsy", URGENT))
+        self.assertFalse(worker.say("Bad posture 3"))
+        self.assertEqual(worker.pending, 2)
+
+        built.set()
+        self.assertTrue(_wait_for(lambda: len(engine.spoken) == 2))
+        self.assertEqual(engine.spoken, ["You look drowsy", "Bad posture 1"])
+
+    def test_waiting_text_is_coalesced(self):
+        engine, built = _FakeEngine(), threading.Event()
+        worker = self.worker(engine, built)
+        self.assertTrue(worker.say("Bad posture detected"))
+        self.assertFalse(worker.say("Bad posture detected"))
+        self.assertEqual(worker.pending, 1)
+        built.set()
+        self.assertTrue(_wait_for(lambda: engine.spoken))
+        time.sleep(0.05)
+        self.assertEqual(engine.spoken, ["Bad posture detected"])
+
+    def test_recently_spoken_text_is_not_repeated(self):
+        now = [100.0]
+        engine = _FakeEngine()
+        worker = self.worker(engine, repeat_interval=10.0, clock=lambda: now[0])
+        self.assertTrue(worker.say("You look drowsy", URGENT))
+        self.assertTrue(_wait_for(lambda: engine.spoken))
+        now[0] = 109.0
+        self.assertFalse(worker.say("You look drowsy", URGENT))
+        now[0] = 111.0
+        self.assertTrue(worker.say("You look drowsy", URGENT))
+        self.assertTrue(_wait_for(lambda: len(engine.spoken) == 2))
+
+    def test_fixed_phrases_play_from_the_cache(self):
+        cache = tempfile.TemporaryDirectory()
+        self.addCleanup(cache.cleanup)
+        played = []
+        options = {"cache_dir": cache.name, "phrases": ("You look drowsy",), "player": lambda: played.append}
+
+        engine = _FakeEngine()
+        worker = self.worker(engine, **options)
+        worker.say("You look drowsy", URGENT)
+        worker.say("Something else")
+        self.assertTrue(_wait_for(lambda: played and engine.spoken))
+        self.assertEqual(engine.saved, ["You look drowsy"])
+        self.assertEqual(engine.spoken, ["Something else"])
+        self.assertEqual(os.path.dirname(played[0]), cache.name)
+
+        # A restarted server finds the file and synthesizes nothing
+        engine = _FakeEngine()
+        worker = self.worker(engine, **options)
+        worker.say("You look drowsy", URGENT)
+        self.assertTrue(_wait_for(lambda: len(played) == 2))
+        self.assertEqual(played[1], played[0])
+        self.assertEqual(engine.saved, [])
@@ -6,6 +6,10 @@ urlpatterns = [
     path("weekday/", views.weekday_page, name="weekday_page"),
     path("weekend/", views.weekend_page, name="weekend_page"),
     path("video_feed/", views.video_feed, name="video_feed"),
+    path("video_feed/async/", views.video_feed_async, name="video_feed_async"),
+    path("metrics/", views.metrics_feed, name="metrics_feed"),
+    path("metrics/async/", views.metrics_feed_async, name="metrics_feed_async"),
+    path("metrics/prometheus/", views.prometheus_metrics, name="prometheus_metrics"),
     
     # Weekend yoga session routes
     path("weekend/save/", views.save_session, name="save_session"),
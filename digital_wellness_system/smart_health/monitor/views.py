@@ -1,202 +1,469 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, Q, Sum
 from django.shortcuts import render
-from django.http import StreamingHttpResponse, JsonResponse
+from django.http import Http404, HttpResponse, StreamingHttpResponse, JsonResponse
+from django.utils import timezone
+import datetime
 import json
-import threading
+import os
+import sys
 import time
 
-from .models import YogaSession, WeekdaySession
-from .camera.weekday import WeekdayCamera
-from .camera.weekend import WeekendCamera
+from .models import (
+    YogaSession, WeekdaySession, PostureBaseline, PostureSample, PostureEvent, SessionRollup
+)
+from .writer import BufferedWriter
+# The camera modules pull in OpenCV and MediaPipe; they are imported only
+# when a camera is built, so history pages and manage.py commands never pay
+# for the vision stack
+from .camera.broadcast import FrameHub
+from .camera.pipeline import FramePipeline
+from .camera.metrics import async_delta_events, delta_events
+from .camera.pool import AnalyzerPool
+from .camera.registry import CameraRegistry
+from .camera.speech import SpeechWorker
+from .camera.telemetry import telemetry
+
+def _camera_source():
+    return getattr(settings, "MONITOR_CAMERA_SOURCE", 0)
+
+
+def _cameras():
+    """Camera name -> source of every camera this server may monitor"""
+    return getattr(settings, "MONITOR_CAMERAS", None) or {"default": _camera_source()}
+
+
+def _inference_backend():
+    return getattr(settings, "MONITOR_INFERENCE_BACKEND", "inprocess")
+
+
+def _start_hub(station, mode, camera):
+    """Start broadcasting a camera, through the staged pipeline if enabled"""
+    recording_dir = getattr(settings, "MONITOR_RECORDING_DIR", None)
+    if recording_dir:
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        name = f"{mode}-{station.camera_name}-{stamp}.lmk"
+        camera.start_recording(os.path.join(recording_dir, name), meta={"camera": station.camera_name})
+
+    source = camera
+    if getattr(settings, "MONITOR_PIPELINED", True):
+        source = FramePipeline(
+            camera,
+            queue_depths=getattr(settings, "MONITOR_PIPELINE_QUEUE_DEPTHS", None)
+        )
+    if mode == "weekday":
+        camera.use_baseline(_stored_baseline(station))
+        _start_sampling(station, camera)
+        _start_event_log(station, camera)
+
+    # Weekday keeps tracking for the session totals after the last viewer leaves
+    headless = mode == "weekday" and getattr(settings, "MONITOR_HEADLESS_ANALYSIS", True)
+    hub = FrameHub(source, mode, headless=headless)
+    hub.start()
+    return hub
+
+
+def _hub_stopped(station, mode, camera):
+    if mode == "weekday":
+        camera.stop_sampling()
+        camera.stop_event_log()
+        _store_baseline(station, camera)
 
-# Global camera instances with lock
-weekday_cam = None
-weekend_cam = None
-camera_lock = threading.Lock()
-current_camera = None
-video_stream_active = False
+
+# =========================
+# POSTURE SAMPLES & EVENTS
+# =========================
+# Rows are written by background threads in batches, never by the
+# analysis threads themselves
+def _writer(model):
+    return BufferedWriter(
+        model,
+        batch_size=getattr(settings, "MONITOR_DB_BATCH_SIZE", 200),
+        flush_interval=getattr(settings, "MONITOR_DB_FLUSH_INTERVAL", 10.0)
+    )
+
+
+posture_samples = _writer(PostureSample)
+posture_events = _writer(PostureEvent)
+
+
+def _start_sampling(station, camera):
+    interval = getattr(settings, "MONITOR_SAMPLE_INTERVAL", None)
+    if not interval:
+        return
+
+    def store(sample):
+        posture_samples.add(PostureSample(
+            session=camera.session_key,
+            camera=station.camera_name,
+            time=timezone.now(),
+            **sample
+        ))
+
+    camera.start_sampling(store, interval)
+
+
+def _start_event_log(station, camera):
+    def store(event):
+        # Events are handed over as they end
+        end = timezone.now()
+        posture_events.add(PostureEvent(
+            session=event["session"],
+            camera=station.camera_name,
+            category=event["category"],
+            start=end - datetime.timedelta(seconds=event["seconds"]),
+            end=end,
+            seconds=event["seconds"]
+        ))
+
+    camera.start_event_log(store)
+
+
+# =========================
+# POSTURE BASELINES
+# =========================
+def _stored_baseline(station):
+    """This person's saved baseline at the station's camera, if any"""
+    try:
+        baseline = PostureBaseline.objects.filter(owner=station.owner, camera=station.camera_name).first()
+    except Exception as e:
+        print(f"⚠️ Could not load posture baseline: {e}")
+        return None
+    return baseline.state() if baseline is not None else None
+
+
+def _store_baseline(station, camera):
+    """Save the camera's baseline if it was calibrated or refined since last time"""
+    state = camera.baseline_state()
+    if state is None:
+        return
+    try:
+        PostureBaseline.objects.update_or_create(
+            owner=station.owner,
+            camera=station.camera_name,
+            defaults={"width": state["width"], "height": state["height"], "stats": state["stats"]},
+        )
+        print(f"📐 Posture baseline saved for {station.owner} @ {station.camera_name}")
+    except Exception as e:
+        print(f"⚠️ Could not save posture baseline: {e}")
+
+
+# =========================
+# ANALYZER POOL
+# =========================
+# Every weekday analyzer speaks its alerts through this one worker thread
+voice = SpeechWorker(
+    max_queued=getattr(settings, "MONITOR_SPEECH_QUEUE_SIZE", 4),
+    repeat_interval=getattr(settings, "MONITOR_SPEECH_REPEAT_INTERVAL", 10.0),
+    cache_dir=getattr(settings, "MONITOR_SPEECH_CACHE_DIR", None)
+)
+
+
+def _build_weekday_camera():
+    from .camera.weekday import WeekdayCamera
+    return WeekdayCamera(
+        backend=_inference_backend(),
+        voice=voice,
+        schedule=getattr(settings, "MONITOR_INFERENCE_SCHEDULE", None),
+        budgets=getattr(settings, "MONITOR_INFERENCE_BUDGETS", None),
+        roi=getattr(settings, "MONITOR_FACE_ROI", True),
+        pose_input_width=getattr(settings, "MONITOR_POSE_INPUT_WIDTH", WeekdayCamera.POSE_INPUT_WIDTH)
+    )
+
+
+def _build_weekend_camera():
+    from .camera.weekend import WeekendCamera
+    return WeekendCamera(
+        backend=_inference_backend(),
+        classifier=getattr(settings, "MONITOR_POSE_CLASSIFIER", "table"),
+        pose_index_dir=getattr(settings, "MONITOR_POSE_INDEX_DIR", None)
+    )
+
+
+# Spare ready-built analyzers, so starting or switching a mode never waits
+# for MediaPipe graphs to be built
+analyzers = AnalyzerPool({
+    "weekday": _build_weekday_camera,
+    "weekend": _build_weekend_camera,
+})
+
+# One station per (camera, browser session): its own analyzers, session
+# totals and hub, sharing the capture of the camera with other sessions
+stations = CameraRegistry(
+    analyzers,
+    _start_hub,
+    stop_hub=_hub_stopped,
+    idle_timeout=getattr(settings, "MONITOR_SESSION_IDLE_TIMEOUT", None)
+)
+
+
+def _camera_name(request):
+    cameras = _cameras()
+    name = request.GET.get("camera") or next(iter(cameras))
+    if name not in cameras:
+        raise Http404(f"Unknown camera: {name}")
+    return name
+
+
+def _session_id(request):
+    # The browser's Django session; the pages make sure there is one
+    return request.session.session_key or "anonymous"
+
+
+def _baseline_owner(request):
+    # Logged-in users keep their posture baseline across browsers
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    return f"session:{_session_id(request)}"
+
+
+def _station(request):
+    """This browser's station for the requested camera, created on first use"""
+    name = _camera_name(request)
+    return stations.get(name, _cameras()[name], _session_id(request), _baseline_owner(request))
+
+
+def _weekday_camera(request):
+    """The weekday analyzer of this browser's station, if one is running"""
+    station = stations.find(_camera_name(request), _session_id(request))
+    return station.camera("weekday") if station is not None else None
 
 
 # =========================
 # CLEANUP FUNCTION
 # =========================
+def _release_unused_captures():
+    # No capture can be open unless a camera was ever built
+    if "monitor.camera.base_camera" in sys.modules:
+        from .camera.base_camera import SharedCapture
+        SharedCapture.release_all()
+
+
 def cleanup_all_cameras():
-    """Cleanup all camera instances and their MediaPipe models"""
-    global weekday_cam, weekend_cam, current_camera, video_stream_active
-    
-    # Stop video stream first
-    video_stream_active = False
-    time.sleep(0.3)
-    
-    with camera_lock:
-        print("🧹 Starting complete camera cleanup...")
-        
-        # Cleanup weekday camera
-        if weekday_cam is not None:
-            print("🧹 Cleaning up weekday camera")
-            try:
-                if hasattr(weekday_cam, 'face_mesh') and weekday_cam.face_mesh:
-                    weekday_cam.face_mesh.close()
-                if hasattr(weekday_cam, 'pose') and weekday_cam.pose:
-                    weekday_cam.pose.close()
-                weekday_cam.release()
-            except Exception as e:
-                print(f"Warning during weekday cleanup: {e}")
-            weekday_cam = None
-        
-        # Cleanup weekend camera
-        if weekend_cam is not None:
-            print("🧹 Cleaning up weekend camera")
-            try:
-                if hasattr(weekend_cam, 'pose') and weekend_cam.pose:
-                    weekend_cam.pose.close()
-                weekend_cam.release()
-            except Exception as e:
-                print(f"Warning during weekend cleanup: {e}")
-            weekend_cam = None
-        
-        current_camera = None
-        time.sleep(0.5)  # Extra delay for camera hardware
-        print("✅ All cameras cleaned up and released")
+    """Close every station and release the camera hardware.
+
+    Spare analyzers keep their models, so the next stream starts without
+    rebuilding them.
+    """
+    print("🧹 Starting complete camera cleanup...")
+    stations.close()
+    _release_unused_captures()
+    posture_samples.flush(timeout=5.0)
+    posture_events.flush(timeout=5.0)
+    print("✅ All cameras cleaned up and released")
 
 
 # =========================
 # FRAME GENERATOR
 # =========================
-def frame_generator(camera):
-    """Generate frames from the camera object"""
-    global video_stream_active
-    video_stream_active = True
-    
+def _stream_telemetry(subscription):
+    mode = subscription.hub.name
+    return telemetry.timers(mode), telemetry.counter("monitor_stream_frames_sent_total", mode=mode)
+
+
+def frame_generator(subscription):
+    """Generate frames from a broadcast hub subscription"""
+    # "send" is the time the server spends writing a frame to the client
+    timers, sent = _stream_telemetry(subscription)
     try:
-        while video_stream_active:
-            frame = camera.get_frame()
-            if frame is None:
-                time.sleep(0.01)
-                continue
-            
+        for frame in subscription:
+            start = time.perf_counter()
             yield (
                 b"--frame\r\n"
                 b"Content-Type: image/jpeg\r\n\r\n" + frame + b"\r\n"
             )
+            timers.observe("send", time.perf_counter() - start)
+            sent.inc()
     except GeneratorExit:
         print("🛑 Frame generator stopped")
     except Exception as e:
         print(f"❌ Frame generator error: {e}")
     finally:
-        video_stream_active = False
+        subscription.close()
+
+
+async def async_frame_generator(subscription):
+    """Async twin of frame_generator for ASGI servers"""
+    timers, sent = _stream_telemetry(subscription)
+    try:
+        async for frame in subscription:
+            start = time.perf_counter()
+            yield (
+                b"--frame\r\n"
+                b"Content-Type: image/jpeg\r\n\r\n" + frame + b"\r\n"
+            )
+            timers.observe("send", time.perf_counter() - start)
+            sent.inc()
+    except Exception as e:
+        print(f"❌ Async frame generator error: {e}")
+    finally:
+        subscription.close()
+        print("🛑 Async frame generator stopped")
 
 
 # =========================
 # STREAM VIEW
 # =========================
-def video_feed(request):
-    global weekday_cam, weekend_cam, current_camera, video_stream_active
-
+def _stream_mode(request):
     mode = request.GET.get("mode", "weekday")
+    if mode != "weekday":
+        mode = "weekend"
     print(f"🔹 VIDEO FEED REQUEST: {mode}")
+    return mode
 
-    # Stop any existing stream
-    video_stream_active = False
-    time.sleep(0.5)
 
-    with camera_lock:
-        if mode == "weekday":
-            print("✅ Initializing WeekdayCamera")
-            
-            # Clean up weekend camera if active
-            if weekend_cam is not None:
-                print("🧹 Cleaning up weekend camera")
-                try:
-                    if hasattr(weekend_cam, 'pose') and weekend_cam.pose:
-                        weekend_cam.pose.close()
-                    weekend_cam.release()
-                except Exception as e:
-                    print(f"Warning during weekend cleanup: {e}")
-                weekend_cam = None
-                time.sleep(0.5)
-            
-            # Clean up old weekday camera if exists
-            if weekday_cam is not None:
-                print("🧹 Cleaning up old weekday camera")
-                try:
-                    if hasattr(weekday_cam, 'face_mesh') and weekday_cam.face_mesh:
-                        weekday_cam.face_mesh.close()
-                    if hasattr(weekday_cam, 'pose') and weekday_cam.pose:
-                        weekday_cam.pose.close()
-                    weekday_cam.release()
-                except Exception as e:
-                    print(f"Warning during old weekday cleanup: {e}")
-                weekday_cam = None
-                time.sleep(0.5)
-            
-            # Create new weekday camera
-            print("🎬 Creating new WeekdayCamera")
-            weekday_cam = WeekdayCamera()
-            camera = weekday_cam
-            current_camera = "weekday"
-            
-        else:  # weekend mode
-            print("✅ Initializing WeekendCamera")
-            
-            # Clean up weekday camera if active
-            if weekday_cam is not None:
-                print("🧹 Cleaning up weekday camera")
-                try:
-                    if hasattr(weekday_cam, 'face_mesh') and weekday_cam.face_mesh:
-                        weekday_cam.face_mesh.close()
-                    if hasattr(weekday_cam, 'pose') and weekday_cam.pose:
-                        weekday_cam.pose.close()
-                    weekday_cam.release()
-                except Exception as e:
-                    print(f"Warning during weekday cleanup: {e}")
-                weekday_cam = None
-                time.sleep(0.5)
-            
-            # Clean up old weekend camera if exists
-            if weekend_cam is not None:
-                print("🧹 Cleaning up old weekend camera")
-                try:
-                    if hasattr(weekend_cam, 'pose') and weekend_cam.pose:
-                        weekend_cam.pose.close()
-                    weekend_cam.release()
-                except Exception as e:
-                    print(f"Warning during old weekend cleanup: {e}")
-                weekend_cam = None
-                time.sleep(0.5)
-            
-            # Create new weekend camera
-            print("🎬 Creating new WeekendCamera")
-            weekend_cam = WeekendCamera()
-            camera = weekend_cam
-            current_camera = "weekend"
+def _under_asgi(request):
+    # An ASGI server reads a sync iterator to its end before sending
+    # anything, and a WSGI server does the same with an async one - so an
+    # endless stream has to match the server it is served by
+    return isinstance(request, ASGIRequest)
+
+
+def _open_stream(request, mode):
+    return _station(request).ensure(mode).subscribe()
 
+
+def _frame_response(request, subscription):
+    if _under_asgi(request):
+        frames = async_frame_generator(subscription)
+    else:
+        frames = frame_generator(subscription)
     return StreamingHttpResponse(
-        frame_generator(camera),
+        frames,
         content_type="multipart/x-mixed-replace; boundary=frame"
     )
 
 
+def video_feed(request):
+    subscription = _open_stream(request, _stream_mode(request))
+    return _frame_response(request, subscription)
+
+
+async def video_feed_async(request):
+    """Same stream as video_feed, served from the event loop under ASGI.
+
+    Camera setup still runs in a worker thread; after that each viewer only
+    awaits the hub and holds no thread of its own. Under WSGI it falls
+    back to the sync generator, so the pages can always link here.
+    """
+    mode = _stream_mode(request)
+    subscription = await sync_to_async(_open_stream, thread_sensitive=False)(request, mode)
+    return _frame_response(request, subscription)
+
+
+# =========================
+# METRICS STREAM
+# =========================
+def _metrics_rate(request):
+    try:
+        return float(request.GET.get("rate", ""))
+    except ValueError:
+        return getattr(settings, "MONITOR_METRICS_RATE", 5.0)
+
+
+def _open_metrics(request, mode):
+    station = _station(request)
+    hub = station.ensure(mode)
+    camera = station.camera(mode)
+    hub.listen()
+    return hub, camera
+
+
+def _metrics_response(request, mode, hub, camera):
+    rate = _metrics_rate(request)
+
+    def events():
+        try:
+            yield from delta_events(camera.metrics, lambda: hub.running, rate=rate)
+        finally:
+            hub.unlisten()
+            print(f"🛑 {mode} metrics stream stopped")
+
+    async def async_events():
+        try:
+            async for event in async_delta_events(camera.metrics, lambda: hub.running, rate=rate):
+                yield event
+        finally:
+            hub.unlisten()
+            print(f"🛑 {mode} metrics stream stopped")
+
+    response = StreamingHttpResponse(
+        async_events() if _under_asgi(request) else events(),
+        content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+def metrics_feed(request):
+    """Server-sent events with the live analysis values of a mode.
+
+    Sends JSON deltas - only the values that changed - at most ``rate``
+    times per second, so a page can render its own overlay without the
+    video stream. The analysis keeps running while at least one metrics
+    client is connected, even with no video viewer.
+    """
+    mode = _stream_mode(request)
+    hub, camera = _open_metrics(request, mode)
+    return _metrics_response(request, mode, hub, camera)
+
+
+async def metrics_feed_async(request):
+    """Same events as metrics_feed; under ASGI a listener holds no thread"""
+    mode = _stream_mode(request)
+    hub, camera = await sync_to_async(_open_metrics, thread_sensitive=False)(request, mode)
+    return _metrics_response(request, mode, hub, camera)
+
+
+# =========================
+# PROMETHEUS SCRAPE
+# =========================
+def prometheus_metrics(request):
+    """Per-stage timings, dropped frames, inference errors and stream
+    clients in the Prometheus text format"""
+    return HttpResponse(
+        telemetry.render(),
+        content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 # =========================
 # HOME PAGE
 # =========================
 def home_page(request):
-    """Home page - cleanup cameras and release hardware"""
+    """Home page - stop this browser's streams and release its cameras.
+
+    Other sessions, e.g. other desks monitored by the same server, keep
+    running; a camera is released once none of them reads it.
+    """
     print("🏠 Loading Home Page - Stopping streams and cleaning up cameras")
-    cleanup_all_cameras()
+    closed = stations.close(session=_session_id(request))
+    print(f"✅ Closed {closed} station(s)")
     return render(request, "monitor/home.html")
 
 
 # =========================
 # PAGE VIEWS
 # =========================
+def _monitor_page(request, template):
+    context = {"camera": _camera_name(request)}
+    # The streams of this page are looked up by the browser's session
+    if request.session.session_key is None:
+        request.session["monitor"] = True
+        request.session.save()
+    return render(request, template, context)
+
+
 def weekday_page(request):
     print("🌐 Loading Weekday Page")
-    return render(request, "monitor/weekday.html")
+    return _monitor_page(request, "monitor/weekday.html")
 
 
 def weekend_page(request):
     print("🌐 Loading Weekend Page")
-    return render(request, "monitor/weekend.html")
+    return _monitor_page(request, "monitor/weekend.html")
 
 
 # =========================
@@ -204,14 +471,11 @@ def weekend_page(request):
 # =========================
 def reset_weekday_session(request):
     """Reset session-specific counters when starting a new session"""
-    global weekday_cam
-    
     if request.method == "POST":
         try:
+            weekday_cam = _weekday_camera(request)
             if weekday_cam is not None:
-                weekday_cam.session_blink_count = 0
-                weekday_cam.total_bad_posture_time = 0
-                weekday_cam.bad_posture_start = None
+                weekday_cam.reset_session()
                 print("🔄 Session counters reset")
             return JsonResponse({"status": "reset"})
         except Exception as e:
@@ -222,10 +486,9 @@ def reset_weekday_session(request):
 
 
 def save_weekday_session(request):
-    global weekday_cam
-    
     if request.method == "POST":
         try:
+            weekday_cam = _weekday_camera(request)
             data = json.loads(request.body.decode("utf-8"))
             duration = data.get("duration")
 
@@ -235,8 +498,10 @@ def save_weekday_session(request):
             # Get stats from camera if available
             blink_count = 0
             bad_posture_time = 0
+            session_key = ""
             
             if weekday_cam is not None:
+                session_key = weekday_cam.session_key
                 # Use session-specific blink count
                 blink_count = getattr(weekday_cam, 'session_blink_count', 0)
                 bad_posture_time = int(getattr(weekday_cam, 'total_bad_posture_time', 0))
@@ -248,14 +513,18 @@ def save_weekday_session(request):
             WeekdaySession.objects.create(
                 duration=int(duration),
                 blink_count=blink_count,
-                bad_posture_time=bad_posture_time
+                bad_posture_time=bad_posture_time,
+                session_key=session_key
             )
             
             # Reset session-specific counters for next session
             if weekday_cam is not None:
-                weekday_cam.session_blink_count = 0
-                weekday_cam.total_bad_posture_time = 0
-                weekday_cam.bad_posture_start = None
+                weekday_cam.reset_session()
+                # So the history page already shows this session's breakdown
+                posture_events.flush(timeout=2.0)
+                station = stations.find(_camera_name(request), _session_id(request))
+                if station is not None:
+                    _store_baseline(station, weekday_cam)
             
             print(f"💾 Weekday session saved: {duration}s, blinks: {blink_count}, bad posture: {bad_posture_time}s")
             return JsonResponse({
@@ -297,27 +566,130 @@ def save_session(request):
 # =========================
 # SESSION HISTORY
 # =========================
+def _history_page(queryset, request, param="before"):
+    """One page of sessions, newest first, continuing from the ``param`` cursor.
+
+    Keyset pagination: the cursor is the (date, id) of the last row shown,
+    and the next page is what comes strictly before it - an index range
+    scan on ``date``, however many pages back. Returns the rows and the
+    cursor of the page after them (None on the last page).
+    """
+    size = getattr(settings, "MONITOR_HISTORY_PAGE_SIZE", 25)
+    queryset = queryset.order_by("-date", "-id")
+
+    cursor = request.GET.get(param)
+    if cursor:
+        try:
+            stamp, pk = cursor.rsplit("_", 1)
+            date, pk = datetime.datetime.fromisoformat(stamp), int(pk)
+        except ValueError:
+            raise Http404("Bad history cursor")
+        queryset = queryset.filter(Q(date__lt=date) | Q(date=date, id__lt=pk))
+
+    rows = list(queryset[:size + 1])
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    return rows, f"{rows[-1].date.isoformat()}_{rows[-1].pk}"
+
+
+def _page_query(request, param, cursor):
+    """This page's query string with ``param`` moved to ``cursor`` (None: the newest page)"""
+    query = request.GET.copy()
+    query.pop(param, None)
+    if cursor:
+        query[param] = cursor
+    return query.urlencode()
+
+
+def _rollup_summary(mode):
+    """All-time totals plus the latest days and weeks, from the rollup table"""
+    rollups = SessionRollup.objects.filter(mode=mode)
+    totals = rollups.filter(period="week").aggregate(
+        sessions=Sum("sessions"),
+        duration=Sum("duration"),
+        blink_count=Sum("blink_count"),
+        bad_posture_time=Sum("bad_posture_time"),
+    )
+    totals = {key: value or 0 for key, value in totals.items()}
+    totals["minutes"] = round(totals["duration"] / 60, 1)
+    return {
+        "totals": totals,
+        "days": list(rollups.filter(period="day").order_by("-start")[:7]),
+        "weeks": list(rollups.filter(period="week").order_by("-start")[:8]),
+    }
+
+
 def session_history(request):
-    sessions = YogaSession.objects.all().order_by("-date")
-    print(f"📊 Loading {sessions.count()} yoga sessions")
-    return render(request, "monitor/history.html", {"sessions": sessions})
+    sessions, older = _history_page(YogaSession.objects.all(), request)
+    print(f"📊 Loading {len(sessions)} yoga sessions")
+    context = {"sessions": sessions, "older": older, "summary": _rollup_summary("weekend")}
+    return render(request, "monitor/history.html", context)
+
+
+def _posture_breakdown(sessions):
+    """Attach each session's bad-posture time per category; return the totals.
+
+    One aggregate query over the (session, start) index covers all the
+    sessions shown.
+    """
+    sessions = list(sessions)
+    keys = [s.session_key for s in sessions if s.session_key]
+    per_session = {}
+    totals = {}
+    if keys:
+        rows = (
+            PostureEvent.objects.filter(session__in=keys)
+            .values("session", "category")
+            .annotate(seconds=Sum("seconds"), events=Count("id"))
+            .order_by()
+        )
+        for row in rows:
+            per_session.setdefault(row["session"], []).append(row)
+            total = totals.setdefault(row["category"], {"category": row["category"], "seconds": 0, "events": 0})
+            total["seconds"] += row["seconds"]
+            total["events"] += row["events"]
+
+    for s in sessions:
+        s.breakdown = sorted(per_session.get(s.session_key, []), key=lambda row: -row["seconds"])
+    return sorted(totals.values(), key=lambda row: -row["seconds"])
 
 
 def weekday_history(request):
-    sessions = WeekdaySession.objects.all().order_by("-date")
-    print(f"📊 Loading {sessions.count()} weekday sessions")
-    return render(request, "monitor/history_weekday.html", {"sessions": sessions})
+    sessions, older = _history_page(WeekdaySession.objects.all(), request)
+    print(f"📊 Loading {len(sessions)} weekday sessions")
+    context = {
+        "sessions": sessions,
+        "older": older,
+        "summary": _rollup_summary("weekday"),
+        "posture_totals": _posture_breakdown(sessions),
+    }
+    return render(request, "monitor/history_weekday.html", context)
+
 
 def combined_history(request):
     """Combined history view showing both weekday and weekend sessions"""
-    weekday_sessions = WeekdaySession.objects.all().order_by("-date")
-    weekend_sessions = YogaSession.objects.all().order_by("-date")
-    
-    print(f"📊 Loading combined history - Weekday: {weekday_sessions.count()}, Weekend: {weekend_sessions.count()}")
-    
+    weekday_sessions, weekday_older = _history_page(WeekdaySession.objects.all(), request, "weekday_before")
+    weekend_sessions, weekend_older = _history_page(YogaSession.objects.all(), request, "weekend_before")
+
+    print(f"📊 Loading combined history - Weekday: {len(weekday_sessions)}, Weekend: {len(weekend_sessions)}")
+
+    # Paging one tab keeps the other tab on its page
     context = {
         'weekday_sessions': weekday_sessions,
         'weekend_sessions': weekend_sessions,
+        'weekday_older': weekday_older,
+        'weekend_older': weekend_older,
+        'weekday_pages': {
+            'newest': _page_query(request, "weekday_before", None),
+            'older': _page_query(request, "weekday_before", weekday_older),
+        },
+        'weekend_pages': {
+            'newest': _page_query(request, "weekend_before", None),
+            'older': _page_query(request, "weekend_before", weekend_older),
+        },
+        'weekday_summary': _rollup_summary("weekday"),
+        'weekend_summary': _rollup_summary("weekend"),
     }
-    
-    return render(request, "monitor/combined_history.html", context)
\ No newline at end of file
+
+    return render(request, "monitor/combined_history.html", context)
@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import deque
+
+from django.db import close_old_connections
+
+from .camera.telemetry import telemetry
+
+
+class BufferedWriter:
+    """Writes model rows from a background thread, in batches.
+
+    ``add()`` appends an unsaved instance to an in-memory buffer and
+    returns - the analysis threads never wait for SQLite. A writer thread
+    saves the buffer with one ``bulk_create`` once ``batch_size`` rows
+    are waiting or ``flush_interval`` seconds have passed, so the write
+    rate stays bounded however many cameras are running. At most
+    ``max_pending`` rows are held; beyond that the oldest are dropped
+    (and counted) rather than letting memory grow while the database is
+    locked.
+    """
+
+    def __init__(self, model, batch_size=200, flush_interval=10.0, max_pending=10000):
+        self.model = model
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = deque(maxlen=max_pending)
+        self._wake = threading.Condition()
+        self._flushed = threading.Condition()
+        self._written = 0  # rows handed to the database so far
+        self._taken = 0
+        self._thread = None
+        self._running = False
+        self._flush_now = False
+
+        name = model._meta.model_name
+        self._rows = telemetry.counter("monitor_db_rows_written_total", model=name)
+        self._dropped = telemetry.counter("monitor_db_rows_dropped_total", model=name)
+
+    def add(self, instance):
+        """Queue an unsaved model instance; never blocks"""
+        self.start()
+        with self._wake:
+            if len(self._pending) == self._pending.maxlen:
+                self._dropped.inc()
+            self._pending.append(instance)
+            if len(self._pending) >= self.batch_size:
+                self._wake.notify()
+
+    @property
+    def pending(self):
+        with self._wake:
+            return len(self._pending)
+
+    def start(self):
+        with self._wake:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(
+                target=self._run, name=f"writer-{self.model._meta.model_name}", daemon=True)
+            self._thread.start()
+
+    def flush(self, timeout=None):
+        """Ask for an immediate write and wait (up to ``timeout``) until it is done"""
+        with self._wake:
+            target = self._taken + len(self._pending)
+            if not self._running or target == self._written:
+                return self._written >= target
+            self._flush_now = True
+            self._wake.notify()
+        with self._flushed:
+            return self._flushed.wait_for(lambda: self._written >= target, timeout)
+
+    def close(self, timeout=5.0):
+        """Write what is pending and stop the thread; a later add() starts it again"""
+        with self._wake:
+            self._running = False
+            self._wake.notify()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._wake:
+                deadline = time.monotonic() + self.flush_interval
+                while self._running and not self._flush_now and len(self._pending) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wake.wait(remaining)
+                self._flush_now = False
+                batch = list(self._pending)
+                self._pending.clear()
+                self._taken += len(batch)
+                running = self._running
+
+            if batch:
+                self._write(batch)
+            with self._flushed:
+                self._written = self._taken
+                self._flushed.notify_all()
+            if not running:
+                break
+        close_old_connections()
+
+    def _write(self, batch):
+        try:
+            self.model.objects.bulk_create(batch, batch_size=self.batch_size)
+            self._rows.inc(len(batch))
+        except Exception as e:
+            self._dropped.inc(len(batch))
+            print(f"⚠️ Could not write {len(batch)} {self.model._meta.verbose_name_plural}: {e}")
+        finally:
+            close_old_connections()
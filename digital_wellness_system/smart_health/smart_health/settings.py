@@ -124,3 +124,97 @@ STATIC_URL = "static/"
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Smart Health Monitor - video pipeline
+# Where frames come from: a webcam index, a stream URL, "loop:clip.mp4" to
+# replay a clip as if it were a webcam, or "synthetic:1280x720".
+MONITOR_CAMERA_SOURCE = 0
+
+# Cameras one server can monitor, e.g. a row of desks:
+#   {"desk-1": 0, "desk-2": 1, "desk-3": "rtsp://10.0.0.23/stream"}
+# Pages pick one with ?camera=desk-2 (the first by default); every browser
+# session gets its own analysis and totals on it. None means just
+# MONITOR_CAMERA_SOURCE, under the name "default".
+MONITOR_CAMERAS = None
+
+# Close a session's streams after this many seconds with no viewer and no
+# metrics listener (None keeps them until the home page is opened). With
+# MONITOR_HEADLESS_ANALYSIS on, weekday streams are kept regardless, so
+# their totals survive.
+MONITOR_SESSION_IDLE_TIMEOUT = 600
+
+# Run capture, inference, overlay drawing and JPEG encoding as overlapping
+# stages; queue depths bound how many frames may wait between stages, and a
+# full queue drops its oldest frame. False analyses, draws and encodes each
+# frame one after another on the hub thread.
+MONITOR_PIPELINED = True
+MONITOR_PIPELINE_QUEUE_DEPTHS = {
+    "annotate": 2,
+    "encode": 2,
+    "output": 1,
+}
+
+# Keep weekday blink/posture tracking running with no viewer attached, so
+# the session totals cover the whole sitting; overlays and JPEG encoding
+# only happen while someone is watching. False pauses the analysis once no
+# page shows the video or listens to its metrics.
+MONITOR_HEADLESS_ANALYSIS = True
+
+# Default number of updates per second pushed by the /metrics/ event stream
+# (clients may ask for another rate with ?rate=N)
+MONITOR_METRICS_RATE = 5.0
+
+# When set, every camera session records its per-frame landmarks into this
+# directory as <mode>-<timestamp>.lmk, for replay with
+# "manage.py replay_landmarks" (no MediaPipe needed).
+MONITOR_RECORDING_DIR = None
+
+# "inprocess" runs MediaPipe on the analysis thread; "process" runs each
+# model in its own worker process and shares frames through shared memory.
+MONITOR_INFERENCE_BACKEND = "inprocess"
+
+# Weekday mode runs each model every Nth frame and estimates landmarks in
+# between. A per-model budget (seconds per frame) overrides the fixed rate:
+# a model taking 30 ms with a 0.01 budget runs every 3rd frame.
+MONITOR_INFERENCE_SCHEDULE = {"face": 1, "pose": 3}
+MONITOR_INFERENCE_BUDGETS = None
+
+# FaceMesh sees only a padded crop around the last detected face, and Pose a
+# copy scaled down to at most this width. Landmarks are mapped back to the
+# full frame, so thresholds are unaffected.
+MONITOR_FACE_ROI = True
+MONITOR_POSE_INPUT_WIDTH = 640
+
+# Weekend pose classifier: "table" checks the angle windows in
+# monitor/camera/poses.py, "reference" finds the nearest pose among the
+# photos in monitor/images. Their index is built once and cached in
+# MONITOR_POSE_INDEX_DIR (None: a folder in the system temp directory).
+MONITOR_POSE_CLASSIFIER = "table"
+MONITOR_POSE_INDEX_DIR = None
+
+# Weekday monitoring is summed up every MONITOR_SAMPLE_INTERVAL seconds into
+# a PostureSample row (None turns this off). Rows are saved by a background
+# writer with one bulk insert per MONITOR_DB_BATCH_SIZE rows, or at least
+# every MONITOR_DB_FLUSH_INTERVAL seconds.
+MONITOR_SAMPLE_INTERVAL = 5.0
+MONITOR_DB_BATCH_SIZE = 200
+MONITOR_DB_FLUSH_INTERVAL = 10.0
+
+# Sessions per history page; older ones are a click away ("Older sessions")
+MONITOR_HISTORY_PAGE_SIZE = 25
+
+# Spoken alerts are played one at a time by a single worker thread. At most
+# MONITOR_SPEECH_QUEUE_SIZE wait their turn (a drowsiness alert displaces a
+# posture one), and a phrase spoken less than MONITOR_SPEECH_REPEAT_INTERVAL
+# seconds ago is not repeated. The fixed alerts are synthesized once into
+# MONITOR_SPEECH_CACHE_DIR (None: a folder in the system temp directory).
+MONITOR_SPEECH_QUEUE_SIZE = 4
+MONITOR_SPEECH_REPEAT_INTERVAL = 10.0
+MONITOR_SPEECH_CACHE_DIR = None
+
+# Build both modes' MediaPipe graphs in a background thread as soon as a
+# server process starts (runserver, gunicorn, uvicorn...), so the first
+# video frame does not wait for them. Other manage.py commands skip it.
+# False builds the graphs when a page first opens a camera instead.
+MONITOR_WARM_UP = True